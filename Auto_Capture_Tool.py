@@ -3,29 +3,36 @@ Auto Capture Tool - Full Page Screenshot Automation
 Captures full-page screenshots using Selenium and Chrome DevTools Protocol.
 """
 
-import base64
 import io
+import itertools
 import os
-import re
 import threading
-import time
-import urllib.error
-import urllib.request
-import zipfile
 from datetime import datetime
-from urllib.parse import urlparse
-
-from PIL import Image
-from selenium import webdriver
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 
+from auto_capture import (
+    CaptureConfig,
+    CaptureEngine,
+    partition_reachable,
+    url_to_filepath,
+)
+from auto_capture.archive import create_zip_archives
+from auto_capture.config import (
+    default_chrome_user_data_dir,
+    default_log_path,
+    default_timings_path,
+)
+from auto_capture.ingest import (
+    UrlDeduplicator,
+    iter_source_lines,
+    iter_unique_urls,
+    iter_work_items,
+    peek,
+)
+from auto_capture.log_sink import FLUSH_INTERVAL_MS, MAX_SCREEN_LINES, BufferedLogSink
+
 
 # ======================================================
 #                DARK THEME CONFIGURATION
@@ -46,7 +53,7 @@ class DarkTheme:
 
 
 # ======================================================
-#            MAIN APPLICATION CLASS (UI + LOGIC)
+#         MAIN APPLICATION CLASS (UI CLIENT)
 # ======================================================
 class AutoCaptureTool:
     def __init__(self, root):
@@ -65,23 +72,25 @@ class AutoCaptureTool:
 
         # TRACKERS
         self.items_to_process = []
-        self.failed_items = []  # Track failed captures for retry
-        self.current_index = 0
-        self.driver = None
+        self.url_file = ""  # URL list streamed from a file instead of the text box
+        self.url_dedup = None  # UrlDeduplicator of the current run's URL stream
         self.root_save_directory = ""
         self.is_running = False
-        self.browser_opened_for_login = False  # Track if browser was opened manually
-        self.user_logged_in = False  # Track if user has logged in during this session
-        self.login_prompt_shown = False  # Only show login prompt once per capture session
-        self.consecutive_connection_errors = 0  # Track connection refused errors
 
         # Chrome profile directory for persistent sessions
-        profile_dir = os.path.join(os.path.expanduser("~"), ".auto_capture_tool")
-        os.makedirs(profile_dir, exist_ok=True)
-        self.chrome_user_data_dir = os.path.join(profile_dir, "chrome_profile")
+        self.chrome_user_data_dir = default_chrome_user_data_dir()
+        os.makedirs(os.path.dirname(self.chrome_user_data_dir), exist_ok=True)
+
+        # Messages from worker threads are buffered and drawn once per frame
+        self.log_sink = BufferedLogSink(default_log_path())
+        self._pending_progress = None  # Latest (msg, value) not yet drawn
+
+        # All capture work is delegated to the engine; the UI only collects settings
+        self.engine = CaptureEngine(log=self.log, progress=self._update_progress)
 
         self._apply_styles()
         self._build_ui()
+        self.root.after(FLUSH_INTERVAL_MS, self._flush_ui)
 
     # ==================================================
     #                    UI STYLING
@@ -227,6 +236,184 @@ class AutoCaptureTool:
         )
         chk_headless.pack(anchor="w")
 
+        self.tile_var = tk.BooleanVar(value=True)
+        chk_tile = tk.Checkbutton(
+            opt_frame,
+            text="Capture very long pages in tiles (no 16000px truncation)",
+            variable=self.tile_var,
+            bg=DarkTheme.BG_PANEL,
+            fg=DarkTheme.FG_TEXT,
+            selectcolor=DarkTheme.BG_INPUT,
+            activebackground=DarkTheme.BG_PANEL,
+        )
+        chk_tile.pack(anchor="w")
+
+        self.warm_spare_var = tk.BooleanVar(value=False)
+        chk_spare = tk.Checkbutton(
+            opt_frame,
+            text="Keep a standby browser ready (faster recovery if Chrome crashes)",
+            variable=self.warm_spare_var,
+            bg=DarkTheme.BG_PANEL,
+            fg=DarkTheme.FG_TEXT,
+            selectcolor=DarkTheme.BG_INPUT,
+            activebackground=DarkTheme.BG_PANEL,
+        )
+        chk_spare.pack(anchor="w")
+
+        self.pdf_bundle_var = tk.BooleanVar(value=False)
+        chk_bundle = tk.Checkbutton(
+            opt_frame,
+            text="PDF: combine all captures into one bookmarked PDF",
+            variable=self.pdf_bundle_var,
+            bg=DarkTheme.BG_PANEL,
+            fg=DarkTheme.FG_TEXT,
+            selectcolor=DarkTheme.BG_INPUT,
+            activebackground=DarkTheme.BG_PANEL,
+        )
+        chk_bundle.pack(anchor="w")
+
+        self.resume_var = tk.BooleanVar(value=False)
+        chk_resume = tk.Checkbutton(
+            opt_frame,
+            text="Resume: skip URLs already captured into this folder",
+            variable=self.resume_var,
+            bg=DarkTheme.BG_PANEL,
+            fg=DarkTheme.FG_TEXT,
+            selectcolor=DarkTheme.BG_INPUT,
+            activebackground=DarkTheme.BG_PANEL,
+        )
+        chk_resume.pack(anchor="w")
+
+        self.prewarm_var = tk.BooleanVar(value=False)
+        chk_prewarm = tk.Checkbutton(
+            opt_frame,
+            text="Pre-warm routes (dev servers compile upcoming pages while capturing)",
+            variable=self.prewarm_var,
+            bg=DarkTheme.BG_PANEL,
+            fg=DarkTheme.FG_TEXT,
+            selectcolor=DarkTheme.BG_INPUT,
+            activebackground=DarkTheme.BG_PANEL,
+        )
+        chk_prewarm.pack(anchor="w")
+
+        self.load_lazy_var = tk.BooleanVar(value=False)
+        chk_load_lazy = tk.Checkbutton(
+            opt_frame,
+            text="Load lazy images right away (slower on long pages)",
+            variable=self.load_lazy_var,
+            bg=DarkTheme.BG_PANEL,
+            fg=DarkTheme.FG_TEXT,
+            selectcolor=DarkTheme.BG_INPUT,
+            activebackground=DarkTheme.BG_PANEL,
+        )
+        chk_load_lazy.pack(anchor="w")
+
+        parallel_frame = ttk.Frame(opt_frame, style="Panel.TFrame")
+        parallel_frame.pack(anchor="w", pady=(2, 0))
+
+        ttk.Label(parallel_frame, text="Parallel browsers:", style="Panel.TLabel").pack(
+            side=tk.LEFT
+        )
+        self.workers_var = tk.StringVar(value="1")
+        workers_combo = ttk.Combobox(
+            parallel_frame, textvariable=self.workers_var, values=["1", "2", "4", "6", "8"], width=3
+        )
+        workers_combo.pack(side=tk.LEFT, padx=(5, 0))
+
+        ttk.Label(parallel_frame, text="Max per host:", style="Panel.TLabel").pack(
+            side=tk.LEFT, padx=(20, 5)
+        )
+        self.per_host_var = tk.StringVar(value="2")
+        per_host_combo = ttk.Combobox(
+            parallel_frame, textvariable=self.per_host_var, values=["1", "2", "4", "8"], width=3
+        )
+        per_host_combo.pack(side=tk.LEFT)
+
+        ttk.Label(parallel_frame, text="Max settle (sec):", style="Panel.TLabel").pack(
+            side=tk.LEFT, padx=(20, 5)
+        )
+        self.settle_var = tk.StringVar(value="5")
+        settle_combo = ttk.Combobox(
+            parallel_frame, textvariable=self.settle_var, values=["2", "5", "10", "20"], width=3
+        )
+        settle_combo.pack(side=tk.LEFT)
+
+        crawl_frame = ttk.Frame(opt_frame, style="Panel.TFrame")
+        crawl_frame.pack(anchor="w", pady=(2, 0))
+
+        self.crawl_var = tk.BooleanVar(value=False)
+        chk_crawl = tk.Checkbutton(
+            crawl_frame,
+            text="Discover pages (follow links)",
+            variable=self.crawl_var,
+            bg=DarkTheme.BG_PANEL,
+            fg=DarkTheme.FG_TEXT,
+            selectcolor=DarkTheme.BG_INPUT,
+            activebackground=DarkTheme.BG_PANEL,
+        )
+        chk_crawl.pack(side=tk.LEFT)
+
+        ttk.Label(crawl_frame, text="Depth:", style="Panel.TLabel").pack(
+            side=tk.LEFT, padx=(10, 5)
+        )
+        self.crawl_depth_var = tk.StringVar(value="2")
+        crawl_depth_combo = ttk.Combobox(
+            crawl_frame, textvariable=self.crawl_depth_var, values=["1", "2", "3", "5"], width=3
+        )
+        crawl_depth_combo.pack(side=tk.LEFT)
+
+        ttk.Label(crawl_frame, text="Max pages:", style="Panel.TLabel").pack(
+            side=tk.LEFT, padx=(20, 5)
+        )
+        self.crawl_max_pages_var = tk.StringVar(value="200")
+        crawl_pages_combo = ttk.Combobox(
+            crawl_frame,
+            textvariable=self.crawl_max_pages_var,
+            values=["50", "200", "500", "1000"],
+            width=5,
+        )
+        crawl_pages_combo.pack(side=tk.LEFT)
+
+        ttk.Label(crawl_frame, text="Scope:", style="Panel.TLabel").pack(
+            side=tk.LEFT, padx=(20, 5)
+        )
+        self.crawl_scope_var = tk.StringVar(value="path")
+        crawl_scope_combo = ttk.Combobox(
+            crawl_frame,
+            textvariable=self.crawl_scope_var,
+            values=["path", "host"],
+            width=5,
+            state="readonly",
+        )
+        crawl_scope_combo.pack(side=tk.LEFT)
+
+        block_frame = ttk.Frame(opt_frame, style="Panel.TFrame")
+        block_frame.pack(anchor="w", pady=(2, 0))
+
+        ttk.Label(block_frame, text="Block:", style="Panel.TLabel").pack(side=tk.LEFT)
+        self.block_vars = {}
+        for profile, label in (
+            ("trackers", "Analytics/trackers"),
+            ("chat", "Chat widgets"),
+            ("media", "Video/audio"),
+        ):
+            self.block_vars[profile] = tk.BooleanVar(value=False)
+            tk.Checkbutton(
+                block_frame,
+                text=label,
+                variable=self.block_vars[profile],
+                bg=DarkTheme.BG_PANEL,
+                fg=DarkTheme.FG_TEXT,
+                selectcolor=DarkTheme.BG_INPUT,
+                activebackground=DarkTheme.BG_PANEL,
+            ).pack(side=tk.LEFT)
+
+        ttk.Label(block_frame, text="URLs:", style="Panel.TLabel").pack(
+            side=tk.LEFT, padx=(10, 5)
+        )
+        self.block_patterns_var = tk.StringVar(value="")
+        ttk.Entry(block_frame, textvariable=self.block_patterns_var, width=24).pack(side=tk.LEFT)
+
         # ---------- FORMAT + SETTINGS ----------
         settings_frame = ttk.Frame(self.root, style="Panel.TFrame", padding=6)
         settings_frame.grid(row=2, column=0, sticky="ew")
@@ -234,7 +421,7 @@ class AutoCaptureTool:
         ttk.Label(settings_frame, text="Format:", style="Panel.TLabel").pack(side=tk.LEFT)
 
         self.format_var = tk.StringVar(value="png")
-        for text, value in [("PNG", "png"), ("JPG", "jpg"), ("PDF", "pdf")]:
+        for text, value in [("PNG", "png"), ("JPG", "jpg"), ("WebP", "webp"), ("PDF", "pdf")]:
             rb = tk.Radiobutton(
                 settings_frame,
                 text=text,
@@ -247,6 +434,15 @@ class AutoCaptureTool:
             )
             rb.pack(side=tk.LEFT, padx=10)
 
+        ttk.Label(settings_frame, text="Quality:", style="Panel.TLabel").pack(
+            side=tk.LEFT, padx=(10, 5)
+        )
+        self.quality_var = tk.StringVar(value="90")
+        quality_combo = ttk.Combobox(
+            settings_frame, textvariable=self.quality_var, values=["70", "80", "90", "95"], width=3
+        )
+        quality_combo.pack(side=tk.LEFT)
+
         # Browser width dropdown
         ttk.Label(settings_frame, text="Width:", style="Panel.TLabel").pack(
             side=tk.LEFT, padx=(20, 5)
@@ -260,6 +456,13 @@ class AutoCaptureTool:
         )
         width_combo.pack(side=tk.LEFT)
 
+        # Several widths from one page load, e.g. "1400, 768, 390@3:mobile" (empty = Width)
+        ttk.Label(settings_frame, text="Viewports:", style="Panel.TLabel").pack(
+            side=tk.LEFT, padx=(10, 5)
+        )
+        self.viewports_var = tk.StringVar(value="")
+        ttk.Entry(settings_frame, textvariable=self.viewports_var, width=18).pack(side=tk.LEFT)
+
         ttk.Label(settings_frame, text="Delay (sec):", style="Panel.TLabel").pack(
             side=tk.LEFT, padx=(20, 5)
         )
@@ -275,9 +478,20 @@ class AutoCaptureTool:
         mid_frame.grid_columnconfigure(0, weight=1)
         mid_frame.grid_rowconfigure(1, weight=1)
 
-        ttk.Label(mid_frame, text="Paste URLs (one per line):", style="Panel.TLabel").grid(
-            row=0, column=0, sticky="w"
+        self.url_source_label = ttk.Label(
+            mid_frame, text="Paste URLs (one per line):", style="Panel.TLabel"
         )
+        self.url_source_label.grid(row=0, column=0, sticky="w")
+
+        self.url_file_btn = tk.Button(
+            mid_frame,
+            text="Load URL File...",
+            command=self.toggle_url_file,
+            bg=DarkTheme.BG_INPUT,
+            fg=DarkTheme.FG_TEXT,
+            font=("Arial", 9),
+        )
+        self.url_file_btn.grid(row=0, column=1, sticky="e")
 
         self.text_area = scrolledtext.ScrolledText(
             mid_frame,
@@ -289,7 +503,7 @@ class AutoCaptureTool:
             borderwidth=1,
             font=("Consolas", 9),
         )
-        self.text_area.grid(row=1, column=0, sticky="nsew", pady=3)
+        self.text_area.grid(row=1, column=0, columnspan=2, sticky="nsew", pady=3)
 
         # ---------- LOGGING PANEL ----------
         log_frame = ttk.Frame(self.root, style="Panel.TFrame")
@@ -422,212 +636,57 @@ class AutoCaptureTool:
     #                       LOGGING
     # ==================================================
     def log(self, message: str):
-        """Thread-safe logging method."""
-        timestamp = datetime.now().strftime("[%H:%M:%S]")
-        self.root.after(0, self._log_to_ui, f"{timestamp} {message}\n")
+        """Thread-safe logging method (shown on the next UI frame)."""
+        self.log_sink.write(message)
 
-    def _log_to_ui(self, message: str):
+    def _flush_ui(self):
+        """Draw buffered log lines and the latest progress; runs on the main thread."""
+        try:
+            lines = self.log_sink.take()
+            if lines:
+                self._log_to_ui("".join(lines[-MAX_SCREEN_LINES:]))
+            progress, self._pending_progress = self._pending_progress, None
+            if progress is not None:
+                self._do_update_progress(*progress)
+        finally:
+            self.root.after(FLUSH_INTERVAL_MS, self._flush_ui)
+
+    def _log_to_ui(self, text: str):
         """Internal method - runs on main thread."""
-        self.log_box.insert(tk.END, message)
+        self.log_box.insert(tk.END, text)
+        # Keep the widget to a ring of the latest lines; the log file has them all
+        excess = int(self.log_box.index("end-1c").split(".")[0]) - 1 - MAX_SCREEN_LINES
+        if excess > 0:
+            self.log_box.delete("1.0", f"{excess + 1}.0")
         self.log_box.see(tk.END)
 
     # ==================================================
-    #           DYNAMIC URL CLEANING / EXTRACTION
+    #            FILEPATH BUILDER
     # ==================================================
-    @staticmethod
-    def validate_url(url: str) -> bool:
-        """Validate if a URL is properly formatted."""
-        try:
-            result = urlparse(url)
-            return all([result.scheme in ("http", "https"), result.netloc])
-        except Exception:
-            return False
-
-    @staticmethod
-    def extract_urls(raw_text: str):
-        pattern = r'https?://[^\s<>"\'`]+'
-        results = re.findall(pattern, raw_text)
-
-        def normalize_url_for_comparison(url: str) -> str:
-            """Normalize URL for deduplication comparison."""
-            # Remove trailing punctuation
-            url = url.rstrip(".,;:)")
-            # Remove trailing slash (normalize URLs)
-            url = url.rstrip("/")
-            # Convert to lowercase for comparison
-            return url.lower()
-
-        unique = []
-        seen = set()
-
-        for url in results:
-            clean = url.rstrip(".,;:)")
-            # Validate URL before adding
-            if not AutoCaptureTool.validate_url(clean):
-                continue
-            normalized = normalize_url_for_comparison(clean)
-
-            if normalized not in seen:
-                seen.add(normalized)
-                unique.append(clean)
-
-        return unique
-
-    # ==================================================
-    #            FILEPATH BUILDER (STATIC METHOD)
-    # ==================================================
-    @staticmethod
-    def flatten_rgba(img):
-        if img.mode == "RGBA":
-            bg = Image.new("RGB", img.size, (255, 255, 255))
-            bg.paste(img, mask=img.split()[3])
-            return bg
-        return img
-
     def url_to_filepath(self, url: str):
-        """Convert URL to Windows-safe file path."""
-        parsed = urlparse(url)
-        fmt = self.format_var.get()
-
-        # Windows invalid characters: < > : " / \ | ? *
-        # Also handle port numbers in domain
-        domain = parsed.netloc.replace(":", "-").replace(".", "_")
-        # Remove any remaining invalid chars from domain
-        domain = "".join(c for c in domain if c.isalnum() or c in "-_")
-
-        path = parsed.path.strip("/")
-        if not path:
-            return domain if self.include_domain_var.get() else "", f"index.{fmt}"
-
-        parts = [p for p in path.split("/") if p]
-
-        # Windows reserved names that can't be used as filenames
-        windows_reserved = {
-            "CON",
-            "PRN",
-            "AUX",
-            "NUL",
-            "COM1",
-            "COM2",
-            "COM3",
-            "COM4",
-            "COM5",
-            "COM6",
-            "COM7",
-            "COM8",
-            "COM9",
-            "LPT1",
-            "LPT2",
-            "LPT3",
-            "LPT4",
-            "LPT5",
-            "LPT6",
-            "LPT7",
-            "LPT8",
-            "LPT9",
-        }
-
-        def sanitize_for_windows(name: str) -> str:
-            """Sanitize a filename component for Windows."""
-            if not name:
-                return "unnamed"
-
-            # Remove Windows invalid characters
-            invalid_chars = '<>:"/\\|?*'
-            cleaned = "".join(c for c in name if c not in invalid_chars)
-
-            # Remove leading/trailing dots and spaces (Windows doesn't allow these)
-            cleaned = cleaned.strip(". ")
-
-            # Handle Windows reserved names
-            if cleaned.upper() in windows_reserved:
-                cleaned = f"_{cleaned}"
-
-            # Ensure it's not empty after cleaning
-            if not cleaned:
-                cleaned = "unnamed"
-
-            # Limit length to avoid Windows path issues (260 char limit for full path)
-            # Keep individual component reasonable (max 100 chars)
-            if len(cleaned) > 100:
-                cleaned = cleaned[:100]
-
-            return cleaned
-
-        clean_parts = [sanitize_for_windows(p) for p in parts]
-
-        if len(clean_parts) == 1:
-            filename = f"{clean_parts[0]}.{fmt}"
-            folder = ""
-        else:
-            filename = f"{clean_parts[-1]}.{fmt}"
-            folder = os.path.join(*clean_parts[:-1])
-
-        if self.include_domain_var.get():
-            return (os.path.join(domain, folder) if folder else domain), filename
-
-        return folder, filename
-
-    # ==================================================
-    #              SERVER CONNECTIVITY CHECK
-    # ==================================================
-    def check_server_connectivity(self, url: str, timeout: int = 10):
-        """Check if the server is reachable before starting capture."""
-        try:
-            parsed = urlparse(url)
-            test_url = f"{parsed.scheme}://{parsed.netloc}"
-            headers = {
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/120.0.0.0 Safari/537.36"
-                )
-            }
-            try:
-                req = urllib.request.Request(test_url, method="HEAD", headers=headers)
-                urllib.request.urlopen(req, timeout=timeout)
-                return True, ""
-            except urllib.error.HTTPError as e:
-                if e.code < 500:
-                    return True, ""
-                return False, f"Server error: {e.code}"
-            except urllib.error.URLError:
-                pass
-            try:
-                req = urllib.request.Request(test_url, method="GET", headers=headers)
-                with urllib.request.urlopen(req, timeout=timeout) as response:
-                    response.read(1)
-                return True, ""
-            except urllib.error.HTTPError as e:
-                if e.code < 500:
-                    return True, ""
-                return False, f"Server error: {e.code}"
-            except urllib.error.URLError as e:
-                error_str = str(e.reason)
-                if "Connection refused" in error_str:
-                    return False, f"Connection refused at {parsed.netloc}."
-                elif "getaddrinfo failed" in error_str:
-                    return False, f"Cannot resolve {parsed.netloc}. Check internet or URL."
-                return False, f"Cannot reach server: {e.reason}"
-        except Exception as e:
-            return False, f"Connection error: {str(e)}"
+        """Convert URL to Windows-safe file path using the current UI settings."""
+        return url_to_filepath(url, self.format_var.get(), self.include_domain_var.get())
 
     # ==================================================
     #                       PREVIEW
     # ==================================================
     def preview_urls(self):
         try:
-            urls = self.extract_urls(self.text_area.get("1.0", tk.END))
-            if not urls:
+            dedup = UrlDeduplicator()
+            urls = iter_unique_urls(self._url_lines(), dedup)
+            first = list(itertools.islice(urls, 20))
+            if not first:
                 messagebox.showinfo("Preview", "No URLs detected.")
                 return
+            # Count the rest without keeping it
+            more = sum(1 for _ in urls)
 
-            text = f"Found {len(urls)} URLs:\n\n"
-            for u in urls[:20]:
+            text = f"Found {len(first) + more} URLs:\n\n"
+            for u in first:
                 d, f = self.url_to_filepath(u)
                 text += f"- {u}\n   → {os.path.join(d, f) if d else f}\n\n"
-            if len(urls) > 20:
-                text += f"... +{len(urls)-20} more"
+            if more:
+                text += f"... +{more} more"
 
             w = tk.Toplevel(self.root)
             w.title("URL Preview")
@@ -645,6 +704,32 @@ class AutoCaptureTool:
     # ==================================================
     #                FILE BROWSING
     # ==================================================
+    def toggle_url_file(self):
+        """Stream URLs from a file (for very long lists), or go back to the text box."""
+        if self.url_file:
+            self.url_file = ""
+            self.url_source_label.config(text="Paste URLs (one per line):")
+            self.url_file_btn.config(text="Load URL File...")
+            self.text_area.configure(state=tk.NORMAL)
+            return
+
+        path = filedialog.askopenfilename(
+            filetypes=[("Text files", "*.txt *.csv *.lst"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        self.url_file = path
+        self.url_source_label.config(text=f"URLs from file: {path}")
+        self.url_file_btn.config(text="Use Pasted URLs")
+        self.text_area.configure(state=tk.DISABLED)
+        self.log(f"URLs will be read from {os.path.basename(path)} during the capture")
+
+    def _url_lines(self):
+        """Lines of the selected URL file (read lazily) or of the text box."""
+        if self.url_file:
+            return iter_source_lines([self.url_file])
+        return io.StringIO(self.text_area.get("1.0", tk.END))
+
     def browse_folder(self):
         folder = filedialog.askdirectory()
         if folder:
@@ -670,10 +755,9 @@ class AutoCaptureTool:
             return
 
         # Close browser if open
-        if self.driver is not None:
+        if self.engine.driver is not None:
             try:
-                self.driver.quit()
-                self.driver = None
+                self.engine.close_browser()
                 self.log("Browser closed before clearing profile")
             except Exception as e:
                 self.log(f"Error closing browser: {e}")
@@ -692,6 +776,69 @@ class AutoCaptureTool:
     # ==================================================
     #                 CAPTURE THREAD
     # ==================================================
+    def _config_from_ui(self):
+        """Read the UI settings into a CaptureConfig. Raises ValueError with a user message."""
+        try:
+            width = int(self.width_var.get())
+        except ValueError:
+            raise ValueError(f"Width must be a number. Got: '{self.width_var.get()}'")
+        try:
+            quality = int(self.quality_var.get())
+        except ValueError:
+            raise ValueError(f"Quality must be a number. Got: '{self.quality_var.get()}'")
+        try:
+            delay = int(self.delay_var.get())
+        except ValueError:
+            raise ValueError(f"Delay must be a number. Got: '{self.delay_var.get()}'")
+        try:
+            settle_timeout = float(self.settle_var.get())
+        except ValueError:
+            raise ValueError(f"Max settle must be a number. Got: '{self.settle_var.get()}'")
+        try:
+            workers = int(self.workers_var.get())
+            per_host = int(self.per_host_var.get())
+        except ValueError:
+            raise ValueError("Parallel browsers and max per host must be numbers.")
+        try:
+            crawl_depth = int(self.crawl_depth_var.get())
+            crawl_max_pages = int(self.crawl_max_pages_var.get())
+        except ValueError:
+            raise ValueError("Discovery depth and max pages must be whole numbers.")
+
+        config = CaptureConfig(
+            save_directory=self.root_save_directory,
+            fmt=self.format_var.get(),
+            quality=quality,
+            width=width,
+            delay=delay,
+            settle_timeout=settle_timeout,
+            load_lazy=self.load_lazy_var.get(),
+            headless=self.headless_var.get(),
+            persist_session=self.persist_session_var.get(),
+            skip_login=self.skip_login_var.get(),
+            include_domain=self.include_domain_var.get(),
+            workers=workers,
+            per_host=per_host,
+            warm_spare=self.warm_spare_var.get(),
+            tile_long_pages=self.tile_var.get(),
+            # Only meaningful for PDF output; ignored for PNG/JPG
+            pdf_bundle=self.pdf_bundle_var.get() and self.format_var.get() == "pdf",
+            crawl=self.crawl_var.get(),
+            crawl_depth=crawl_depth,
+            crawl_max_pages=crawl_max_pages,
+            crawl_scope=self.crawl_scope_var.get(),
+            block_profiles=[name for name, var in self.block_vars.items() if var.get()],
+            # Comma-separated, e.g. "*.gif, *ads.example.com*"
+            block_patterns=[p for p in self.block_patterns_var.get().split(",") if p.strip()],
+            viewports=[self.viewports_var.get()] if self.viewports_var.get().strip() else [],
+            chrome_user_data_dir=self.chrome_user_data_dir,
+            timings_path=default_timings_path(),
+            resume=self.resume_var.get(),
+            prewarm=self.prewarm_var.get(),
+        )
+        config.validate()
+        return config
+
     def start_capture(self):
         folder = self.entry_dir.get().strip()
         if not folder:
@@ -701,42 +848,32 @@ class AutoCaptureTool:
         os.makedirs(folder, exist_ok=True)
         self.root_save_directory = folder
 
-        urls = self.extract_urls(self.text_area.get("1.0", tk.END))
-        if not urls:
+        # URLs are parsed, de-duplicated and turned into work items lazily on the
+        # capture thread; only the first batch is read here
+        self.url_dedup = UrlDeduplicator()
+        try:
+            head, items = peek(
+                iter_work_items(
+                    iter_unique_urls(self._url_lines(), self.url_dedup),
+                    self.format_var.get(),
+                    self.include_domain_var.get(),
+                )
+            )
+        except OSError as e:
+            messagebox.showerror("Error", f"Cannot read URL file:\n{e}")
+            return
+        if not head:
             messagebox.showerror("Error", "No URLs found.")
             return
-
-        # Additional deduplication check (in case extract_urls missed edge cases)
-        # This also handles cases where URLs might be identical after normalization
-        def normalize_url_comparison(url: str) -> str:
-            """Normalize URL for deduplication."""
-            url = url.rstrip(".,;:)").rstrip("/").lower()
-            return url
-
-        seen_urls = set()
-        self.items_to_process = []
-        for u in urls:
-            normalized = normalize_url_comparison(u)
-            if normalized not in seen_urls:
-                seen_urls.add(normalized)
-                self.items_to_process.append(
-                    {
-                        "url": u,
-                        "subdir": self.url_to_filepath(u)[0],
-                        "filename": self.url_to_filepath(u)[1],
-                    }
-                )
-
-        if len(self.items_to_process) < len(urls):
-            duplicates = len(urls) - len(self.items_to_process)
-            self.log(f"Removed {duplicates} duplicate URL(s) after normalization")
+        self.items_to_process = items
 
         # Check server connectivity before starting (unless browser is already open)
-        if not self.browser_opened_for_login and self.driver is None:
-            first_url = self.items_to_process[0]["url"]
+        if not self.engine.browser_opened_for_login and self.engine.driver is None:
             self.log("Checking server connectivity...")
-            is_reachable, error_msg = self.check_server_connectivity(first_url)
-            if not is_reachable:
+            # Every distinct server is probed at once; results are cached for the run
+            reachable, unreachable, errors = partition_reachable(head)
+            if not reachable:
+                error_msg = "\n".join(errors.values())
                 messagebox.showerror(
                     "Server Not Running",
                     f"{error_msg}\n\n"
@@ -747,84 +884,71 @@ class AutoCaptureTool:
                     "4. Then click Start again",
                 )
                 return
-            self.log("Server is reachable!")
-
-        # Validate width and delay inputs
-        try:
-            width = int(self.width_var.get())
-            if width < 100 or width > 5000:
-                messagebox.showerror("Invalid Input", "Width must be between 100 and 5000 pixels.")
-                return
-        except ValueError:
-            messagebox.showerror(
-                "Invalid Input", f"Width must be a number. Got: '{self.width_var.get()}'"
-            )
-            return
+            for origin, message in errors.items():
+                self.log(f"⚠ {origin} is unreachable ({message})")
+            if unreachable:
+                self.log(f"{len(unreachable)} URL(s) on unreachable servers will be skipped")
+            else:
+                self.log("Server is reachable!")
 
+        # Validate width, delay and parallel inputs
         try:
-            delay = int(self.delay_var.get())
-            if delay < 0 or delay > 60:
-                messagebox.showerror("Invalid Input", "Delay must be between 0 and 60 seconds.")
-                return
-        except ValueError:
-            messagebox.showerror(
-                "Invalid Input", f"Delay must be a number. Got: '{self.delay_var.get()}'"
-            )
+            self.engine.config = self._config_from_ui()
+        except ValueError as e:
+            messagebox.showerror("Invalid Input", str(e))
             return
 
-        # Clear failed items from previous capture runs
-        self.failed_items = []
+        # Clear failed items and login tracking from previous capture runs
+        self.engine.reset_session()
 
-        # Reset login tracking for new capture session
-        self.user_logged_in = False
-        self.login_prompt_shown = False
-        self.consecutive_connection_errors = 0
+        self._start_engine(len(head))
+        self.log("Started capture.")
 
+    def _start_engine(self, expected_total):
+        """Run the engine on a background thread over self.items_to_process."""
         self.is_running = True
         self.stop_btn.config(state=tk.NORMAL)
         self.start_btn.config(state=tk.DISABLED)
 
-        self.progress_bar["maximum"] = len(self.items_to_process)
+        # Streamed lists grow the maximum as the engine reads them
+        self.progress_bar["maximum"] = expected_total
         self.progress_bar["value"] = 0
 
         threading.Thread(target=self._capture_loop, daemon=True).start()
-        self.log("Started capture.")
 
     def stop_capture(self):
         self.is_running = False
-        self.log("Stopping capture...")
-        if self.driver:
-            try:
-                self.driver.execute_script("window.stop();")  # Stop page loading
-            except Exception:
-                pass
+        self.engine.stop()
 
     def retry_failed(self):
         """Retry all failed captures."""
-        if not self.failed_items:
+        if not self.engine.failed_items:
             messagebox.showinfo("Retry", "No failed items to retry.")
             return
 
-        self.log(f"Retrying {len(self.failed_items)} failed items...")
-        self.items_to_process = self.failed_items.copy()
-        self.failed_items = []
+        try:
+            self.engine.config = self._config_from_ui()
+        except ValueError as e:
+            messagebox.showerror("Invalid Input", str(e))
+            return
 
-        self.is_running = True
-        self.stop_btn.config(state=tk.NORMAL)
-        self.start_btn.config(state=tk.DISABLED)
+        # Failed pages were already discovered - don't crawl from them again
+        self.engine.config.crawl = False
+
+        self.log(f"Retrying {len(self.engine.failed_items)} failed items...")
+        self.items_to_process = self.engine.failed_items.copy()
+        self.engine.failed_items = []
+        self.url_dedup = None
         self.retry_btn.config(state=tk.DISABLED)
 
-        self.progress_bar["maximum"] = len(self.items_to_process)
-        self.progress_bar["value"] = 0
-
-        threading.Thread(target=self._capture_loop, daemon=True).start()
+        self._start_engine(len(self.items_to_process))
 
     # ==================================================
     #              BROWSER INITIALIZATION
     # ==================================================
     def open_browser_for_login(self):
         """Open browser for manual login before capturing."""
-        if self.driver is not None:
+        if self.engine.driver is not None:
             messagebox.showinfo(
                 "Browser Open",
                 "Browser is already open. Close it first if you want to start fresh.",
@@ -833,29 +957,13 @@ class AutoCaptureTool:
 
         # Validate width input
         try:
-            width = int(self.width_var.get())
-            if width < 100 or width > 5000:
-                messagebox.showerror("Invalid Input", "Width must be between 100 and 5000 pixels.")
-                return
-        except ValueError:
-            messagebox.showerror(
-                "Invalid Input", f"Width must be a number. Got: '{self.width_var.get()}'"
-            )
+            self.engine.config = self._config_from_ui()
+        except ValueError as e:
+            messagebox.showerror("Invalid Input", str(e))
             return
-        options = Options()
-
-        # Use persistent profile if enabled
-        if self.persist_session_var.get():
-            options.add_argument(f"--user-data-dir={self.chrome_user_data_dir}")
-            self.log("Using persistent Chrome profile for login sessions")
 
         try:
-            self.log("Opening browser for manual login...")
-            self.driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()), options=options
-            )
-            self.driver.set_window_size(width, 900)
-            self.browser_opened_for_login = True
+            self.engine.open_login_browser()
             self.log("Browser opened. Log in to sites as needed, then click 'Start' to capture.")
             messagebox.showinfo(
                 "Browser Opened",
@@ -872,335 +980,24 @@ class AutoCaptureTool:
     # ==================================================
     def _capture_loop(self):
         try:
-            # Input validation already done in start_capture, but validate again for safety
-            try:
-                width = int(self.width_var.get())
-                if width < 100 or width > 5000:
-                    self.log(f"ERROR: Invalid width {width}, using default 1400")
-                    width = 1400
-            except (ValueError, AttributeError):
-                self.log("ERROR: Invalid width value, using default 1400")
-                width = 1400
+            finished = self.engine.run(self.items_to_process)
+            if self.url_dedup is not None and self.url_dedup.duplicates:
+                self.log(f"Removed {self.url_dedup.duplicates} duplicate URL(s) after normalization")
+            if finished:
+                total = self.engine.total_count
+                failed_count = len(self.engine.failed_items)
+                success_count = total - failed_count
 
-            try:
-                delay = int(self.delay_var.get())
-                if delay < 0 or delay > 60:
-                    self.log(f"ERROR: Invalid delay {delay}, using default 2")
-                    delay = 2
-            except (ValueError, AttributeError):
-                self.log("ERROR: Invalid delay value, using default 2")
-                delay = 2
-
-            # Initialize browser if not already open
-            if self.driver is None:
-                options = Options()
-
-                # Add headless mode if enabled
-                if self.headless_var.get():
-                    options.add_argument("--headless=new")
-
-                # Use persistent profile if enabled
-                if self.persist_session_var.get():
-                    options.add_argument(f"--user-data-dir={self.chrome_user_data_dir}")
-                    self.log("Using persistent Chrome profile")
-                # Note: Cookies are allowed during the session to maintain login state between pages
-                # If you want to clear cookies between runs, close and reopen the browser
-
-                def init_driver():
-                    self.log("Initializing browser...")
-                    new_driver = webdriver.Chrome(
-                        service=Service(ChromeDriverManager().install()), options=options
-                    )
-                    new_driver.set_window_size(width, 900)
-                    # Set page load timeout
-                    new_driver.set_page_load_timeout(60)
-                    return new_driver
-
-                self.driver = init_driver()
-            else:
-                # Browser already open (from login), just resize it
-                self.driver.set_window_size(width, 900)
-                self.driver.set_page_load_timeout(60)
-                self.log("Reusing existing browser session")
-            total = len(self.items_to_process)
-
-            # Maximum retries for failed captures
-            MAX_RETRIES = 2
-
-            for i, item in enumerate(self.items_to_process):
-                if not self.is_running:
-                    self.log("Capture stopped by user")
-                    break
-
-                # Log progress
-                progress_msg = f"[{i+1}/{total}] Processing: {item['url']}"
-                self.log(progress_msg)
-                self._update_progress(f"[{i+1}/{total}] {item['url']}", i)
-
-                # CHECK IF BROWSER IS STILL OPEN (only restart if actually closed)
-                if self.driver is None:
-                    self.log("Browser is None - initializing...")
-                    try:
-                        options = Options()
-                        if self.persist_session_var.get():
-                            options.add_argument(f"--user-data-dir={self.chrome_user_data_dir}")
-                        if self.headless_var.get():
-                            options.add_argument("--headless=new")
-                        self.driver = webdriver.Chrome(
-                            service=Service(ChromeDriverManager().install()), options=options
-                        )
-                        self.driver.set_window_size(width, 900)
-                        self.driver.set_page_load_timeout(60)
-                        self.log("Browser initialized successfully")
-                    except Exception as init_err:
-                        self.log(f"Failed to initialize browser: {init_err}")
-                        self.failed_items.append(item)
-                        continue
-                else:
-                    # Only check browser health if driver exists - don't restart unnecessarily
-                    try:
-                        # Quick check - try to get window handles (lightweight operation)
-                        _ = self.driver.window_handles
-                    except Exception as browser_check_err:
-                        # Only restart on specific exceptions that indicate browser is actually closed
-                        error_str = str(browser_check_err).lower()
-                        if any(
-                            keyword in error_str
-                            for keyword in [
-                                "invalid session id",
-                                "no such window",
-                                "session deleted",
-                                "target frame detached",
-                            ]
-                        ):
-                            self.log("Browser was closed. Attempting to restart...")
-                            try:
-                                # Recreate browser with same options
-                                options = Options()
-                                if self.persist_session_var.get():
-                                    options.add_argument(
-                                        f"--user-data-dir={self.chrome_user_data_dir}"
-                                    )
-                                # Note: Cookies are allowed during the session to maintain login state
-                                if self.headless_var.get():
-                                    options.add_argument("--headless=new")
-                                self.driver = webdriver.Chrome(
-                                    service=Service(ChromeDriverManager().install()),
-                                    options=options,
-                                )
-                                self.driver.set_window_size(width, 900)
-                                self.driver.set_page_load_timeout(60)
-                                self.browser_opened_for_login = (
-                                    False  # Reset flag since we're recreating
-                                )
-                                self.log("Browser restarted successfully")
-                            except Exception as re_init_err:
-                                self.log(f"Failed to restart browser: {re_init_err}")
-                                self.failed_items.append(item)
-                                continue
-                        # If it's not a fatal error, continue - browser might still work
-
-                url = item["url"]
-
-                # Retry logic for failed captures
-                capture_success = False
-                for attempt in range(MAX_RETRIES + 1):
-                    if not self.is_running:
-                        break
-
-                    try:
-                        self.driver.get(url)
-
-                        # Wait for page to load (wait for document.readyState)
-                        try:
-                            WebDriverWait(self.driver, delay + 5).until(
-                                lambda d: d.execute_script("return document.readyState")
-                                == "complete"
-                            )
-                        except TimeoutException:
-                            if attempt < MAX_RETRIES:
-                                self.log(
-                                    f"Retry {attempt + 1}/{MAX_RETRIES} for {url} (page load timeout)"
-                                )
-                                time.sleep(2)
-                                continue
-                            else:
-                                self.log(
-                                    f"Warning: Page load timeout for {url}, proceeding anyway..."
-                                )
-
-                        # Additional wait for dynamic content
-                        time.sleep(1)
-
-                        # Check if we're stuck on a login page
-                        current_url = self.driver.current_url.lower()
-                        original_url_lower = url.lower()
-                        page_title = self.driver.title.lower()
-                        page_source = self.driver.page_source.lower()[
-                            :10000
-                        ]  # Sample first 10k chars for performance
-
-                        # Common login page indicators (only check if URL changed significantly)
-                        is_login_page = False
-                        if current_url != original_url_lower:
-                            login_indicators = [
-                                "/login" in current_url
-                                or "/signin" in current_url
-                                or "/auth" in current_url,
-                                "sign in" in page_title or "log in" in page_title,
-                                "authentication required" in page_title,
-                                (
-                                    ("password" in page_source and "email" in page_source)
-                                    or ("password" in page_source and "username" in page_source)
-                                )
-                                and len(page_source) < 30000,
-                            ]
-                            is_login_page = any(login_indicators)
-
-                        if is_login_page:
-                            if self.skip_login_var.get():
-                                self.log(f"SKIPPED (login required): {url}")
-                                self.failed_items.append(item)
-                                capture_success = False
-                                break
-                            elif self.login_prompt_shown and not self.user_logged_in:
-                                # Already showed login prompt and user didn't log in - skip waiting
-                                self.log(f"⚠ LOGIN REQUIRED: {url} (capturing login page)")
-                                # Capture the login page but mark as needing retry
-                                self.failed_items.append(item)
-                            else:
-                                # First time seeing login page - give user a chance to log in
-                                self.log(f"⚠ LOGIN PAGE DETECTED: {self.driver.current_url}")
-                                self.log(f"   Original URL: {url}")
-
-                                if not self.login_prompt_shown:
-                                    self.login_prompt_shown = True
-                                    self.log(
-                                        "👉 Log in now in the browser window (waiting 10 seconds)..."
-                                    )
-                                    self.log(
-                                        "   TIP: Use 'Open Browser' button next time to log in first!"
-                                    )
-
-                                    # Wait up to 10 seconds for user to log in (reduced from 30)
-                                    login_page_url = current_url
-                                    for wait_attempt in range(2):  # 2 * 5 = 10 seconds
-                                        time.sleep(5)
-                                        if not self.is_running:
-                                            break
-                                        try:
-                                            current_url_after_wait = self.driver.current_url.lower()
-                                            if (
-                                                current_url_after_wait != login_page_url
-                                                and "/login" not in current_url_after_wait
-                                                and "/signin" not in current_url_after_wait
-                                            ):
-                                                self.log(
-                                                    "✓ Login detected! Continuing with authenticated session..."
-                                                )
-                                                self.user_logged_in = True
-                                                # Re-navigate to original URL now that we're logged in
-                                                self.driver.get(url)
-                                                time.sleep(2)
-                                                break
-                                        except Exception:
-                                            break
-
-                                    if not self.user_logged_in:
-                                        self.log(
-                                            "⚠ No login detected. Capturing login pages for protected URLs."
-                                        )
-                                        self.log(
-                                            "   To capture actual pages: Stop, click 'Open Browser', log in, then Start again."
-                                        )
-                                        self.failed_items.append(item)
-
-                                self.log("Continuing...")
-
-                        # Cookies are preserved between pages to maintain login sessions
-                        # This allows capturing multiple pages from the same site without re-authenticating
-
-                        self._update_progress("Capturing...", i)
-                        screenshot = self._capture_full_page()
-
-                        self._save_file(item, screenshot)
-                        self.log(f"✓ Saved {item['filename']}")
-                        capture_success = True
-                        break
-
-                    except TimeoutException as e:
-                        if attempt < MAX_RETRIES:
-                            self.log(f"Retry {attempt + 1}/{MAX_RETRIES} for {url} (timeout)")
-                            time.sleep(2)
-                        else:
-                            self.log(f"Failed after {MAX_RETRIES + 1} attempts: {url} - {e}")
-                            self.failed_items.append(item)
-                    except Exception as e:
-                        error_str = str(e)
-
-                        # Track connection refused errors
-                        if "net::ERR_CONNECTION_REFUSED" in error_str:
-                            self.consecutive_connection_errors += 1
-                            if self.consecutive_connection_errors >= 3:
-                                self.log("=" * 50)
-                                self.log("❌ SERVER NOT RUNNING - Stopping capture")
-                                self.log("=" * 50)
-                                self.log("Your development server is not running.")
-                                self.log("Steps to fix:")
-                                self.log("  1. Open a terminal in your project folder")
-                                self.log("  2. Run: npm run dev")
-                                self.log("  3. Wait for 'Ready' message")
-                                self.log("  4. Then click Start again")
-                                self.is_running = False
-                                # Add remaining items to failed list
-                                remaining_items = self.items_to_process[i:]
-                                self.failed_items.extend(remaining_items)
-                                break
-
-                        if attempt < MAX_RETRIES:
-                            self.log(
-                                f"Retry {attempt + 1}/{MAX_RETRIES} for {url} (error: {str(e)[:50]})"
-                            )
-                            time.sleep(2)
-                        else:
-                            self.log(f"Error on {url} after {MAX_RETRIES + 1} attempts: {e}")
-                            self.failed_items.append(item)
-                            if "net::ERR_CONNECTION_REFUSED" in error_str:
-                                self.log(
-                                    "⚠ Server connection refused - is your dev server running?"
-                                )
-
-                # Reset connection error counter on successful capture
-                if capture_success:
-                    self.consecutive_connection_errors = 0
-
-                if not capture_success:
-                    self.log(f"Failed to capture {url}")
-                    continue
-
-            if self.is_running:
-                self.log(f"Finished processing all {total} URLs")
-                # Update progress bar to 100% on completion
-                self._update_progress("Complete", len(self.items_to_process))
-
-                # Calculate success count
-                success_count = total - len(self.failed_items)
-                self.log(
-                    f"Summary: {success_count} succeeded, {len(self.failed_items)} failed out of {total} total"
-                )
-
-                if self.failed_items:
-                    self.log(f"Failed URLs: {[item['url'] for item in self.failed_items]}")
+                if failed_count:
 
                     def show_warning():
                         messagebox.showwarning(
                             "Done with Errors",
-                            f"Capture completed:\n{success_count} succeeded\n{len(self.failed_items)} failed\n\nClick 'Retry Failed' to retry the failed URLs.",
+                            f"Capture completed:\n{success_count} succeeded\n{failed_count} failed\n\nClick 'Retry Failed' to retry the failed URLs.",
                         )
 
                     self.root.after(0, show_warning)
                 else:
-                    self.log("Capture process finished successfully - all URLs captured!")
 
                     def show_success():
                         messagebox.showinfo(
@@ -1208,31 +1005,21 @@ class AutoCaptureTool:
                         )
 
                     self.root.after(0, show_success)
-
-        except Exception as e:
-            self.log(f"Fatal error: {e}")
-
         finally:
-            # Only close browser if it was created during capture (not opened for login)
-            if self.driver is not None and not self.browser_opened_for_login:
-                try:
-                    self.driver.quit()
-                    self.driver = None
-                    self.log("Browser closed")
-                except Exception:
-                    pass
             self.root.after(0, self._reset_ui)
 
     # ==================================================
     #              UPDATE PROGRESS BAR
     # ==================================================
     def _update_progress(self, msg, value):
-        """Thread-safe progress update."""
-        self.root.after(0, self._do_update_progress, msg, value)
+        """Thread-safe progress update; only the latest one per frame is drawn."""
+        self._pending_progress = (msg, value)
 
     def _do_update_progress(self, msg, value):
         """Internal method - runs on main thread."""
         self.progress_var.set(msg)
+        # Streamed lists and discovery mode add pages while the run is going
+        self.progress_bar["maximum"] = max(self.engine.total_count, 1)
         self.progress_bar["value"] = value
 
     # ==================================================
@@ -1242,7 +1029,7 @@ class AutoCaptureTool:
         self.start_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
         # Enable retry button only if there are failed items
-        if self.failed_items:
+        if self.engine.failed_items:
             self.retry_btn.config(state=tk.NORMAL)
         else:
             self.retry_btn.config(state=tk.DISABLED)
@@ -1250,100 +1037,6 @@ class AutoCaptureTool:
         # Note: browser is kept open if it was opened for login
         # User can close it manually or start a new capture
 
-    # ==================================================
-    #        FULL PAGE SCREENSHOT CAPTURE
-    # ==================================================
-    def _capture_full_page(self):
-        total_height = self.driver.execute_script(
-            "return Math.max("
-            "document.body.scrollHeight,"
-            "document.documentElement.scrollHeight)"
-        )
-
-        browser_width = int(self.width_var.get())
-        MAX_CAPTURE_HEIGHT = 16000  # Windows-safe limit
-        max_height = min(total_height + 200, MAX_CAPTURE_HEIGHT)
-
-        # Warn if page is longer than capture limit
-        if total_height > MAX_CAPTURE_HEIGHT:
-            self.log(
-                f"⚠ WARNING: Page height ({total_height}px) exceeds capture limit ({MAX_CAPTURE_HEIGHT}px)"
-            )
-            self.log(
-                "   Page will be truncated. Consider using a tiling strategy for very long pages."
-            )
-
-        self.driver.set_window_size(browser_width, max_height)
-        time.sleep(0.3)
-
-        scroll_pos = 0
-        while scroll_pos < total_height:
-            self.driver.execute_script(f"window.scrollTo(0, {scroll_pos});")
-            time.sleep(0.15)
-            scroll_pos += 800
-
-        self.driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(0.2)
-
-        data = self.driver.execute_cdp_cmd(
-            "Page.captureScreenshot", {"format": "png", "captureBeyondViewport": True}
-        )
-
-        return base64.b64decode(data["data"])
-
-    # ==================================================
-    #                  SAVE FILES
-    # ==================================================
-    def _get_unique_filepath(self, folder: str, filename: str) -> str:
-        """Get a unique filepath, appending counter if file exists."""
-        filepath = os.path.join(folder, filename)
-        if not os.path.exists(filepath):
-            return filepath
-
-        base, ext = os.path.splitext(filename)
-        counter = 1
-        while os.path.exists(filepath):
-            filepath = os.path.join(folder, f"{base}_{counter}{ext}")
-            counter += 1
-        return filepath
-
-    def _save_file(self, item, screenshot_bytes):
-        """Save screenshot file with Windows-safe path handling."""
-        folder = (
-            os.path.join(self.root_save_directory, item["subdir"])
-            if item["subdir"]
-            else self.root_save_directory
-        )
-
-        # Ensure folder path is absolute and normalized for Windows
-        folder = os.path.normpath(os.path.abspath(folder))
-
-        try:
-            os.makedirs(folder, exist_ok=True)
-        except OSError as e:
-            self.log(f"Error creating folder {folder}: {e}")
-            # Fallback to root directory if subfolder creation fails
-            folder = self.root_save_directory
-            os.makedirs(folder, exist_ok=True)
-
-        filepath = self._get_unique_filepath(folder, item["filename"])
-        fmt = self.format_var.get()
-
-        if fmt == "png":
-            with open(filepath, "wb") as f:
-                f.write(screenshot_bytes)
-
-        else:
-            img = Image.open(io.BytesIO(screenshot_bytes))
-            img = AutoCaptureTool.flatten_rgba(img)
-
-            if fmt == "jpg":
-                img.save(filepath, "JPEG", quality=90)
-            elif fmt == "pdf":
-                img.save(filepath, "PDF", resolution=100)
-
-        print("Saved:", filepath)
-
     # ==================================================
     #                  ZIP FILES
     # ==================================================
@@ -1379,9 +1072,6 @@ class AutoCaptureTool:
 
     def _create_zip_files(self, zip_path_base):
         """Create zip file(s) from all files in save directory. Splits if > 29MB."""
-        MAX_ZIP_SIZE = 29 * 1024 * 1024  # 29 MB in bytes
-
-        current_zip = None  # Track current zip file for cleanup in finally block
         try:
             self.log("Starting zip creation...")
 
@@ -1391,91 +1081,22 @@ class AutoCaptureTool:
 
             self.root.after(0, disable_button)
 
-            # Collect all files to zip
-            files_to_zip = []
-            save_dir = self.root_save_directory
-
-            for root, dirs, filenames in os.walk(save_dir):
-                # Skip zip files themselves
-                for filename in filenames:
-                    if filename.endswith(".zip"):
-                        continue
-                    filepath = os.path.join(root, filename)
-                    # Get relative path from save directory for archive
-                    rel_path = os.path.relpath(filepath, save_dir)
-                    file_size = os.path.getsize(filepath)
-                    files_to_zip.append((filepath, rel_path, file_size))
+            zip_files_created = create_zip_archives(
+                self.root_save_directory, zip_path_base, log=self.log
+            )
 
-            if not files_to_zip:
+            if not zip_files_created:
 
                 def show_no_files():
                     messagebox.showinfo("Zip", "No files found to zip.")
-                    self.zip_btn.config(state=tk.NORMAL)
 
                 self.root.after(0, show_no_files)
                 return
 
-            self.log(f"Found {len(files_to_zip)} file(s) to zip...")
-
-            # Determine base name and directory for zip files
-            zip_dir = os.path.dirname(zip_path_base)
-            zip_basename = os.path.splitext(os.path.basename(zip_path_base))[0]
-            zip_ext = os.path.splitext(zip_path_base)[1]
-
-            # Create first zip file
-            zip_index = 1
-            current_zip_path = os.path.join(zip_dir, f"{zip_basename}{zip_ext}")
-            current_zip = zipfile.ZipFile(current_zip_path, "w", zipfile.ZIP_DEFLATED)
-            zip_files_created = []
-
-            for filepath, rel_path, file_size in files_to_zip:
-                # Check current zip file size on disk
-                # Note: ZipFile doesn't have flush(), we track size by checking the file on disk
-                # Close and reopen if needed, or just check file size directly
-                current_zip_size = (
-                    os.path.getsize(current_zip_path) if os.path.exists(current_zip_path) else 0
-                )
-
-                # Estimate compressed size (conservative: assume 40% compression for images)
-                # Add overhead for ZIP entry metadata
-                estimated_size_after_add = current_zip_size + (file_size * 0.4) + 500
-
-                # If adding this file would exceed limit, start a new zip
-                if estimated_size_after_add > MAX_ZIP_SIZE and current_zip_size > 0:
-                    # Close current zip
-                    current_zip.close()
-                    actual_size = os.path.getsize(current_zip_path)
-                    zip_files_created.append(current_zip_path)
-                    self.log(
-                        f"Created {os.path.basename(current_zip_path)} ({actual_size / 1024 / 1024:.2f} MB)"
-                    )
-
-                    # Start new zip
-                    zip_index += 1
-                    current_zip_path = os.path.join(
-                        zip_dir, f"{zip_basename}_part{zip_index}{zip_ext}"
-                    )
-                    current_zip = zipfile.ZipFile(current_zip_path, "w", zipfile.ZIP_DEFLATED)
-
-                # Add file to current zip
-                try:
-                    current_zip.write(filepath, rel_path)
-                    self.log(f"Added: {rel_path}")
-                except Exception as e:
-                    self.log(f"Error adding {rel_path}: {e}")
-
-            # Close the last zip file
-            current_zip.close()
-            zip_files_created.append(current_zip_path)
-
-            # Get actual file size
-            final_size = os.path.getsize(current_zip_path)
-            final_size_mb = final_size / 1024 / 1024
-            self.log(f"Created {os.path.basename(current_zip_path)} ({final_size_mb:.2f} MB)")
-
             # Show completion message (must be called from main thread)
             def show_completion():
                 if len(zip_files_created) == 1:
+                    final_size_mb = os.path.getsize(zip_files_created[0]) / 1024 / 1024
                     messagebox.showinfo(
                         "Zip Complete",
                         f"Successfully created zip file:\n{os.path.basename(zip_files_created[0])}\n\nSize: {final_size_mb:.2f} MB",
@@ -1507,13 +1128,6 @@ class AutoCaptureTool:
 
             self.root.after(0, show_error)
         finally:
-            # Ensure zip file is closed even if an exception occurred
-            if current_zip is not None:
-                try:
-                    current_zip.close()
-                except Exception:
-                    pass  # Ignore errors when closing in cleanup
-
             # Re-enable button on main thread (thread-safe GUI modification)
             def enable_button():
                 self.zip_btn.config(state=tk.NORMAL)
@@ -1528,3 +1142,4 @@ if __name__ == "__main__":
     root = tk.Tk()
     app = AutoCaptureTool(root)
     root.mainloop()
+    app.log_sink.close()
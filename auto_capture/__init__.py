@@ -0,0 +1,24 @@
+"""
+Auto Capture - headless full-page screenshot engine.
+
+The tkinter GUI in Auto_Capture_Tool.py and the ``auto-capture`` command line
+are both thin clients of CaptureEngine.
+"""
+
+from .config import CaptureConfig
+from .connectivity import check_server_connectivity, partition_reachable
+from .engine import CaptureEngine
+from .urls import build_work_items, extract_urls, url_to_filepath, validate_url
+from .work_queue import CaptureQueue
+
+__all__ = [
+    "CaptureConfig",
+    "CaptureEngine",
+    "CaptureQueue",
+    "build_work_items",
+    "check_server_connectivity",
+    "extract_urls",
+    "partition_reachable",
+    "url_to_filepath",
+    "validate_url",
+]
@@ -0,0 +1,7 @@
+"""Allow ``python -m auto_capture``."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Zip archiving of a capture folder, split into parts below a size limit.
+
+- PNG/JPG/PDF (and other already-compressed formats) are stored as-is;
+  deflating them again costs CPU and saves almost nothing.
+- Everything else is deflated on a thread pool (zlib releases the GIL) ahead
+  of the writer, with a bounded look-ahead so memory stays flat.
+- Entries are written by a small zip writer that knows every header size
+  up front, so parts are split on the exact number of bytes the finished
+  archive will have rather than an estimate.
+"""
+
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .journal import JOURNAL_FILENAME
+
+MAX_ZIP_SIZE = 29 * 1024 * 1024  # 29 MB in bytes
+
+# Formats that are already compressed - store them without recompressing
+STORED_EXTENSIONS = {
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".webp",
+    ".gif",
+    ".pdf",
+    ".zip",
+    ".gz",
+    ".7z",
+    ".mp4",
+    ".webm",
+}
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+_UTF8_FLAG = 0x0800
+_ZIP32_LIMIT = 0xFFFFFFFF
+_MAX_ENTRIES = 0xFFFF
+_COPY_CHUNK = 1024 * 1024
+
+
+def _dos_datetime(timestamp: float):
+    t = time.localtime(max(timestamp, 315532800))  # Zip dates start at 1980
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+class _Entry:
+    """One file to archive, with everything needed to size its headers."""
+
+    def __init__(self, filepath: str, arcname: str):
+        self.filepath = filepath
+        self.arcname = arcname.replace(os.sep, "/")
+        self.name_bytes = self.arcname.encode("utf-8")
+        stat = os.stat(filepath)
+        self.file_size = stat.st_size
+        self.dos_time, self.dos_date = _dos_datetime(stat.st_mtime)
+        stored = os.path.splitext(filepath)[1].lower() in STORED_EXTENSIONS
+        self.method = ZIP_STORED if stored else ZIP_DEFLATED
+        self.crc = 0
+        self.compressed = None  # Deflated bytes, filled in by prepare()
+        self.compressed_size = self.file_size
+        self.offset = 0
+
+    @property
+    def archive_size(self) -> int:
+        """Bytes this entry adds to a finished archive (local + central records)."""
+        name_len = len(self.name_bytes)
+        return (
+            _LOCAL_HEADER.size + name_len + self.compressed_size + _CENTRAL_HEADER.size + name_len
+        )
+
+    def prepare(self):
+        """Deflate the file (worker thread). Falls back to storing if it doesn't shrink."""
+        if self.method != ZIP_DEFLATED:
+            return self
+        with open(self.filepath, "rb") as f:
+            data = f.read()
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+        self.crc = zlib.crc32(data)
+        if len(compressed) >= len(data):
+            self.method = ZIP_STORED
+        else:
+            self.compressed = compressed
+            self.compressed_size = len(compressed)
+        return self
+
+
+class _ZipPartWriter:
+    """Minimal sequential zip writer (no ZIP64) with exact size accounting."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = []
+        self._f = open(path, "wb")
+        self.size = _END_RECORD.size  # Bytes the archive will have once closed
+
+    def _local_header(self, entry: _Entry) -> bytes:
+        return _LOCAL_HEADER.pack(
+            0x04034B50,
+            20,
+            _UTF8_FLAG,
+            entry.method,
+            entry.dos_time,
+            entry.dos_date,
+            entry.crc,
+            entry.compressed_size,
+            entry.file_size,
+            len(entry.name_bytes),
+            0,
+        )
+
+    def add(self, entry: _Entry):
+        entry.offset = self._f.tell()
+        try:
+            self._write_entry(entry)
+        except Exception:
+            # Unreadable file: roll the archive back to before this entry
+            self._f.seek(entry.offset)
+            self._f.truncate()
+            raise
+        self.entries.append(entry)
+        self.size += entry.archive_size
+
+    def _write_entry(self, entry: _Entry):
+        self._f.write(self._local_header(entry))
+        self._f.write(entry.name_bytes)
+
+        if entry.method == ZIP_DEFLATED:
+            self._f.write(entry.compressed)
+            entry.compressed = None  # Release memory as soon as it's written
+        else:
+            # Stream the file and compute its CRC on the way, then patch the header
+            crc = 0
+            written = 0
+            with open(entry.filepath, "rb") as src:
+                while True:
+                    chunk = src.read(_COPY_CHUNK)
+                    if not chunk:
+                        break
+                    crc = zlib.crc32(chunk, crc)
+                    written += len(chunk)
+                    self._f.write(chunk)
+            entry.crc = crc
+            # In case the file changed since it was listed
+            entry.file_size = entry.compressed_size = written
+            end = self._f.tell()
+            self._f.seek(entry.offset)
+            self._f.write(self._local_header(entry))
+            self._f.seek(end)
+
+    def close(self):
+        cd_offset = self._f.tell()
+        for entry in self.entries:
+            self._f.write(
+                _CENTRAL_HEADER.pack(
+                    0x02014B50,
+                    20,
+                    20,
+                    _UTF8_FLAG,
+                    entry.method,
+                    entry.dos_time,
+                    entry.dos_date,
+                    entry.crc,
+                    entry.compressed_size,
+                    entry.file_size,
+                    len(entry.name_bytes),
+                    0,
+                    0,
+                    0,
+                    0,
+                    0,
+                    entry.offset,
+                )
+            )
+            self._f.write(entry.name_bytes)
+        cd_size = self._f.tell() - cd_offset
+        count = len(self.entries)
+        self._f.write(_END_RECORD.pack(0x06054B50, 0, 0, count, count, cd_size, cd_offset, 0))
+        self._f.close()
+
+
+def collect_files(save_dir: str):
+    """(filepath, archive name) for every file under save_dir, skipping zips and the journal."""
+    files = []
+    for root, dirs, filenames in os.walk(save_dir):
+        for filename in sorted(filenames):
+            # Skip zip files themselves and the capture journal
+            if filename.endswith(".zip") or filename.startswith(JOURNAL_FILENAME):
+                continue
+            filepath = os.path.join(root, filename)
+            files.append((filepath, os.path.relpath(filepath, save_dir)))
+    return files
+
+
+def create_zip_archives(
+    save_dir: str, zip_path_base: str, max_size: int = MAX_ZIP_SIZE, log=None, max_workers=None
+):
+    """Zip every file under save_dir into zip_path_base (+ _partN) archives.
+
+    Returns the list of archive paths created (empty if there was nothing to zip).
+    """
+    log = log or (lambda message: None)
+    files = collect_files(save_dir)
+    if not files:
+        return []
+    log(f"Found {len(files)} file(s) to zip...")
+
+    # Determine base name and directory for zip files
+    zip_dir = os.path.dirname(zip_path_base)
+    zip_basename, zip_ext = os.path.splitext(os.path.basename(zip_path_base))
+
+    def part_path(index: int) -> str:
+        if index == 1:
+            return os.path.join(zip_dir, f"{zip_basename}{zip_ext}")
+        return os.path.join(zip_dir, f"{zip_basename}_part{index}{zip_ext}")
+
+    entries = []
+    for filepath, rel_path in files:
+        try:
+            entry = _Entry(filepath, rel_path)
+        except OSError as e:
+            log(f"Error adding {rel_path}: {e}")
+            continue
+        if entry.file_size >= _ZIP32_LIMIT:
+            log(f"Skipping {rel_path}: files over 4 GB are not supported")
+            continue
+        entries.append(entry)
+
+    created = []
+    current = None
+    max_workers = max_workers or min(8, os.cpu_count() or 1)
+    lookahead = max_workers * 2  # Bounds how much deflated data is held in memory
+
+    def finish_part():
+        current.close()
+        created.append(current.path)
+        log(f"Created {os.path.basename(current.path)} ({current.size / 1024 / 1024:.2f} MB)")
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = []  # (entry, future) in archive order
+            next_index = 0
+            while next_index < len(entries) or pending:
+                while next_index < len(entries) and len(pending) < lookahead:
+                    entry = entries[next_index]
+                    pending.append((entry, executor.submit(entry.prepare)))
+                    next_index += 1
+                entry, future = pending.pop(0)
+                try:
+                    future.result()
+                except OSError as e:
+                    log(f"Error adding {entry.arcname}: {e}")
+                    continue
+
+                # Start a new part if this entry would push the current one over the limit
+                if current is not None and current.entries and (
+                    current.size + entry.archive_size > max_size
+                    or len(current.entries) >= _MAX_ENTRIES
+                ):
+                    finish_part()
+                    current = None
+                if current is None:
+                    current = _ZipPartWriter(part_path(len(created) + 1))
+                if _END_RECORD.size + entry.archive_size > max_size:
+                    log(f"Warning: {entry.arcname} alone exceeds the size limit")
+
+                try:
+                    current.add(entry)
+                except OSError as e:
+                    log(f"Error adding {entry.arcname}: {e}")
+                    continue
+                log(f"Added: {entry.arcname}")
+
+        if current is not None:
+            finish_part()
+            current = None
+    finally:
+        if current is not None:
+            # Failed mid-part: close what we have so the file handle isn't leaked
+            current.close()
+    return created
@@ -0,0 +1,86 @@
+"""
+Resource blocking - skip requests that don't change what a capture shows.
+
+Blocking is applied once per browser session with CDP Network.setBlockedURLs,
+so Chrome fails matching requests before they go out. Blocked requests end as
+Network.loadingFailed, which the settle check treats like any finished request.
+Patterns use Chrome's wildcard syntax (``*`` matches any characters).
+"""
+
+from .config import VALID_BLOCK_PROFILES
+
+TRACKERS, CHAT, MEDIA = VALID_BLOCK_PROFILES
+
+BLOCK_PROFILES = {
+    # Analytics, tag managers, ad and tracking pixels
+    TRACKERS: (
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*googleadservices.com*",
+        "*doubleclick.net*",
+        "*googlesyndication.com*",
+        "*connect.facebook.net*",
+        "*facebook.com/tr*",
+        "*analytics.tiktok.com*",
+        "*snap.licdn.com*",
+        "*static.hotjar.com*",
+        "*script.hotjar.com*",
+        "*clarity.ms*",
+        "*cdn.segment.com*",
+        "*api.segment.io*",
+        "*cdn.mxpnl.com*",
+        "*api-js.mixpanel.com*",
+        "*cdn.amplitude.com*",
+        "*js.hs-analytics.net*",
+        "*js.hs-scripts.com*",
+        "*plausible.io/js*",
+        "*bat.bing.com*",
+        "*sentry-cdn.com*",
+        "*browser.sentry-cdn.com*",
+        "*js-agent.newrelic.com*",
+        "*fullstory.com*",
+        "*quantserve.com*",
+        "*scorecardresearch.com*",
+    ),
+    # Chat and support widgets (they float over the page in screenshots, too)
+    CHAT: (
+        "*widget.intercom.io*",
+        "*js.intercomcdn.com*",
+        "*js.driftt.com*",
+        "*static.zdassets.com*",
+        "*embed.tawk.to*",
+        "*client.crisp.chat*",
+        "*code.tidio.co*",
+        "*cdn.livechatinc.com*",
+    ),
+    # Audio/video: a still capture only needs the poster frame. (No "*.ts" - dev
+    # servers such as Vite serve TypeScript modules with that extension.)
+    MEDIA: (
+        "*.mp4*",
+        "*.webm*",
+        "*.m4v*",
+        "*.mov*",
+        "*.m3u8*",
+        "*.mp3*",
+        "*.m4a*",
+        "*.ogg*",
+        "*.wav*",
+    ),
+}
+
+
+def blocked_url_patterns(profiles=(), extra_patterns=()):
+    """The URL patterns for the given profile names plus user patterns, without repeats."""
+    patterns = []
+    for profile in profiles:
+        patterns.extend(BLOCK_PROFILES[profile])
+    patterns.extend(pattern.strip() for pattern in extra_patterns if pattern.strip())
+    return list(dict.fromkeys(patterns))
+
+
+def apply_blocking(driver, patterns):
+    """Make the browser fail requests matching `patterns` for the rest of its session."""
+    if not patterns:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
@@ -0,0 +1,96 @@
+"""
+Warm standby browsers for fast crash recovery.
+
+Starting Chrome takes several seconds. WarmSparePool keeps pre-launched,
+pre-sized sessions ready in the background, so a worker whose browser dies
+can swap in a spare immediately while a replacement spins up asynchronously.
+"""
+
+import threading
+
+
+class WarmSparePool:
+    """Pool of idle, ready-to-use browser sessions created by ``factory``."""
+
+    def __init__(self, factory, size: int = 1, log=None, on_quit=None):
+        self._factory = factory  # callable() -> new driver
+        self.size = size
+        self.log = log or (lambda message: None)
+        self.on_quit = on_quit  # callable(driver) before a spare is quit
+        self._spares = []
+        self._launching = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def start(self):
+        """Begin launching spares in the background."""
+        self._refill()
+
+    def _refill(self):
+        with self._cond:
+            missing = self.size - len(self._spares) - self._launching
+            if self._closed or missing <= 0:
+                return
+            self._launching += missing
+        for _ in range(missing):
+            threading.Thread(target=self._launch_one, daemon=True).start()
+
+    def _launch_one(self):
+        driver = None
+        try:
+            driver = self._factory()
+        except Exception as e:
+            self.log(f"Standby browser failed to start: {e}")
+        with self._cond:
+            self._launching -= 1
+            if driver is not None and not self._closed:
+                self._spares.append(driver)
+                driver = None
+            self._cond.notify_all()
+        if driver is not None:
+            # Pool was closed while this spare was starting
+            self._quit(driver)
+
+    def _quit(self, driver):
+        if self.on_quit is not None:
+            self.on_quit(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_alive(driver) -> bool:
+        try:
+            _ = driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def take(self, timeout: float = 30):
+        """Return a live spare, waiting for one that is already starting. None if unavailable."""
+        with self._cond:
+            while True:
+                while self._spares:
+                    driver = self._spares.pop(0)
+                    if self._is_alive(driver):
+                        break
+                    self._quit(driver)
+                else:
+                    driver = None
+                if driver is not None or self._closed or self._launching == 0:
+                    break
+                # A spare is mid-launch: waiting for it beats starting from scratch
+                if not self._cond.wait(timeout):
+                    break
+        self._refill()
+        return driver
+
+    def close(self):
+        """Quit all idle spares; spares still starting are quit when they finish."""
+        with self._cond:
+            self._closed = True
+            spares, self._spares = self._spares, []
+            self._cond.notify_all()
+        for driver in spares:
+            self._quit(driver)
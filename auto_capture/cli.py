@@ -0,0 +1,286 @@
+"""
+Command line entry point: capture URLs from a file or stdin without the GUI.
+
+Examples:
+    python -m auto_capture urls.txt -o captures
+    cat urls.txt | auto-capture - -o captures --format jpg --workers 4
+"""
+
+import argparse
+import os
+import sys
+
+from .archive import create_zip_archives
+from .config import VALID_BLOCK_PROFILES, VALID_CRAWL_SCOPES, VALID_FORMATS, CaptureConfig
+from .connectivity import partition_reachable
+from .engine import CaptureEngine
+from .ingest import (
+    INGEST_BATCH,
+    UrlDeduplicator,
+    iter_source_lines,
+    iter_unique_urls,
+    iter_work_items,
+    peek,
+)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="auto-capture",
+        description="Capture full-page screenshots of a list of URLs.",
+    )
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        default=["-"],
+        help="Files containing URLs (one per line). Use '-' or omit to read stdin.",
+    )
+    parser.add_argument("-o", "--output", required=True, help="Folder to save captures to")
+    parser.add_argument("--format", choices=VALID_FORMATS, default="png", dest="fmt")
+    parser.add_argument(
+        "--quality", type=int, default=90, help="JPG/WebP quality, 1-100 (encoded by Chrome)"
+    )
+    parser.add_argument("--width", type=int, default=1400, help="Browser width in pixels")
+    parser.add_argument("--delay", type=int, default=2, help="Page load delay in seconds")
+    parser.add_argument(
+        "--settle-timeout",
+        type=float,
+        default=5.0,
+        help="Max seconds to wait for network/images/layout to go quiet before capturing",
+    )
+    parser.add_argument(
+        "--load-lazy",
+        action="store_true",
+        help='Load loading="lazy" images and iframes right away instead of when scrolled to',
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Parallel browsers")
+    parser.add_argument("--per-host", type=int, default=2, help="Max parallel browsers per host")
+    parser.add_argument(
+        "--warm-spare",
+        action="store_true",
+        help="Keep a standby browser running for instant recovery from browser crashes",
+    )
+    parser.add_argument(
+        "--no-domain",
+        action="store_true",
+        help="Don't include the domain in the folder structure",
+    )
+    parser.add_argument("--skip-login", action="store_true", help="Skip pages that need login")
+    parser.add_argument(
+        "--persist-session",
+        action="store_true",
+        help="Use the saved Chrome profile (keeps login sessions between runs)",
+    )
+    parser.add_argument(
+        "--no-tiling",
+        action="store_true",
+        help="Truncate pages taller than 16000px instead of capturing them in segments",
+    )
+    parser.add_argument(
+        "--tile-height", type=int, default=2000, help="Segment height in pixels when tiling"
+    )
+    parser.add_argument(
+        "--bundle",
+        action="store_true",
+        help="With --format pdf: write all captures into one PDF with a bookmark per URL",
+    )
+    parser.add_argument(
+        "--crawl",
+        action="store_true",
+        help="Discovery mode: also capture same-site pages linked from the given URLs",
+    )
+    parser.add_argument(
+        "--max-depth", type=int, default=2, help="Link hops to follow from the seed URLs"
+    )
+    parser.add_argument(
+        "--max-pages", type=int, default=200, help="Stop discovering after this many pages"
+    )
+    parser.add_argument(
+        "--crawl-scope",
+        choices=VALID_CRAWL_SCOPES,
+        default="path",
+        help="path: only below each seed URL's folder; host: anywhere on the seed's host",
+    )
+    parser.add_argument(
+        "--block",
+        action="append",
+        choices=VALID_BLOCK_PROFILES,
+        default=[],
+        metavar="PROFILE",
+        help=f"Don't load these resources ({', '.join(VALID_BLOCK_PROFILES)}); repeatable",
+    )
+    parser.add_argument(
+        "--block-url",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="Don't load URLs matching PATTERN (* wildcard, e.g. '*.gif'); repeatable",
+    )
+    parser.add_argument(
+        "--viewport",
+        action="append",
+        default=[],
+        metavar="SPEC",
+        help="Capture at this viewport, WIDTH[@SCALE][:mobile] (e.g. 390@3:mobile), instead "
+        "of --width; repeat for several sizes from one page load",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=2048,
+        metavar="MB",
+        help="Max screenshot bitmap memory in flight; bigger pages are tiled or scaled (0 = off)",
+    )
+    parser.add_argument(
+        "--timings",
+        metavar="PATH",
+        help="Write per-URL stage timings (JSONL) to PATH; a p50/p95/p99 summary is always logged",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip URLs already captured into the output folder by an earlier (interrupted) run",
+    )
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument(
+        "--thumbnails",
+        action="store_true",
+        help="Make thumbnails and contact sheets afterwards (in <output>_thumbnails)",
+    )
+    parser.add_argument(
+        "--zip",
+        metavar="PATH",
+        help="Zip the output folder to PATH afterwards (split into 29MB _partN files)",
+    )
+    parser.add_argument(
+        "--prewarm",
+        action="store_true",
+        help="Request each route ahead of the browsers so a dev server compiles it in advance",
+    )
+    parser.add_argument(
+        "--prewarm-concurrency",
+        type=int,
+        default=4,
+        metavar="N",
+        help="Pre-warm requests in flight at once",
+    )
+    parser.add_argument(
+        "--no-check", action="store_true", help="Skip the server connectivity checks"
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["compare"]:
+        from .compare import main as compare_main
+
+        return compare_main(argv[1:])
+    if argv[:1] == ["thumbnails"]:
+        from .thumbnails import main as thumbnails_main
+
+        return thumbnails_main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+
+    config = CaptureConfig(
+        save_directory=os.path.abspath(args.output),
+        fmt=args.fmt,
+        quality=args.quality,
+        width=args.width,
+        delay=args.delay,
+        settle_timeout=args.settle_timeout,
+        load_lazy=args.load_lazy,
+        headless=not args.headed,
+        persist_session=args.persist_session,
+        skip_login=args.skip_login,
+        include_domain=not args.no_domain,
+        workers=args.workers,
+        per_host=args.per_host,
+        warm_spare=args.warm_spare,
+        tile_long_pages=not args.no_tiling,
+        tile_height=args.tile_height,
+        pdf_bundle=args.bundle,
+        crawl=args.crawl,
+        crawl_depth=args.max_depth,
+        crawl_max_pages=args.max_pages,
+        crawl_scope=args.crawl_scope,
+        block_profiles=args.block,
+        block_patterns=args.block_url,
+        preflight=not args.no_check,
+        prewarm=args.prewarm,
+        prewarm_concurrency=args.prewarm_concurrency,
+        viewports=args.viewport,
+        memory_budget_mb=args.memory_budget,
+        timings_path=os.path.abspath(args.timings) if args.timings else "",
+        resume=args.resume,
+    )
+    try:
+        config.validate()
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    # URLs are streamed from the sources, so lists of any length use flat memory
+    dedup = UrlDeduplicator()
+    try:
+        head, items = peek(
+            iter_work_items(
+                iter_unique_urls(iter_source_lines(args.sources), dedup),
+                config.fmt,
+                config.include_domain,
+            )
+        )
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if not head:
+        print("Error: No URLs found.", file=sys.stderr)
+        return 2
+
+    os.makedirs(config.save_directory, exist_ok=True)
+    engine = CaptureEngine(config)
+
+    if not args.no_check:
+        engine.log("Checking server connectivity...")
+        reachable, _, errors = partition_reachable(head)
+        if not reachable:
+            for message in errors.values():
+                print(f"Error: {message}", file=sys.stderr)
+            return 2
+        engine.log("Server is reachable!" if not errors else f"{len(errors)} server(s) unreachable")
+
+    if len(head) < INGEST_BATCH:
+        engine.log(f"Started capture of {len(head)} URL(s).")
+    else:
+        engine.log("Started capture (URLs are read as the capture goes).")
+    try:
+        finished = engine.run(items)
+    except KeyboardInterrupt:
+        engine.stop()
+        return 130
+    finally:
+        # Worker threads are daemons: browsers they still hold would outlive the process
+        engine.quit_browsers()
+    if dedup.duplicates:
+        engine.log(f"Skipped {dedup.duplicates} duplicate URL(s)")
+
+    if not finished:
+        return 1
+
+    if args.thumbnails:
+        from .thumbnails import build_thumbnails
+
+        try:
+            build_thumbnails(config.save_directory, log=engine.log)
+        except OSError as e:
+            print(f"Error creating thumbnails: {e}", file=sys.stderr)
+            return 1
+
+    if args.zip:
+        try:
+            create_zip_archives(config.save_directory, os.path.abspath(args.zip), log=engine.log)
+        except OSError as e:
+            print(f"Error creating zip: {e}", file=sys.stderr)
+            return 1
+    return 1 if engine.failed_items else 0
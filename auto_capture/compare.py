@@ -0,0 +1,326 @@
+"""
+Visual regression - compare a capture folder against a baseline run.
+
+Captures are paired by their path relative to the run folder. That path is
+the url_to_filepath() output, so the same URL lands on the same file in every
+run. Each pair is compared in horizontal bands of tiles: bands whose bytes
+are identical are skipped without any pixel work (a straight memory compare,
+several times faster than hashing both bands), and changed bands are diffed per
+pixel with NumPy when it is installed (``pip install numpy``), otherwise
+with Pillow's C routines. Changed pages get a diff overlay image, and a CSV
+report ranks them by how much of the page changed.
+
+    python -m auto_capture compare BASELINE_DIR CURRENT_DIR -o DIFF_DIR
+"""
+
+import argparse
+import csv
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageChops, ImageDraw
+
+from .journal import JOURNAL_FILENAME
+
+try:
+    import numpy as np
+except ImportError:  # Optional: Pillow fallback is slower but gives the same result
+    np = None
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+DEFAULT_TILE = 128  # Tile edge in pixels
+DEFAULT_TOLERANCE = 16  # Per-channel difference treated as noise (JPEG artefacts, anti-aliasing)
+REPORT_FILENAME = "report.csv"
+
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+ADDED = "added"
+REMOVED = "removed"
+ERROR = "error"
+
+# Report order: most relevant first
+_STATUS_RANK = {ERROR: 0, CHANGED: 1, ADDED: 2, REMOVED: 3, UNCHANGED: 4}
+
+PageDiff = namedtuple(
+    "PageDiff",
+    "path status changed_ratio changed_tiles total_tiles baseline_size current_size diff_path error",
+)
+
+
+def collect_images(run_dir: str):
+    """Relative paths of every capture image under run_dir."""
+    paths = set()
+    for root, dirs, filenames in os.walk(run_dir):
+        for filename in filenames:
+            if filename.startswith(JOURNAL_FILENAME):
+                continue
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                paths.add(os.path.relpath(os.path.join(root, filename), run_dir))
+    return paths
+
+
+def _tile_starts(length: int, tile: int):
+    return list(range(0, length, tile))
+
+
+def _changed_tiles_numpy(base, current, tile: int, tolerance: int):
+    """(changed pixel count, [(x, y, w, h)]) of two same-size RGB images, via NumPy."""
+    a = np.asarray(base)
+    b = np.asarray(current)
+    height, width = a.shape[:2]
+    col_starts = _tile_starts(width, tile)
+    changed_pixels = 0
+    tiles = []
+    for y in _tile_starts(height, tile):
+        band_a = a[y : y + tile]
+        band_b = b[y : y + tile]
+        if np.array_equal(band_a, band_b):
+            continue
+        mask = np.abs(band_a.astype(np.int16) - band_b).max(axis=2) > tolerance
+        per_tile = np.add.reduceat(mask.sum(axis=0), col_starts)
+        for x, count in zip(col_starts, per_tile.tolist()):
+            if count:
+                tiles.append((x, y, min(tile, width - x), band_a.shape[0]))
+                changed_pixels += count
+    return changed_pixels, tiles
+
+
+def _changed_tiles_pillow(base, current, tile: int, tolerance: int):
+    """Same as _changed_tiles_numpy without NumPy."""
+    width, height = base.size
+    threshold = [0] * (tolerance + 1) + [255] * (255 - tolerance)
+    changed_pixels = 0
+    tiles = []
+    for y in _tile_starts(height, tile):
+        box_height = min(tile, height - y)
+        band_a = base.crop((0, y, width, y + box_height))
+        band_b = current.crop((0, y, width, y + box_height))
+        if band_a.tobytes() == band_b.tobytes():
+            continue
+        red, green, blue = ImageChops.difference(band_a, band_b).split()
+        mask = ImageChops.lighter(ImageChops.lighter(red, green), blue).point(threshold)
+        for x in _tile_starts(width, tile):
+            box = (x, 0, min(x + tile, width), box_height)
+            count = mask.crop(box).histogram()[255]
+            if count:
+                tiles.append((x, y, box[2] - x, box_height))
+                changed_pixels += count
+    return changed_pixels, tiles
+
+
+def diff_overlay(base, current, tiles, tolerance: int):
+    """The current capture faded, with changed pixels in red and changed tiles outlined."""
+    width = max(base.width, current.width)
+    height = max(base.height, current.height)
+    canvas = Image.new("RGB", (width, height), (255, 255, 255))
+    canvas.paste(current, (0, 0))
+    overlay = Image.blend(canvas, Image.new("RGB", canvas.size, (255, 255, 255)), 0.6)
+
+    common = (min(base.width, current.width), min(base.height, current.height))
+    threshold = [0] * (tolerance + 1) + [255] * (255 - tolerance)
+    red, green, blue = ImageChops.difference(
+        base.crop((0, 0) + common), current.crop((0, 0) + common)
+    ).split()
+    mask = Image.new("L", canvas.size, 255)  # Area only one image has counts as changed
+    mask.paste(ImageChops.lighter(ImageChops.lighter(red, green), blue).point(threshold), (0, 0))
+    overlay = Image.composite(Image.new("RGB", canvas.size, (220, 0, 0)), overlay, mask)
+
+    draw = ImageDraw.Draw(overlay)
+    for x, y, w, h in tiles:
+        draw.rectangle((x, y, x + w - 1, y + h - 1), outline=(255, 140, 0))
+    return overlay
+
+
+def compare_pair(job):
+    """Compare one baseline/current pair. Runs in a worker process."""
+    rel_path, baseline_path, current_path, diff_path, tile, tolerance = job
+    try:
+        with Image.open(baseline_path) as img:
+            base = img.convert("RGB")
+        with Image.open(current_path) as img:
+            current = img.convert("RGB")
+
+        common = (min(base.width, current.width), min(base.height, current.height))
+        overlap_base = base.crop((0, 0) + common) if base.size != common else base
+        overlap_current = current.crop((0, 0) + common) if current.size != common else current
+        count_tiles = _changed_tiles_numpy if np is not None else _changed_tiles_pillow
+        changed_pixels, tiles = count_tiles(overlap_base, overlap_current, tile, tolerance)
+
+        width = max(base.width, current.width)
+        height = max(base.height, current.height)
+        # Rows/columns only one of the images has (page got longer/shorter) are all changed
+        extra_pixels = width * height - common[0] * common[1]
+        if extra_pixels:
+            by_origin = {(x, y): (x, y, w, h) for x, y, w, h in tiles}
+            for y in _tile_starts(height, tile):
+                for x in _tile_starts(width, tile):
+                    w, h = min(tile, width - x), min(tile, height - y)
+                    if x + w > common[0] or y + h > common[1]:
+                        by_origin[(x, y)] = (x, y, w, h)
+            tiles = sorted(by_origin.values(), key=lambda t: (t[1], t[0]))
+        changed_pixels += extra_pixels
+
+        total_tiles = len(_tile_starts(width, tile)) * len(_tile_starts(height, tile))
+        status = CHANGED if changed_pixels else UNCHANGED
+        if status == CHANGED:
+            os.makedirs(os.path.dirname(diff_path), exist_ok=True)
+            diff_overlay(base, current, tiles, tolerance).save(diff_path, compress_level=1)
+        else:
+            diff_path = ""
+        return PageDiff(
+            rel_path,
+            status,
+            changed_pixels / (width * height),
+            len(tiles),
+            total_tiles,
+            base.size,
+            current.size,
+            diff_path,
+            "",
+        )
+    except Exception as e:
+        return PageDiff(rel_path, ERROR, 0.0, 0, 0, None, None, "", str(e))
+
+
+def compare_runs(
+    baseline_dir: str,
+    current_dir: str,
+    output_dir: str,
+    tile: int = DEFAULT_TILE,
+    tolerance: int = DEFAULT_TOLERANCE,
+    max_workers: int = None,
+    log=None,
+):
+    """Compare every capture in current_dir with its baseline; write overlays and the report.
+
+    Returns the PageDiff list, most changed pages first.
+    """
+    log = log or (lambda message: None)
+    baseline = collect_images(baseline_dir)
+    current = collect_images(current_dir)
+    results = [
+        PageDiff(path, ADDED, 1.0, 0, 0, None, None, "", "") for path in sorted(current - baseline)
+    ]
+    results += [
+        PageDiff(path, REMOVED, 1.0, 0, 0, None, None, "", "") for path in sorted(baseline - current)
+    ]
+
+    jobs = [
+        (
+            path,
+            os.path.join(baseline_dir, path),
+            os.path.join(current_dir, path),
+            os.path.join(output_dir, os.path.splitext(path)[0] + "_diff.png"),
+            tile,
+            tolerance,
+        )
+        for path in sorted(baseline & current)
+    ]
+    log(f"Comparing {len(jobs)} capture(s) ({'NumPy' if np is not None else 'Pillow'} diff)")
+    if jobs:
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for done, result in enumerate(executor.map(compare_pair, jobs, chunksize=4), 1):
+                results.append(result)
+                if result.status == CHANGED:
+                    log(f"Changed: {result.path} ({result.changed_ratio:.2%})")
+                elif result.status == ERROR:
+                    log(f"Error comparing {result.path}: {result.error}")
+                if done % 100 == 0:
+                    log(f"Compared {done}/{len(jobs)}")
+
+    results.sort(key=lambda r: (_STATUS_RANK[r.status], -r.changed_ratio, r.path))
+    os.makedirs(output_dir, exist_ok=True)
+    write_report(results, os.path.join(output_dir, REPORT_FILENAME))
+    return results
+
+
+def write_report(results, path: str):
+    """Ranked CSV: one row per page."""
+
+    def size(value):
+        return f"{value[0]}x{value[1]}" if value else ""
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "rank",
+                "status",
+                "changed_percent",
+                "changed_tiles",
+                "total_tiles",
+                "baseline_size",
+                "current_size",
+                "path",
+                "diff",
+                "error",
+            ]
+        )
+        for rank, r in enumerate(results, 1):
+            writer.writerow(
+                [
+                    rank,
+                    r.status,
+                    f"{r.changed_ratio * 100:.3f}",
+                    r.changed_tiles,
+                    r.total_tiles,
+                    size(r.baseline_size),
+                    size(r.current_size),
+                    r.path,
+                    r.diff_path,
+                    r.error,
+                ]
+            )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="auto-capture compare",
+        description="Compare a capture folder against a baseline run of the same URLs.",
+    )
+    parser.add_argument("baseline", help="Folder of the earlier (reference) run")
+    parser.add_argument("current", help="Folder of the new run")
+    parser.add_argument("-o", "--output", required=True, help="Folder for diff images and report")
+    parser.add_argument("--tile", type=int, default=DEFAULT_TILE, help="Tile size in pixels")
+    parser.add_argument(
+        "--tolerance",
+        type=int,
+        default=DEFAULT_TOLERANCE,
+        help="Per-channel difference (0-255) ignored as noise",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Parallel processes")
+    return parser
+
+
+def main(argv=None) -> int:
+    """Exit code 0 when nothing changed, 1 when pages differ, 2 on invalid input."""
+    args = build_parser().parse_args(argv)
+    for folder in (args.baseline, args.current):
+        if not os.path.isdir(folder):
+            print(f"Error: {folder} is not a folder", file=sys.stderr)
+            return 2
+    if args.tile < 8 or not 0 <= args.tolerance <= 254:
+        print("Error: tile must be at least 8 and tolerance 0-254.", file=sys.stderr)
+        return 2
+
+    results = compare_runs(
+        args.baseline,
+        args.current,
+        args.output,
+        tile=args.tile,
+        tolerance=args.tolerance,
+        max_workers=args.workers,
+        log=print,
+    )
+    counts = {}
+    for r in results:
+        counts[r.status] = counts.get(r.status, 0) + 1
+    print(
+        "Summary: "
+        + ", ".join(f"{counts.get(status, 0)} {status}" for status in _STATUS_RANK)
+        + f". Report: {os.path.join(args.output, REPORT_FILENAME)}"
+    )
+    return 0 if counts.get(UNCHANGED, 0) == len(results) else 1
@@ -0,0 +1,138 @@
+"""
+Capture configuration shared by the GUI and the command line.
+"""
+
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from .viewports import parse_viewports
+
+VALID_FORMATS = ("png", "jpg", "webp", "pdf")
+VALID_CRAWL_SCOPES = ("path", "host")  # Below the seed's folder / anywhere on its host
+VALID_BLOCK_PROFILES = ("trackers", "chat", "media")  # Resource groups that can be blocked
+
+PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".auto_capture_tool")
+KEEP_SESSION_FILES = 20  # GUI log and timings files kept in PROFILE_DIR
+
+
+def default_chrome_user_data_dir() -> str:
+    """Chrome profile directory used for persistent login sessions."""
+    return os.path.join(PROFILE_DIR, "chrome_profile")
+
+
+def prune_old_files(folder: str, prefix: str, keep: int = KEEP_SESSION_FILES):
+    """Delete all but the newest `keep` files in `folder` whose names start with `prefix`."""
+    try:
+        # Names carry a sortable timestamp, so name order is age order
+        names = sorted(name for name in os.listdir(folder) if name.startswith(prefix))
+    except OSError:
+        return
+    for name in names[: max(len(names) - keep, 0)]:
+        try:
+            os.remove(os.path.join(folder, name))
+        except OSError:
+            pass
+
+
+def _new_session_file(subdir: str, prefix: str, ext: str) -> str:
+    folder = os.path.join(PROFILE_DIR, subdir)
+    # Room for the new file within the cap
+    prune_old_files(folder, prefix, KEEP_SESSION_FILES - 1)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(folder, f"{prefix}{stamp}{ext}")
+
+
+def default_timings_path() -> str:
+    """New per-run JSONL file for stage timings (outside the save folder, so it isn't zipped).
+
+    Only the newest KEEP_SESSION_FILES timings files are kept.
+    """
+    return _new_session_file("timings", "timings_", ".jsonl")
+
+
+def default_log_path() -> str:
+    """New per-session GUI log file with every message (the on-screen log keeps the latest only).
+
+    Only the newest KEEP_SESSION_FILES log files are kept.
+    """
+    return _new_session_file("logs", "auto_capture_", ".log")
+
+
+@dataclass
+class CaptureConfig:
+    """Plain settings object consumed by CaptureEngine (no tkinter dependency)."""
+
+    save_directory: str = ""
+    fmt: str = "png"
+    quality: int = 90  # JPG/WebP quality (1-100), applied by Chrome when capturing
+    width: int = 1400
+    delay: int = 2
+    headless: bool = False
+    persist_session: bool = False
+    skip_login: bool = False
+    include_domain: bool = True
+    workers: int = 1
+    per_host: int = 2
+    warm_spare: bool = False  # Keep a pre-launched browser ready to replace a crashed one
+    tile_long_pages: bool = True  # Capture pages over 16000px in segments instead of truncating
+    tile_height: int = 2000  # Segment height in CSS pixels when tiling
+    crawl: bool = False  # Follow same-site links from the given URLs (discovery mode)
+    crawl_depth: int = 2  # Link hops from the seed URLs
+    crawl_max_pages: int = 200  # Total pages per run, seeds included
+    crawl_scope: str = "path"
+    preflight: bool = True  # Probe every server first and skip URLs on unreachable ones
+    prewarm: bool = False  # GET each route ahead of the browsers so dev servers compile it early
+    prewarm_concurrency: int = 4  # Pre-warm requests in flight at once
+    pdf_bundle: bool = False  # PDF only: append every capture to one bookmarked PDF
+    timings_path: str = ""  # JSONL file for per-URL stage timings ("" = summary only)
+    block_profiles: list = field(default_factory=list)  # Names from VALID_BLOCK_PROFILES
+    block_patterns: list = field(default_factory=list)  # Extra URL patterns to block (* wildcard)
+    viewports: list = field(default_factory=list)  # "WIDTH[@SCALE][:mobile]" specs, [] = width
+    journal: bool = True  # Record per-URL state in the save folder so runs can resume
+    resume: bool = False  # Skip URLs the save folder's journal already has as captured
+    memory_budget_mb: int = 2048  # Screenshot bitmaps in flight at once (0 = no limit)
+    max_pending_saves: int = 4  # Screenshots queued for encoding before capture waits
+    settle_timeout: float = 5.0  # Max seconds to wait for a page to go quiet before capture
+    load_lazy: bool = False  # Switch loading="lazy" images/iframes to eager while settling
+    chrome_user_data_dir: str = field(default_factory=default_chrome_user_data_dir)
+
+    def validate(self):
+        """Raise ValueError with a user-facing message if any setting is out of range."""
+        if self.fmt not in VALID_FORMATS:
+            raise ValueError(f"Format must be one of: {', '.join(VALID_FORMATS)}.")
+        if self.quality < 1 or self.quality > 100:
+            raise ValueError("Quality must be between 1 and 100.")
+        if self.width < 100 or self.width > 5000:
+            raise ValueError("Width must be between 100 and 5000 pixels.")
+        if self.delay < 0 or self.delay > 60:
+            raise ValueError("Delay must be between 0 and 60 seconds.")
+        if self.crawl and (
+            self.crawl_depth < 0 or self.crawl_depth > 10 or self.crawl_max_pages < 1
+        ):
+            raise ValueError("Crawl depth must be between 0 and 10, and max pages at least 1.")
+        if self.crawl_scope not in VALID_CRAWL_SCOPES:
+            raise ValueError(f"Crawl scope must be one of: {', '.join(VALID_CRAWL_SCOPES)}.")
+        unknown = [name for name in self.block_profiles if name not in VALID_BLOCK_PROFILES]
+        if unknown:
+            raise ValueError(
+                f"Unknown blocking profile '{unknown[0]}'. "
+                f"Choose from: {', '.join(VALID_BLOCK_PROFILES)}."
+            )
+        parse_viewports(self.viewports)  # Raises ValueError naming the bad profile
+        if self.pdf_bundle and self.fmt != "pdf":
+            raise ValueError("A single PDF bundle requires the PDF format.")
+        if self.workers < 1 or self.workers > 16 or self.per_host < 1:
+            raise ValueError(
+                "Parallel browsers must be between 1 and 16, and max per host at least 1."
+            )
+        if self.settle_timeout < 0 or self.settle_timeout > 60:
+            raise ValueError("Settle timeout must be between 0 and 60 seconds.")
+        if self.memory_budget_mb < 0 or 0 < self.memory_budget_mb < 64:
+            raise ValueError("Memory budget must be 0 (no limit) or at least 64 MB.")
+        if self.prewarm and (self.prewarm_concurrency < 1 or self.prewarm_concurrency > 32):
+            raise ValueError("Pre-warm concurrency must be between 1 and 32.")
+        if self.max_pending_saves < 1:
+            raise ValueError("At least one pending save must be allowed.")
+        if self.tile_height < 200 or self.tile_height > 16000:
+            raise ValueError("Tile height must be between 200 and 16000 pixels.")
@@ -0,0 +1,139 @@
+"""
+Server reachability checks run before any browser work starts.
+
+Every distinct scheme://host:port in a batch is probed concurrently. A probe
+opens one keep-alive connection and sends HEAD, falling back to GET on the
+same connection for servers that reject HEAD. Results are cached for the
+session: reachable servers stay cached, failures only for FAILURE_TTL seconds
+so a server started after the first check is picked up on the next run.
+"""
+
+import http.client
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
+FAILURE_TTL = 30  # Seconds a failed probe is trusted before probing again
+MAX_PROBES = 8  # Concurrent probes
+
+_cache = {}  # origin -> (reachable, message, checked_at)
+_cache_lock = threading.Lock()
+
+
+def origin_of(url: str) -> str:
+    """scheme://netloc of a URL - the unit probes are run and cached for."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def clear_connectivity_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def _request(conn, method: str) -> int:
+    conn.request(method, "/", headers={"User-Agent": USER_AGENT, "Connection": "keep-alive"})
+    response = conn.getresponse()
+    if method == "GET":
+        response.read(1)
+    response.read()  # Drain so the connection can be reused
+    return response.status
+
+
+def _status_result(status: int):
+    if status < 500:
+        return True, ""
+    return False, f"Server error: {status}"
+
+
+def probe_origin(origin: str, timeout: float = 10):
+    """Probe one origin (uncached). Returns (reachable, error message)."""
+    parsed = urlparse(origin)
+    connection_class = (
+        http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+    )
+    conn = connection_class(parsed.netloc, timeout=timeout)
+    try:
+        try:
+            status = _request(conn, "HEAD")
+            if status not in (405, 501):  # Some servers don't implement HEAD
+                return _status_result(status)
+        except (ConnectionRefusedError, socket.gaierror, socket.timeout):
+            raise  # Nothing listening - GET won't do better
+        except (http.client.HTTPException, OSError):
+            conn.close()  # Reconnect for GET (closed sockets are reopened on request)
+        return _status_result(_request(conn, "GET"))
+    except ConnectionRefusedError:
+        return False, f"Connection refused at {parsed.netloc}."
+    except socket.gaierror:
+        return False, f"Cannot resolve {parsed.netloc}. Check internet or URL."
+    except socket.timeout:
+        return False, "Cannot reach server: timed out"
+    except (http.client.HTTPException, OSError) as e:
+        return False, f"Cannot reach server: {e}"
+    except Exception as e:
+        return False, f"Connection error: {str(e)}"
+    finally:
+        conn.close()
+
+
+def _cached(origin: str):
+    with _cache_lock:
+        entry = _cache.get(origin)
+    if entry is None:
+        return None
+    reachable, message, checked_at = entry
+    if not reachable and time.monotonic() - checked_at > FAILURE_TTL:
+        return None
+    return reachable, message
+
+
+def _probe_and_cache(origin: str, timeout: float):
+    result = _cached(origin)
+    if result is None:
+        result = probe_origin(origin, timeout)
+        with _cache_lock:
+            _cache[origin] = (*result, time.monotonic())
+    return result
+
+
+def check_origins(urls, timeout: float = 10):
+    """Probe every distinct origin among urls concurrently. Returns {origin: (ok, msg)}."""
+    origins = list(dict.fromkeys(origin_of(url) for url in urls))
+    if not origins:
+        return {}
+    if len(origins) == 1:
+        return {origins[0]: _probe_and_cache(origins[0], timeout)}
+    with ThreadPoolExecutor(max_workers=min(MAX_PROBES, len(origins))) as executor:
+        results = executor.map(lambda origin: _probe_and_cache(origin, timeout), origins)
+        return dict(zip(origins, results))
+
+
+def partition_reachable(items, timeout: float = 10):
+    """Split work items by server reachability.
+
+    Returns (reachable_items, unreachable_items, {origin: error message}).
+    """
+    results = check_origins((item["url"] for item in items), timeout)
+    reachable, unreachable = [], []
+    for item in items:
+        ok, _ = results[origin_of(item["url"])]
+        (reachable if ok else unreachable).append(item)
+    errors = {origin: message for origin, (ok, message) in results.items() if not ok}
+    return reachable, unreachable, errors
+
+
+def check_server_connectivity(url: str, timeout: int = 10):
+    """Check if the server is reachable before starting capture."""
+    try:
+        return _probe_and_cache(origin_of(url), timeout)
+    except Exception as e:
+        return False, f"Connection error: {str(e)}"
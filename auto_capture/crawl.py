@@ -0,0 +1,152 @@
+"""
+Discovery mode - capture a site starting from a few seed URLs.
+
+Links are collected from each page with one script call while the page is
+already loaded for its screenshot, so every page is fetched exactly once.
+New URLs go straight into the running CaptureQueue; because the queue hands
+items out in submission order, pages are captured breadth-first.
+"""
+
+import os
+import threading
+from urllib.parse import urlparse
+
+from .config import VALID_CRAWL_SCOPES
+from .urls import normalize_url_for_comparison, url_to_filepath, validate_url
+
+# "path": only below the seed's folder (like wget --no-parent); "host": the seed's whole host
+SCOPE_PATH, SCOPE_HOST = VALID_CRAWL_SCOPES
+
+# Links to files rather than pages
+SKIP_EXTENSIONS = {
+    ".pdf",
+    ".zip",
+    ".gz",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".svg",
+    ".webp",
+    ".ico",
+    ".mp3",
+    ".mp4",
+    ".webm",
+    ".css",
+    ".js",
+    ".json",
+    ".xml",
+    ".txt",
+    ".csv",
+    ".woff",
+    ".woff2",
+}
+
+# Same-origin page links, absolute and without #fragments, de-duplicated in the page
+LINK_EXTRACT_JS = """
+var seen = {}, out = [];
+var anchors = document.querySelectorAll('a[href]');
+for (var i = 0; i < anchors.length; i++) {
+    var a = anchors[i];
+    if (a.hasAttribute('download')) { continue; }
+    var u;
+    try { u = new URL(a.href, location.href); } catch (e) { continue; }
+    if (u.origin !== location.origin) { continue; }
+    u.hash = '';
+    if (!seen[u.href]) { seen[u.href] = true; out.push(u.href); }
+}
+return out;
+"""
+
+
+def _scope_prefix(url: str, scope: str):
+    parsed = urlparse(url)
+    path = parsed.path or "/"
+    if scope == SCOPE_HOST:
+        path = "/"
+    elif not path.endswith("/"):
+        path = path.rsplit("/", 1)[0] + "/"
+    return parsed.netloc.lower(), path
+
+
+class Crawler:
+    """Breadth-first link discovery bounded by scope, depth and page count."""
+
+    def __init__(
+        self,
+        fmt: str,
+        include_domain: bool = True,
+        max_depth: int = 2,
+        max_pages: int = 200,
+        scope: str = SCOPE_PATH,
+    ):
+        self.fmt = fmt
+        self.include_domain = include_domain
+        self.max_depth = max_depth
+        self.max_pages = max_pages  # Total pages including the seeds
+        self.scope = scope
+        self._prefixes = set()  # (host, path prefix) allowed by the seeds
+        self._seen = set()  # Normalized URLs already queued
+        self._lock = threading.Lock()
+        self.limit_reached = False
+
+    def add_seeds(self, items):
+        """Register the starting items (depth 0 unless they carry one)."""
+        with self._lock:
+            for item in items:
+                item.setdefault("depth", 0)
+                self._seen.add(normalize_url_for_comparison(item["url"]))
+                self._prefixes.add(_scope_prefix(item["url"], self.scope))
+
+    def add_found(self, items):
+        """Register pages an earlier run discovered; returns the ones still in bounds."""
+        found = []
+        with self._lock:
+            for item in items:
+                normalized = normalize_url_for_comparison(item["url"])
+                if normalized in self._seen or item["depth"] > self.max_depth:
+                    continue
+                if len(self._seen) >= self.max_pages:
+                    self.limit_reached = True
+                    break
+                if not self.in_scope(item["url"]):
+                    continue
+                self._seen.add(normalized)
+                found.append(item)
+        return found
+
+    def in_scope(self, url: str) -> bool:
+        if not validate_url(url):
+            return False
+        parsed = urlparse(url)
+        if os.path.splitext(parsed.path)[1].lower() in SKIP_EXTENSIONS:
+            return False
+        host = parsed.netloc.lower()
+        path = parsed.path or "/"
+        return any(
+            host == scope_host and path.startswith(prefix)
+            for scope_host, prefix in self._prefixes
+        )
+
+    def discover(self, driver, item):
+        """Collect links from the loaded page and return new work items to queue."""
+        depth = item.get("depth", 0)
+        if depth >= self.max_depth or self.limit_reached:
+            return []
+        links = driver.execute_script(LINK_EXTRACT_JS) or []
+
+        new_items = []
+        with self._lock:
+            for url in links:
+                if len(self._seen) >= self.max_pages:
+                    self.limit_reached = True
+                    break
+                normalized = normalize_url_for_comparison(url)
+                if normalized in self._seen or not self.in_scope(url):
+                    continue
+                self._seen.add(normalized)
+                subdir, filename = url_to_filepath(url, self.fmt, self.include_domain)
+                new_items.append(
+                    {"url": url, "subdir": subdir, "filename": filename, "depth": depth + 1}
+                )
+        return new_items
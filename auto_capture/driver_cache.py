@@ -0,0 +1,148 @@
+"""
+ChromeDriver resolution cache.
+
+webdriver-manager checks online for the matching driver every time
+install() is called. Here the driver path is resolved once per process and
+stored on disk together with the Chrome version it was resolved for.
+Later runs reuse it without going through webdriver-manager until Chrome's
+major version changes. A ChromeDriver works with any Chrome build of the
+same major version.
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+
+from .config import PROFILE_DIR
+
+CACHE_FILE = os.path.join(PROFILE_DIR, "chromedriver_cache.json")
+
+# ChromeDriver's "session not created" messages for a Chrome of another major version
+VERSION_MISMATCH_MARKERS = (
+    "only supports chrome version",
+    "current browser version is",
+)
+
+_lock = threading.Lock()
+_resolved_path = None  # Resolved once per process
+
+
+def _read_windows_registry_version():
+    """Chrome's version from the registry - avoids spawning PowerShell."""
+    import winreg
+
+    keys = [
+        (winreg.HKEY_CURRENT_USER, r"Software\Google\Chrome\BLBeacon"),
+        (winreg.HKEY_LOCAL_MACHINE, r"Software\Google\Chrome\BLBeacon"),
+        (winreg.HKEY_LOCAL_MACHINE, r"Software\WOW6432Node\Google\Chrome\BLBeacon"),
+    ]
+    for hive, path in keys:
+        try:
+            with winreg.OpenKey(hive, path) as key:
+                return winreg.QueryValueEx(key, "version")[0]
+        except OSError:
+            continue
+    return None
+
+
+def detect_chrome_version():
+    """Installed Chrome version string, or None if it can't be determined."""
+    try:
+        if sys.platform == "win32":
+            version = _read_windows_registry_version()
+            if version:
+                return version
+        return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception:
+        return None
+
+
+def _major(version):
+    return version.split(".")[0] if version else None
+
+
+def _load_cache():
+    try:
+        with open(CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(chrome_version, driver_path):
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        with open(CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "chrome_version": chrome_version,
+                    "driver_path": driver_path,
+                    "resolved_at": datetime.now().isoformat(timespec="seconds"),
+                },
+                f,
+                indent=2,
+            )
+    except OSError:
+        pass  # Caching is an optimization only
+
+
+def resolve_chromedriver(log=None) -> str:
+    """Return a ChromeDriver path, resolving through webdriver-manager only when needed."""
+    global _resolved_path
+    log = log or (lambda message: None)
+
+    with _lock:
+        if _resolved_path and os.path.exists(_resolved_path):
+            return _resolved_path
+
+        chrome_version = detect_chrome_version()
+        cached = _load_cache()
+        cached_path = cached.get("driver_path")
+        cached_usable = bool(cached_path) and os.path.exists(cached_path)
+
+        if cached_usable and (
+            chrome_version is None or _major(chrome_version) == _major(cached.get("chrome_version"))
+        ):
+            _resolved_path = cached_path
+            return _resolved_path
+
+        if cached_usable:
+            log(
+                f"Chrome version changed ({cached.get('chrome_version')} -> {chrome_version}), "
+                "updating ChromeDriver..."
+            )
+        try:
+            driver_path = ChromeDriverManager().install()
+        except Exception as e:
+            if not cached_usable:
+                raise
+            # Offline or download failed - an older driver is better than none
+            log(f"Could not update ChromeDriver ({e}); using cached driver")
+            _resolved_path = cached_path
+            return _resolved_path
+
+        _save_cache(chrome_version, driver_path)
+        _resolved_path = driver_path
+        return _resolved_path
+
+
+def is_version_mismatch(error) -> bool:
+    """True if a failed session start says ChromeDriver doesn't match Chrome's version."""
+    message = str(error).lower()
+    return any(marker in message for marker in VERSION_MISMATCH_MARKERS)
+
+
+def invalidate():
+    """Forget the resolved driver, e.g. after it failed to start Chrome."""
+    global _resolved_path
+    with _lock:
+        _resolved_path = None
+        try:
+            os.remove(CACHE_FILE)
+        except OSError:
+            pass
@@ -0,0 +1,1397 @@
+"""
+Capture engine - drives Chrome through the URL list and writes the screenshots.
+
+The engine only depends on a CaptureConfig and two optional callbacks
+(``log`` and ``progress``), so it runs the same way under the GUI, the
+command line, or a scheduled job.
+"""
+
+import base64
+import itertools
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException, TimeoutException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+
+from . import driver_cache
+from .blocking import apply_blocking, blocked_url_patterns
+from .browser_pool import WarmSparePool
+from .config import CaptureConfig
+from .connectivity import partition_reachable
+from .crawl import Crawler
+from .ingest import INGEST_BATCH, iter_batches
+from .journal import JOURNAL_FILENAME, JobJournal
+from .memory import (
+    MB,
+    MemoryBudget,
+    estimate_capture_bytes,
+    estimate_tile_bytes,
+    peak_rss_bytes,
+    scale_to_fit,
+    tile_height_for,
+)
+from .pdf_bundle import BundlePageCollector, PdfBundleWriter
+from .pipeline import PASSTHROUGH_FORMATS, SavePipeline
+from .prewarm import RoutePrewarmer
+from .retry import LOGIN, TIMEOUT, RetryScheduler, classify
+from .settle import PERFORMANCE_LOG_CAPABILITY, PageSettler
+from .timing import TimingRecorder
+from .urls import variant_filename
+from .viewports import OutputGroup, apply_viewport, clear_viewport, parse_viewports
+from .tiling import (
+    JpegPartWriter,
+    PdfTileWriter,
+    StreamingPNGWriter,
+    capture_tile,
+    fit_tile,
+    iter_tile_rects,
+    to_rgb,
+)
+from .work_queue import CaptureQueue
+
+MAX_CAPTURE_HEIGHT = 16000  # Windows-safe limit
+WEBP_MAX_HEIGHT = 16383  # WebP's own limit, in device pixels
+
+# Output formats Chrome can encode directly -> Page.captureScreenshot format
+CDP_IMAGE_FORMATS = {"jpg": "jpeg", "webp": "webp"}
+
+# [CSS viewport width, device pixel ratio]
+VIEWPORT_METRICS_JS = (
+    "return [document.documentElement.clientWidth, window.devicePixelRatio || 1];"
+)
+
+# Scroll, then wait for two animation frames. A minimized or hidden window runs
+# no animation frames, so a timer finishes the step if they don't come.
+SCROLL_AND_WAIT_FRAME_JS = """
+var done = arguments[arguments.length - 1];
+var finished = false;
+function finish() { if (!finished) { finished = true; done(); } }
+window.scrollTo(0, arguments[0]);
+setTimeout(finish, 100);
+requestAnimationFrame(function () { requestAnimationFrame(finish); });
+"""
+
+# Quiet window after scrolling back to the top: the page already settled once
+# after loading, so this only waits for content the scroll pulled in
+RESCROLL_QUIET_PERIOD = 0.1
+
+
+# Login-page check run in the page so only a short verdict crosses the wire:
+# [current URL, reason or null]. Only flagged when we were redirected away
+# from the requested URL.
+LOGIN_PROBE_JS = """
+var url = location.href.toLowerCase();
+var requested = (arguments[0] || '').toLowerCase();
+if (url === requested) { return [location.href, null]; }
+var title = (document.title || '').toLowerCase();
+if (/\\/(login|signin|auth)/.test(url)) { return [location.href, 'login URL']; }
+if (title.indexOf('sign in') !== -1 || title.indexOf('log in') !== -1 ||
+        title.indexOf('authentication required') !== -1) {
+    return [location.href, 'login title'];
+}
+if (document.querySelector('input[type="password"]')) {
+    var userField = document.querySelector(
+        'input[type="email"], input[autocomplete="username"], ' +
+        'input[name*="user" i], input[name*="email" i], input[id*="user" i], input[id*="email" i]');
+    var loginForm = Array.prototype.some.call(document.forms, function (form) {
+        return /login|signin|sign-in|auth|session/i.test(form.getAttribute('action') || '');
+    });
+    if (userField || loginForm) { return [location.href, 'password form']; }
+}
+return [location.href, null];
+"""
+
+
+def _default_log(message: str):
+    timestamp = datetime.now().strftime("[%H:%M:%S]")
+    print(f"{timestamp} {message}", flush=True)
+
+
+class CaptureEngine:
+    """Runs capture batches for a CaptureConfig. Safe to call from a worker thread."""
+
+    def __init__(self, config: CaptureConfig = None, log=None, progress=None, driver_factory=None):
+        self.config = config or CaptureConfig()
+        self.log = log or _default_log
+        self.progress = progress or (lambda msg, value: None)
+        # callable(options) -> driver, replacing Chrome (e.g. a fake driver for benchmarks)
+        self.driver_factory = driver_factory
+
+        # TRACKERS
+        self.total_items = 0  # Items in the current run (grows while streaming/discovering)
+        self.resumed_count = 0  # Items the journal skipped as already captured
+        self._reported_origins = set()  # Unreachable servers already logged
+        self.failed_items = []  # Track failed captures for retry
+        self.driver = None
+        self.is_running = False
+        self.browser_opened_for_login = False  # Track if browser was opened manually
+        self.user_logged_in = False  # Track if user has logged in during this session
+        self.login_prompt_shown = False  # Only show login prompt once per capture session
+        self.consecutive_connection_errors = 0  # Track connection refused errors
+        self.worker_drivers = []  # Extra browsers owned by parallel workers
+        self.started_count = 0  # Items handed to a worker in this run
+        self.completed_count = 0  # Items finished (success or failure) in this run
+        self.server_unreachable = False  # Set when repeated connection errors stop the run
+        self._state_lock = threading.Lock()  # Guards counters/lists shared by workers
+        self.settler = PageSettler(
+            timeout=self.config.settle_timeout, load_lazy=self.config.load_lazy
+        )
+        self.pipeline = None  # SavePipeline for the current run
+        self.spare_pool = None  # WarmSparePool for the current run (if enabled)
+        self.bundle = None  # PdfBundleWriter for the current run (if enabled)
+        self.crawler = None  # Crawler for the current run (discovery mode)
+        self.prewarmer = None  # RoutePrewarmer for the current run (if enabled)
+        self.retry = RetryScheduler()  # Backoff and per-class budgets, replaced for each run
+        self.journal = None  # JobJournal for the current run (if enabled)
+        self.timings = TimingRecorder()  # Per-stage timings, replaced for each run
+        self.memory = MemoryBudget(self.config.memory_budget_mb * MB)  # Replaced for each run
+        self.viewports = parse_viewports(self.config.viewports)  # ViewportProfiles, [] = window
+        self._reserved_paths = set()  # Output paths handed out but not yet on disk
+
+    # ==================================================
+    #              BROWSER INITIALIZATION
+    # ==================================================
+    def new_chrome_options(self, use_profile: bool = True, headless: bool = None):
+        """Build Chrome options from the current config."""
+        options = Options()
+
+        # Add headless mode if enabled
+        if self.config.headless if headless is None else headless:
+            options.add_argument("--headless=new")
+
+        # Use persistent profile if enabled. Chrome locks a profile directory to a single
+        # browser, so parallel workers beyond the first run without it.
+        if use_profile and self.config.persist_session:
+            options.add_argument(f"--user-data-dir={self.config.chrome_user_data_dir}")
+        # Note: Cookies are allowed during the session to maintain login state between pages
+        # If you want to clear cookies between runs, close and reopen the browser
+
+        # Network events for settle detection
+        options.set_capability(*PERFORMANCE_LOG_CAPABILITY)
+        return options
+
+    def _start_chrome(self, options):
+        """Start Chrome with the cached ChromeDriver, re-resolving once if it is stale."""
+        if self.driver_factory is not None:
+            return self.driver_factory(options)
+        try:
+            return webdriver.Chrome(
+                service=Service(driver_cache.resolve_chromedriver(self.log)), options=options
+            )
+        except SessionNotCreatedException as e:
+            # Other failures (profile in use, Chrome crashing) wouldn't be fixed by
+            # another driver, so the cache is only dropped for a version mismatch
+            if not driver_cache.is_version_mismatch(e):
+                raise
+            self.log("Cached ChromeDriver doesn't match Chrome, resolving again...")
+            driver_cache.invalidate()
+            return webdriver.Chrome(
+                service=Service(driver_cache.resolve_chromedriver(self.log)), options=options
+            )
+
+    def launch_driver(self, use_profile: bool = True):
+        """Start a new Chrome session sized for capture."""
+        start = time.perf_counter()
+        new_driver = self._start_chrome(self.new_chrome_options(use_profile))
+        new_driver.set_window_size(self.config.width, 900)
+        # Set page load timeout
+        new_driver.set_page_load_timeout(60)
+        self.apply_resource_blocking(new_driver)
+        self.timings.event("driver_start", time.perf_counter() - start)
+        return new_driver
+
+    def apply_resource_blocking(self, driver):
+        """Block the configured resource profiles/patterns for this browser session."""
+        patterns = blocked_url_patterns(self.config.block_profiles, self.config.block_patterns)
+        if not patterns:
+            return
+        try:
+            apply_blocking(driver, patterns)
+        except Exception as e:
+            self.log(f"Could not enable resource blocking: {e}")
+
+    def open_login_browser(self):
+        """Open a visible browser the user can log in with before capturing."""
+        if self.config.persist_session:
+            self.log("Using persistent Chrome profile for login sessions")
+        self.log("Opening browser for manual login...")
+        self.driver = self._start_chrome(self.new_chrome_options(headless=False))
+        self.driver.set_window_size(self.config.width, 900)
+        self.browser_opened_for_login = True
+
+    def close_browser(self):
+        """Quit the main browser session if one is open."""
+        if self.driver is not None:
+            self.settler.forget(self.driver)
+            self.driver.quit()
+            self.driver = None
+
+    def quit_browsers(self):
+        """Quit every browser of the run, e.g. after Ctrl+C left worker threads behind."""
+        self.is_running = False
+        if self.spare_pool is not None:
+            self.spare_pool.close()
+            self.spare_pool = None
+        for driver in list(self.worker_drivers):
+            self.settler.forget(driver)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.worker_drivers.clear()
+        try:
+            self.close_browser()
+        except Exception:
+            self.driver = None
+
+    def reset_session(self):
+        """Clear per-session login and failure tracking before a fresh run."""
+        self.failed_items = []
+        self.user_logged_in = False
+        self.login_prompt_shown = False
+        self.consecutive_connection_errors = 0
+
+    def stop(self):
+        self.is_running = False
+        self.log("Stopping capture...")
+        for driver in [self.driver] + list(self.worker_drivers):
+            if driver:
+                try:
+                    driver.execute_script("window.stop();")  # Stop page loading
+                except Exception:
+                    pass
+
+    def _record_failure(self, item, reason: str = ""):
+        """Thread-safe append to the failed items list (and the journal, if any)."""
+        group = item.get("group")
+        if group is not None:
+            item = group.item  # A viewport output failed: the whole URL is retried
+        with self._state_lock:
+            if group is not None and any(failed is item for failed in self.failed_items):
+                return
+            self.failed_items.append(item)
+        if self.journal is not None:
+            self.journal.mark_failed(item["url"], reason)
+
+    # ==================================================
+    #               MAIN CAPTURE PROCESS
+    # ==================================================
+    def run(self, items) -> bool:
+        """Capture every item. Returns True if the batch ran to completion (not stopped).
+
+        ``items`` may be a list or any iterable, e.g. a generator streaming a
+        very long URL file; it is consumed in batches as workers make room.
+        """
+        self.journal = self._open_journal()
+        self.total_items = 0
+        self.resumed_count = 0
+        self._reported_origins = set()
+        self.is_running = True
+        self.settler = PageSettler(
+            timeout=self.config.settle_timeout, load_lazy=self.config.load_lazy
+        )
+        self.retry = RetryScheduler()
+        self.pipeline = SavePipeline(max_pending=self.config.max_pending_saves)
+        self.timings = self._new_timing_recorder()
+        self.memory = MemoryBudget(self.config.memory_budget_mb * MB)
+        self.viewports = parse_viewports(self.config.viewports)
+        if self.viewports:
+            self.log(
+                f"Capturing each page at {len(self.viewports)} viewport(s): "
+                + ", ".join(profile.label for profile in self.viewports)
+            )
+        if self.config.pdf_bundle:
+            os.makedirs(self.config.save_directory, exist_ok=True)
+            bundle_path = self.get_unique_filepath(
+                self.config.save_directory,
+                f"captures_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+            )
+            self.bundle = PdfBundleWriter(bundle_path)
+            self.log(f"Writing all captures to {os.path.basename(bundle_path)}")
+        try:
+            per_host = self.config.per_host
+            self.completed_count = 0
+            self.started_count = 0
+            self.server_unreachable = False
+
+            self.crawler = None
+            if self.config.crawl:
+                self.crawler = Crawler(
+                    self.config.fmt,
+                    self.config.include_domain,
+                    max_depth=self.config.crawl_depth,
+                    max_pages=self.config.crawl_max_pages,
+                    scope=self.config.crawl_scope,
+                )
+                self.log(
+                    f"Discovery mode: following links up to {self.config.crawl_depth} level(s), "
+                    f"max {self.config.crawl_max_pages} pages"
+                )
+
+            self.prewarmer = None
+            if self.config.prewarm:
+                self.prewarmer = RoutePrewarmer(
+                    self.config.prewarm_concurrency,
+                    on_warmed=lambda route, seconds, ok: self.timings.event(
+                        "prewarm", seconds, route=route, ok=ok
+                    ),
+                )
+                self.log(
+                    f"Pre-warming routes ahead of the browsers "
+                    f"({self.config.prewarm_concurrency} at a time)"
+                )
+
+            patterns = blocked_url_patterns(self.config.block_profiles, self.config.block_patterns)
+            if patterns:
+                self.log(f"Blocking {len(patterns)} resource URL pattern(s)")
+
+            # The first batch decides the browser count; the rest is fed while capturing
+            source = iter(items)
+            first_batch = list(itertools.islice(source, INGEST_BATCH))
+            lookahead = list(itertools.islice(source, 1))
+            streaming = bool(lookahead)
+            source = itertools.chain(lookahead, source)
+            pending_items = self._admit(first_batch)
+            workers = self.config.workers
+            if not streaming:
+                # No browser at all when every server is down. Discovery mode can
+                # grow past its seeds, up to the page limit.
+                if self.crawler is not None and pending_items:
+                    workers = min(workers, self.config.crawl_max_pages)
+                else:
+                    workers = min(workers, len(pending_items))
+
+            # Spares run without the persistent profile, so a lone browser using
+            # it could never swap one in
+            if self.config.warm_spare and workers and not (
+                workers == 1 and self.config.persist_session
+            ):
+                self.spare_pool = WarmSparePool(
+                    lambda: self.launch_driver(use_profile=False),
+                    size=1,
+                    log=self.log,
+                    on_quit=self.settler.forget,
+                )
+                self.spare_pool.start()
+
+            # A single browser keeps the original strictly sequential behaviour
+            queue = CaptureQueue(pending_items, per_host_limit=per_host if workers > 1 else 0)
+            feeder = None
+            if streaming:
+                queue.begin_feed()
+                feeder = threading.Thread(
+                    target=self._feed_queue, args=(source, queue), daemon=True
+                )
+                feeder.start()
+
+            if workers > 1:
+                self.log(f"Starting {workers} parallel browsers (max {per_host} per host)")
+                if self.config.persist_session:
+                    self.log("Note: only browser #1 uses the persistent Chrome profile")
+
+            threads = []
+            for worker_id in range(workers):
+                thread = threading.Thread(
+                    target=self._capture_worker,
+                    args=(worker_id, queue),
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+            for thread in threads:
+                thread.join()
+            if feeder is not None:
+                # Nothing takes items any more; unread ones count as not processed
+                queue.close()
+                feeder.join()
+
+            # Let queued encodes/writes finish so the summary counts them
+            self.pipeline.drain()
+
+            # Items no worker could start (e.g. every browser failed to launch)
+            leftover = queue.drain()
+            if leftover and self.is_running:
+                self.log(f"{len(leftover)} URL(s) were not processed")
+                with self._state_lock:
+                    self.failed_items.extend(leftover)
+
+            if not self.is_running:
+                self.log("Capture stopped by user")
+                return False
+
+            total = self.total_count
+            if self.resumed_count:
+                counts = self.journal.counts()
+                self.log(
+                    f"Resumed: skipped {self.resumed_count} URL(s) already captured"
+                    f" (journal: {counts.get('done', 0)} done,"
+                    f" {counts.get('failed', 0)} failed)"
+                )
+            if self.crawler is not None and self.crawler.limit_reached:
+                self.log(f"Discovery stopped at the {self.config.crawl_max_pages} page limit")
+            self.log(f"Finished processing all {total} URLs")
+            # Update progress bar to 100% on completion
+            self.progress("Complete", total)
+
+            # Calculate success count
+            success_count = total - len(self.failed_items)
+            self.log(
+                f"Summary: {success_count} succeeded, {len(self.failed_items)} failed out of {total} total"
+            )
+
+            if self.failed_items:
+                self.log(f"Failed URLs: {[item['url'] for item in self.failed_items]}")
+            else:
+                self.log("Capture process finished successfully - all URLs captured!")
+            return True
+
+        except Exception as e:
+            self.log(f"Fatal error: {e}")
+            return False
+
+        finally:
+            if self.prewarmer is not None:
+                self._close_prewarmer()
+            self.pipeline.shutdown()
+            if self.bundle is not None:
+                self._close_bundle()
+            self._report_timings()
+            self._report_memory()
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+            if self.spare_pool is not None:
+                self.spare_pool.close()
+                self.spare_pool = None
+            # Only close browser if it was created during capture (not opened for login)
+            if self.driver is not None and not self.browser_opened_for_login:
+                self.settler.forget(self.driver)
+                try:
+                    self.driver.quit()
+                    self.driver = None
+                    self.log("Browser closed")
+                except Exception:
+                    pass
+            self.is_running = False
+
+    def _admit(self, items):
+        """Register a batch of new items with the run; returns the ones to queue."""
+        if self.crawler is not None:
+            # Seeds a previous run already captured still set the crawl's scope
+            self.crawler.add_seeds(items)
+        if self.journal is not None:
+            if self.crawler is not None and self.config.resume:
+                # Links found on pages that are skipped now are only in the journal
+                items = items + self.crawler.add_found(self.journal.discovered())
+            remaining = self.journal.register(items, resume=self.config.resume)
+            self.resumed_count += len(items) - len(remaining)
+            items = remaining
+        with self._state_lock:
+            self.total_items += len(items)
+        if self.config.preflight:
+            items = self._skip_unreachable(items)
+        if self.prewarmer is not None:
+            self.prewarmer.submit(items)
+        return items
+
+    def _feed_queue(self, source, queue):
+        """Move the rest of a streamed source into the queue as workers make room."""
+        try:
+            for batch in iter_batches(source):
+                batch = self._admit(batch)
+                for index, item in enumerate(batch):
+                    if not (queue.wait_for_room(2 * INGEST_BATCH) and self.is_running):
+                        self._fail_unfed(batch[index:], source)
+                        return
+                    queue.put(item)
+        except Exception as e:
+            self.log(f"Error reading URLs: {e}")
+        finally:
+            queue.end_feed()
+
+    def _fail_unfed(self, admitted, source):
+        """Items a stopped feed never queued; failed unless the user stopped the run."""
+        if not self.is_running and not self.server_unreachable:
+            return
+        with self._state_lock:
+            self.failed_items.extend(admitted)
+        unprocessed = len(admitted)
+        # The rest of the source may be a very long stream: read it one item at a time
+        for item in source:
+            with self._state_lock:
+                self.total_items += 1
+                self.failed_items.append(item)
+            unprocessed += 1
+        if self.is_running:
+            self.log(f"{unprocessed} URL(s) were not processed")
+
+    def _skip_unreachable(self, items):
+        """Probe every server up front; URLs on unreachable ones fail without a browser."""
+        reachable, unreachable, errors = partition_reachable(items)
+        for origin, message in errors.items():
+            # Streamed batches hit the probe cache; report each server once
+            if origin not in self._reported_origins:
+                self._reported_origins.add(origin)
+                self.log(f"⚠ Skipping URLs on {origin}: {message}")
+        if unreachable:
+            with self._state_lock:
+                self.failed_items.extend(unreachable)
+                self.started_count += len(unreachable)
+                self.completed_count += len(unreachable)
+            if self.journal is not None:
+                for item in unreachable:
+                    self.journal.mark_failed(item["url"], "server unreachable")
+        return reachable
+
+    def _close_prewarmer(self):
+        prewarmer, self.prewarmer = self.prewarmer, None
+        prewarmer.close()
+        line = f"Pre-warmed {prewarmer.warmed} route(s)"
+        if prewarmer.failed:
+            line += f", {prewarmer.failed} failed"
+        seconds, route = prewarmer.slowest
+        if route:
+            line += f"; slowest {seconds:.2f}s ({route})"
+        self.log(line)
+
+    def _open_journal(self):
+        """The save folder's job journal, or None if disabled or it can't be opened."""
+        if not self.config.journal:
+            return None
+        path = os.path.join(self.config.save_directory, JOURNAL_FILENAME)
+        try:
+            os.makedirs(self.config.save_directory, exist_ok=True)
+            return JobJournal(path)
+        except (OSError, sqlite3.Error) as e:
+            self.log(f"Cannot open job journal {path}: {e}")
+            return None
+
+    def _new_timing_recorder(self):
+        path = self.config.timings_path
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                return TimingRecorder(path)
+            except OSError as e:
+                self.log(f"Cannot write timings to {path}: {e}")
+        return TimingRecorder()
+
+    def _report_timings(self):
+        self.timings.close()
+        lines = self.timings.summary()
+        if lines:
+            self.log("Stage timings:")
+            for line in lines:
+                self.log("  " + line)
+        if self.timings.path:
+            self.log(f"Per-URL timings written to {self.timings.path}")
+
+    def _report_memory(self):
+        largest, url = self.memory.largest
+        if not largest:
+            return
+        line = f"Memory: largest capture ~{largest / MB:.0f} MB ({url}), "
+        line += f"most in flight ~{self.memory.peak / MB:.0f} MB"
+        if self.memory.limit:
+            line += f" of the {self.memory.limit // MB} MB budget"
+        rss = peak_rss_bytes()
+        if rss:
+            line += f"; process peak {rss / MB:.0f} MB"
+        self.log(line)
+
+    @property
+    def total_count(self) -> int:
+        """Items in the current run so far, including pages found in discovery mode."""
+        with self._state_lock:
+            return self.total_items
+
+    def _queue_discovered(self, driver, item, queue):
+        """Discovery mode: queue new in-scope links from the page that is loaded now."""
+        try:
+            new_items = self.crawler.discover(driver, item)
+        except Exception as e:
+            self.log(f"Could not collect links from {item['url']}: {e}")
+            return
+        if self.journal is not None:
+            # Pages a previous run already captured stay skipped when resuming
+            new_items = self.journal.register(new_items, resume=self.config.resume)
+        if not new_items:
+            return
+        with self._state_lock:
+            self.total_items += len(new_items)
+        for new_item in new_items:
+            queue.put(new_item)
+        if self.prewarmer is not None:
+            self.prewarmer.submit(new_items)
+        self.log(f"Found {len(new_items)} new page(s) on {item['url']}")
+
+    def _capture_worker(self, worker_id, queue):
+        """Pull items from the shared queue and capture them with this worker's browser."""
+        driver = None
+        try:
+            # Worker #1 drives self.driver so a browser opened for login is reused
+            if worker_id == 0:
+                if self.driver is None:
+                    self.log("Initializing browser...")
+                    self.driver = self.launch_driver()
+                else:
+                    # Browser already open (from login), just resize it
+                    self.driver.set_window_size(self.config.width, 900)
+                    self.driver.set_page_load_timeout(60)
+                    self.apply_resource_blocking(self.driver)
+                    self.log("Reusing existing browser session")
+                driver = self.driver
+            else:
+                self.log(f"Initializing browser #{worker_id + 1}...")
+                driver = self.launch_driver(use_profile=False)
+                self.worker_drivers.append(driver)
+        except Exception as e:
+            self.log(f"Failed to initialize browser #{worker_id + 1}: {e}")
+            return
+
+        try:
+            while self.is_running:
+                item = queue.get()
+                if item is None:
+                    break
+                if self.journal is not None:
+                    self.journal.mark_in_flight(item["url"])
+
+                total = self.total_count
+                with self._state_lock:
+                    self.started_count += 1
+                    position = self.started_count
+                    done = self.completed_count
+
+                # Log progress
+                progress_msg = f"[{position}/{total}] Processing: {item['url']}"
+                self.log(progress_msg)
+                self.progress(f"[{position}/{total}] {item['url']}", done)
+
+                retry_delay = None
+                try:
+                    driver, retry_delay = self._capture_item(worker_id, driver, item, queue)
+                finally:
+                    if retry_delay is not None:
+                        # Back of the queue; this browser moves on to other URLs meanwhile
+                        queue.put_later(item, retry_delay)
+                    queue.task_done(item)
+                    with self._state_lock:
+                        if retry_delay is None:
+                            self.completed_count += 1
+                        else:
+                            self.started_count -= 1  # Counted again when it comes back
+                        done = self.completed_count
+                    self.progress(f"[{done}/{total}] {item['url']}", done)
+        finally:
+            if worker_id != 0 and driver is not None:
+                if driver in self.worker_drivers:
+                    self.worker_drivers.remove(driver)
+                self.settler.forget(driver)
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+
+    def _replace_driver(self, worker_id, old_driver, new_driver):
+        """Swap a worker's browser, keeping self.driver / worker_drivers in sync."""
+        if old_driver is not None:
+            self.settler.forget(old_driver)
+        if worker_id == 0:
+            self.driver = new_driver
+        else:
+            if old_driver in self.worker_drivers:
+                self.worker_drivers.remove(old_driver)
+            if new_driver is not None:
+                self.worker_drivers.append(new_driver)
+        return new_driver
+
+    def _replacement_driver(self, worker_id):
+        """A browser to replace a dead one: a warm spare if available, else a fresh launch."""
+        use_profile = worker_id == 0 and self.config.persist_session
+        # Spares run without the persistent profile, so they can't stand in for it
+        if self.spare_pool is not None and not use_profile:
+            spare = self.spare_pool.take()
+            if spare is not None:
+                self.log("Swapped in warm standby browser")
+                return spare
+        return self.launch_driver(use_profile=worker_id == 0)
+
+    def _capture_item(self, worker_id, driver, item, queue):
+        """Make one capture attempt at a URL.
+
+        Returns the (possibly restarted) driver and, if the URL should be tried
+        again later, the backoff delay in seconds (else None).
+        """
+        delay = self.config.delay
+
+        # CHECK IF BROWSER IS STILL OPEN (only restart if actually closed)
+        if driver is None:
+            self.log("Browser is None - initializing...")
+            try:
+                driver = self._replace_driver(
+                    worker_id, None, self.launch_driver(use_profile=worker_id == 0)
+                )
+                self.log("Browser initialized successfully")
+            except Exception as init_err:
+                self.log(f"Failed to initialize browser: {init_err}")
+                self._record_failure(item, f"browser failed to start: {init_err}")
+                return driver, None
+        else:
+            # Only check browser health if driver exists - don't restart unnecessarily
+            try:
+                # Quick check - try to get window handles (lightweight operation)
+                _ = driver.window_handles
+            except Exception as browser_check_err:
+                # Only restart on specific exceptions that indicate browser is actually closed
+                error_str = str(browser_check_err).lower()
+                if any(
+                    keyword in error_str
+                    for keyword in [
+                        "invalid session id",
+                        "no such window",
+                        "session deleted",
+                        "target frame detached",
+                    ]
+                ):
+                    self.log("Browser was closed. Attempting to restart...")
+                    try:
+                        dead_driver = driver
+                        # Recreate browser with same options (or swap in a warm spare)
+                        driver = self._replace_driver(
+                            worker_id, driver, self._replacement_driver(worker_id)
+                        )
+                        # Reap the dead session's chromedriver process
+                        try:
+                            dead_driver.quit()
+                        except Exception:
+                            pass
+                        if worker_id == 0:
+                            self.browser_opened_for_login = (
+                                False  # Reset flag since we're recreating
+                            )
+                        self.log("Browser restarted successfully")
+                    except Exception as re_init_err:
+                        self.log(f"Failed to restart browser: {re_init_err}")
+                        driver = self._replace_driver(worker_id, driver, None)
+                        self._record_failure(item, f"browser failed to restart: {re_init_err}")
+                        return driver, None
+                # If it's not a fatal error, continue - browser might still work
+
+        url = item["url"]
+
+        # One attempt per turn; failures go back to the queue via the retry scheduler
+        capture_success = False
+        recorded_failure = False
+        retry_delay = None
+        try:
+            self.settler.begin(driver)
+            with self.timings.span(url, "get"):
+                driver.get(url)
+
+            # Wait for page to load (wait for document.readyState)
+            try:
+                with self.timings.span(url, "ready_wait"):
+                    WebDriverWait(driver, delay + 5).until(
+                        lambda d: d.execute_script("return document.readyState") == "complete"
+                    )
+            except TimeoutException:
+                retry_delay = self._schedule_retry(url, TIMEOUT, "page load timeout")
+                if retry_delay is not None:
+                    return driver, retry_delay
+                self.log(f"Warning: Page load timeout for {url}, proceeding anyway...")
+
+            # Wait for network, images, fonts and layout to go quiet
+            with self.timings.span(url, "settle"):
+                self.settler.wait(driver)
+
+            # Check if we're stuck on a login page (one round trip, verdict computed in-page)
+            with self.timings.span(url, "login_probe"):
+                current_url, login_reason = driver.execute_script(LOGIN_PROBE_JS, url)
+            current_url = current_url.lower()
+            is_login_page = login_reason is not None
+            skip_capture = False
+
+            if is_login_page:
+                with self._state_lock:
+                    prompt_already_shown = self.login_prompt_shown
+                    if not prompt_already_shown:
+                        self.login_prompt_shown = True
+
+                if self.config.skip_login:
+                    retry_delay = self._login_failure(item, login_reason)
+                    if retry_delay is not None:
+                        return driver, retry_delay
+                    self.log(f"SKIPPED (login required): {url}")
+                    recorded_failure = True
+                    skip_capture = True
+                elif prompt_already_shown and not self.user_logged_in:
+                    # Already showed login prompt and user didn't log in - skip waiting
+                    retry_delay = self._login_failure(item, login_reason)
+                    if retry_delay is not None:
+                        return driver, retry_delay
+                    self.log(f"⚠ LOGIN REQUIRED: {url} (capturing login page)")
+                    # Capture the login page but mark as needing retry
+                    recorded_failure = True
+                else:
+                    # First time seeing login page - give user a chance to log in
+                    self.log(f"⚠ LOGIN PAGE DETECTED: {current_url} ({login_reason})")
+                    self.log(f"   Original URL: {url}")
+
+                    if not prompt_already_shown:
+                        self.log("👉 Log in now in the browser window (waiting 10 seconds)...")
+                        self.log("   TIP: Use 'Open Browser' button next time to log in first!")
+
+                        # Wait up to 10 seconds for user to log in (reduced from 30)
+                        login_page_url = current_url
+                        for wait_attempt in range(2):  # 2 * 5 = 10 seconds
+                            time.sleep(5)
+                            if not self.is_running:
+                                break
+                            try:
+                                current_url_after_wait = driver.current_url.lower()
+                                if (
+                                    current_url_after_wait != login_page_url
+                                    and "/login" not in current_url_after_wait
+                                    and "/signin" not in current_url_after_wait
+                                ):
+                                    self.log(
+                                        "✓ Login detected! Continuing with authenticated session..."
+                                    )
+                                    self.user_logged_in = True
+                                    # Re-navigate to original URL now that we're logged in
+                                    self.settler.begin(driver)
+                                    driver.get(url)
+                                    self.settler.wait(driver)
+                                    break
+                            except Exception:
+                                break
+
+                        if not self.user_logged_in:
+                            self.log(
+                                "⚠ No login detected. Capturing login pages for protected URLs."
+                            )
+                            self.log(
+                                "   To capture actual pages: Stop, click 'Open Browser', log in, then Start again."
+                            )
+                            retry_delay = self._login_failure(item, login_reason)
+                            if retry_delay is not None:
+                                return driver, retry_delay
+                            recorded_failure = True
+
+                    self.log("Continuing...")
+
+            # Cookies are preserved between pages to maintain login sessions
+            # This allows capturing multiple pages from the same site without re-authenticating
+
+            if not skip_capture:
+                if self.crawler is not None and not is_login_page:
+                    self._queue_discovered(driver, item, queue)
+
+                if self.viewports:
+                    # Each profile is measured, and tiled if need be, on its own
+                    self.capture_viewports(driver, item)
+                else:
+                    total_height = self.measure_page_height(driver)
+                    if self.config.tile_long_pages and total_height > MAX_CAPTURE_HEIGHT:
+                        self.capture_tiled(driver, item, total_height)
+                    else:
+                        self.capture_within_budget(driver, item, total_height)
+                capture_success = True
+
+        except Exception as e:
+            error_str = str(e)
+
+            # Track connection refused errors
+            if "net::ERR_CONNECTION_REFUSED" in error_str:
+                with self._state_lock:
+                    self.consecutive_connection_errors += 1
+                    stop_now = (
+                        self.consecutive_connection_errors >= 3 and not self.server_unreachable
+                    )
+                    if stop_now:
+                        self.server_unreachable = True
+                if stop_now:
+                    self.log("=" * 50)
+                    self.log("❌ SERVER NOT RUNNING - Stopping capture")
+                    self.log("=" * 50)
+                    self.log("Your development server is not running.")
+                    self.log("Steps to fix:")
+                    self.log("  1. Open a terminal in your project folder")
+                    self.log("  2. Run: npm run dev")
+                    self.log("  3. Wait for 'Ready' message")
+                    self.log("  4. Then click Start again")
+                    self.is_running = False
+                    # Add remaining items (including ones waiting to retry) to failed list
+                    queue.close()
+                    remaining_items = queue.drain()
+                    with self._state_lock:
+                        self.failed_items.append(item)
+                        self.failed_items.extend(remaining_items)
+                    if self.journal is not None:
+                        for failed_item in [item] + remaining_items:
+                            self.journal.mark_failed(failed_item["url"], "server not running")
+                    recorded_failure = True
+
+            if not recorded_failure and self.is_running:
+                failure_class = classify(e)
+                retry_delay = self._schedule_retry(url, failure_class, error_str[:50])
+                if retry_delay is None:
+                    attempts = self.retry.retries(url, failure_class) + 1
+                    self.log(f"Error on {url} after {attempts} attempt(s): {e}")
+                    self._record_failure(item, f"{failure_class}: {error_str}")
+                    recorded_failure = True
+                    if "net::ERR_CONNECTION_REFUSED" in error_str:
+                        self.log("⚠ Server connection refused - is your dev server running?")
+
+        # Reset connection error counter on successful capture
+        if capture_success:
+            with self._state_lock:
+                self.consecutive_connection_errors = 0
+
+        if not capture_success and retry_delay is None:
+            # In-flight items on other workers when the server check stops the run
+            if self.server_unreachable and not recorded_failure:
+                self._record_failure(item, "server not running")
+            self.log(f"Failed to capture {url}")
+            self.timings.complete(url, ok=False)
+
+        return driver, retry_delay
+
+    def _schedule_retry(self, url, failure_class, detail):
+        """Backoff before `url` is tried again, or None when its retry budget is spent."""
+        retry_delay = self.retry.schedule(url, failure_class)
+        if retry_delay is not None:
+            self.log(
+                f"Retry {self.retry.retries(url, failure_class)}/"
+                f"{self.retry.budgets[failure_class]} for {url} ({detail}) "
+                f"in {retry_delay:.1f}s"
+            )
+        return retry_delay
+
+    def _login_failure(self, item, login_reason):
+        """A URL that landed on a login page: its retry delay, or None once recorded as failed.
+
+        Login pages go through the retry scheduler as the LOGIN class, whose
+        budget is 0 by default - they only change once the user logs in.
+        """
+        retry_delay = self._schedule_retry(item["url"], LOGIN, f"login page: {login_reason}")
+        if retry_delay is None:
+            self._record_failure(item, "login required")
+        return retry_delay
+
+    # ==================================================
+    #        FULL PAGE SCREENSHOT CAPTURE
+    # ==================================================
+    def measure_page_height(self, driver):
+        return driver.execute_script(
+            "return Math.max("
+            "document.body.scrollHeight,"
+            "document.documentElement.scrollHeight)"
+        )
+
+    def _scroll_through_page(self, driver, total_height, viewport_height):
+        """Bring each viewport-sized band of the page into view once, then settle at the top.
+
+        Each step waits for two animation frames (not a fixed sleep) so scroll and
+        IntersectionObserver driven content sees the position. When the window
+        already covers the whole page no stepping is needed.
+        """
+        for scroll_pos in range(viewport_height, total_height, viewport_height):
+            driver.execute_async_script(SCROLL_AND_WAIT_FRAME_JS, scroll_pos)
+
+        driver.execute_script("window.scrollTo(0, 0);")
+        self.settler.wait(driver, quiet_period=RESCROLL_QUIET_PERIOD)
+
+    def capture_viewports(self, driver, item):
+        """Capture the loaded page once per viewport profile, each into its own file."""
+        group = OutputGroup(item, len(self.viewports))
+        try:
+            for profile in self.viewports:
+                apply_viewport(driver, profile, 0)  # 0: keep the window's height for now
+                output = dict(
+                    item,
+                    filename=variant_filename(item["filename"], profile.label),
+                    viewport=profile,
+                    group=group,
+                )
+                total_height = self.measure_page_height(driver)
+                if self.config.tile_long_pages and total_height > MAX_CAPTURE_HEIGHT:
+                    self.capture_tiled(driver, output, total_height)
+                else:
+                    self.capture_within_budget(driver, output, total_height)
+        except Exception:
+            # The URL is retried or failed as a whole, so the profiles already
+            # written would only be left behind next to the retry's files
+            if self.bundle is None:
+                for paths in group.abandon():
+                    self._remove_outputs(paths)
+            raise
+        finally:
+            clear_viewport(driver)
+
+    def _set_viewport_height(self, driver, profile, height):
+        """Make the viewport `height` CSS pixels tall, emulating `profile` if one is given."""
+        if profile is not None:
+            apply_viewport(driver, profile, height)
+        else:
+            driver.set_window_size(self.config.width, height)
+
+    def _output_finished(self, item, path, ok):
+        """Journal and timings bookkeeping once every output of the item's URL is finished."""
+        group = item.get("group")
+        if group is not None:
+            result = group.finish(path, ok)
+            if result is None:
+                # Saved after another profile of the URL failed
+                if ok and self.bundle is None:
+                    self._remove_outputs(path)
+                return
+            finished, ok, paths = result
+            if not finished:
+                return
+            path = "\n".join(paths)
+        if ok and self.journal is not None:
+            self.journal.mark_done(item["url"], path)
+        self.timings.complete(item["url"], ok)
+
+    def _remove_outputs(self, paths):
+        """Delete the file(s) of one output (tiled outputs list one part per line)."""
+        for path in paths.split("\n"):
+            try:
+                os.remove(path)
+            except OSError as e:
+                self.log(f"Could not remove {os.path.basename(path)}: {e}")
+
+    def capture_within_budget(self, driver, item, total_height):
+        """Capture a page in one piece if its bitmap fits the memory budget.
+
+        Over budget, PNG and PDF are captured in segments (same PNG output,
+        one PDF page per segment) and JPG/WebP at a reduced scale. The
+        estimate is held against the shared budget until the bitmap is gone:
+        right after the screenshot for formats Chrome encodes, after the
+        save for PDF.
+        """
+        url = item["url"]
+        fmt = self.config.fmt
+        css_width, pixel_ratio = driver.execute_script(VIEWPORT_METRICS_JS)
+        profile = item.get("viewport")
+        pixel_width = round((profile.width if profile else self.config.width) * pixel_ratio)
+        pixel_height = round(min(total_height + 200, MAX_CAPTURE_HEIGHT) * pixel_ratio)
+        estimate = estimate_capture_bytes(pixel_width, pixel_height, fmt)
+        scale = 1.0
+        if fmt == "webp" and pixel_height > WEBP_MAX_HEIGHT:
+            too_tall = f"{pixel_height}px is taller than WebP allows ({WEBP_MAX_HEIGHT}px)"
+            if self.config.tile_long_pages:
+                self.log(f"{item['filename']}: {too_tall}, capturing in parts")
+                return self.capture_tiled(driver, item, total_height)
+            scale = math.floor(WEBP_MAX_HEIGHT / pixel_height * 100) / 100
+            estimate = int(estimate * scale * scale)
+            self.log(f"{item['filename']}: {too_tall}, capturing at {scale:.0%} scale")
+        if not self.memory.fits(estimate):
+            over = (
+                f"~{estimate // MB} MB bitmap exceeds the "
+                f"{self.memory.limit // MB} MB memory budget"
+            )
+            if self.config.tile_long_pages and fmt in ("png", "pdf"):
+                self.log(f"{item['filename']}: {over}, capturing in segments")
+                tile_height = tile_height_for(
+                    self.memory.limit, pixel_width, pixel_ratio, self.config.tile_height
+                )
+                return self.capture_tiled(driver, item, total_height, tile_height)
+            budget_scale = scale_to_fit(estimate, self.memory.limit)
+            estimate = int(estimate * budget_scale * budget_scale)
+            scale *= budget_scale
+            self.log(f"{item['filename']}: {over}, capturing at {scale:.0%} scale")
+
+        self.memory.reserve(estimate, url)
+        self.timings.note_peak(url, "memory_mb", round(estimate / MB, 1))
+        try:
+            # PNG/JPG/WebP come back ready to write; PDF is built from a PNG
+            screenshot = self.capture_full_page(
+                driver,
+                total_height,
+                url=url,
+                fmt=fmt,
+                scale=scale,
+                css_width=css_width,
+                viewport=profile,
+            )
+        except Exception:
+            self.memory.release(estimate)
+            raise
+        if fmt in PASSTHROUGH_FORMATS:
+            self.memory.release(estimate)  # Chrome's bitmap is gone; only encoded bytes remain
+            estimate = 0
+        self.save_file(item, screenshot, reserved=estimate)
+
+    def capture_full_page(
+        self,
+        driver,
+        total_height=None,
+        url=None,
+        fmt="png",
+        scale=1.0,
+        css_width=None,
+        viewport=None,
+    ):
+        """Image bytes of the whole page, encoded by Chrome as ``fmt`` (png, jpg or webp).
+
+        ``url`` attributes stage timings to a capture. A ``scale`` below 1 has
+        Chrome render a smaller bitmap of the same page area (``css_width``
+        wide, the viewport's width if not given). ``viewport`` is a
+        ViewportProfile to emulate instead of resizing the window.
+        """
+        if total_height is None:
+            total_height = self.measure_page_height(driver)
+
+        max_height = min(total_height + 200, MAX_CAPTURE_HEIGHT)
+
+        # Warn if page is longer than capture limit
+        if total_height > MAX_CAPTURE_HEIGHT:
+            self.log(
+                f"⚠ WARNING: Page height ({total_height}px) exceeds capture limit ({MAX_CAPTURE_HEIGHT}px)"
+            )
+            self.log("   Page will be truncated. Enable tiling to capture very long pages in full.")
+
+        self._set_viewport_height(driver, viewport, max_height)
+        with self.timings.span(url, "scroll"):
+            self._scroll_through_page(driver, total_height, max_height)
+
+        params = {"format": "png", "captureBeyondViewport": True}
+        if scale < 1:
+            if css_width is None:
+                css_width = driver.execute_script(VIEWPORT_METRICS_JS)[0]
+            params["clip"] = {
+                "x": 0,
+                "y": 0,
+                "width": css_width,
+                "height": max_height,
+                "scale": scale,
+            }
+        if fmt in CDP_IMAGE_FORMATS:
+            # Chrome encodes lossy formats itself: no PNG decode/re-encode, smaller payload
+            params["format"] = CDP_IMAGE_FORMATS[fmt]
+            params["quality"] = self.config.quality
+        with self.timings.span(url, "screenshot"):
+            data = driver.execute_cdp_cmd("Page.captureScreenshot", params)
+
+        with self.timings.span(url, "decode"):
+            return base64.b64decode(data["data"])
+
+    def capture_tiled(self, driver, item, total_height, tile_height=None):
+        """Capture a very long page in segments, writing each one as it arrives."""
+        url = item["url"]
+        profile = item.get("viewport")
+        pixel_ratio = profile.scale if profile else driver.execute_script(VIEWPORT_METRICS_JS)[1]
+        # Segments are tile_height CSS pixels; in device pixels they must stay within
+        # the capture limit (and with it WebP's), so high-DPR pages get shorter ones
+        tile_height = min(
+            tile_height or self.config.tile_height, int(MAX_CAPTURE_HEIGHT // pixel_ratio)
+        )
+        self.log(f"Tiling {total_height}px page in {tile_height}px segments")
+
+        self._set_viewport_height(driver, profile, tile_height)
+        with self.timings.span(url, "scroll"):
+            self._scroll_through_page(driver, total_height, tile_height)
+
+        css_width, pixel_ratio = driver.execute_script(VIEWPORT_METRICS_JS)
+        pixel_width = round(css_width * pixel_ratio)
+        rects = list(iter_tile_rects(total_height, tile_height))
+        pixel_height = sum(round(height * pixel_ratio) for _, height in rects)
+
+        # One segment's bitmaps are in memory at a time
+        reserved = estimate_tile_bytes(pixel_width, round(tile_height * pixel_ratio))
+        self.timings.note_peak(url, "memory_mb", round(reserved / MB, 1))
+        with self.memory.reserved(reserved, url):
+            if self.bundle is not None:
+                collector = BundlePageCollector()
+                for y, height in rects:
+                    with self.timings.span(url, "screenshot"):
+                        tile = capture_tile(driver, y, css_width, height)
+                    with self.timings.span(url, "encode"):
+                        collector.add(
+                            fit_tile(to_rgb(tile), pixel_width, round(height * pixel_ratio))
+                        )
+                self._submit_to_bundle(item, self.bundle.add_document, collector.pages)
+                return self.bundle.path
+
+            folder = self.output_folder_for(item)
+            fmt = self.config.fmt
+            if fmt in ("png", "pdf"):
+                filepath = self.get_unique_filepath(folder, item["filename"])
+                if self.journal is not None:
+                    self.journal.set_output(url, filepath)
+                if fmt == "png":
+                    writer = StreamingPNGWriter(filepath, pixel_width, pixel_height)
+                else:
+                    writer = PdfTileWriter(filepath)
+            else:
+                # Only the numbered parts are written; the plain name stays free
+                filepath = None
+                stem, ext = os.path.splitext(item["filename"])
+
+                def path_for_part(number):
+                    part_path = self.get_unique_filepath(folder, f"{stem}_part{number}{ext}")
+                    if self.journal is not None:
+                        self.journal.set_output(url, part_path)
+                    return part_path
+
+                writer = JpegPartWriter(
+                    path_for_part,
+                    pixel_width,
+                    MAX_CAPTURE_HEIGHT,  # Below WebP's 16383px as well
+                    quality=self.config.quality,
+                    image_format="WEBP" if fmt == "webp" else "JPEG",
+                )
+
+            try:
+                for y, height in rects:
+                    with self.timings.span(url, "screenshot"):
+                        tile = capture_tile(driver, y, css_width, height)
+                    # Tile writers encode and write in one step
+                    with self.timings.span(url, "encode"):
+                        writer.add(
+                            fit_tile(to_rgb(tile), pixel_width, round(height * pixel_ratio))
+                        )
+                with self.timings.span(url, "write"):
+                    writer.close()
+            except Exception:
+                writer.abort()
+                raise
+            finally:
+                for path in [filepath] + getattr(writer, "paths", []):
+                    if path is not None:
+                        self._release_path(path)
+
+            paths = [filepath] if filepath is not None else writer.paths
+            for path in paths:
+                print("Saved:", path)
+                self.log(f"✓ Saved {os.path.basename(path)}")
+            self._output_finished(item, "\n".join(paths), ok=True)
+            return paths[0]
+
+    # ==================================================
+    #                  SAVE FILES
+    # ==================================================
+    def get_unique_filepath(self, folder: str, filename: str) -> str:
+        """Get a unique filepath, appending counter if the file exists or is being written."""
+        with self._state_lock:
+            filepath = os.path.join(folder, filename)
+            base, ext = os.path.splitext(filename)
+            counter = 1
+            while os.path.exists(filepath) or filepath in self._reserved_paths:
+                filepath = os.path.join(folder, f"{base}_{counter}{ext}")
+                counter += 1
+            self._reserved_paths.add(filepath)
+            return filepath
+
+    def _release_path(self, filepath: str):
+        with self._state_lock:
+            self._reserved_paths.discard(filepath)
+
+    def output_folder_for(self, item):
+        """Create (if needed) and return the absolute folder an item is saved into."""
+        root_save_directory = self.config.save_directory
+        folder = (
+            os.path.join(root_save_directory, item["subdir"])
+            if item["subdir"]
+            else root_save_directory
+        )
+
+        # Ensure folder path is absolute and normalized for Windows
+        folder = os.path.normpath(os.path.abspath(folder))
+
+        try:
+            os.makedirs(folder, exist_ok=True)
+        except OSError as e:
+            self.log(f"Error creating folder {folder}: {e}")
+            # Fallback to root directory if subfolder creation fails
+            folder = root_save_directory
+            os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def save_file(self, item, screenshot_bytes, reserved=0):
+        """Hand a screenshot to the save pipeline. Blocks only while the pipeline is full.
+
+        ``reserved`` bytes of the memory budget are released once the save is done.
+        """
+        if self.bundle is not None:
+            self._submit_to_bundle(item, self.bundle.add_capture, screenshot_bytes, reserved)
+            return
+
+        folder = self.output_folder_for(item)
+        filepath = self.get_unique_filepath(folder, item["filename"])
+        if self.journal is not None:
+            self.journal.set_output(item["url"], filepath)
+
+        def on_saved(future):
+            ok = False
+            try:
+                _, stage_timings = future.result()
+            except Exception as e:
+                self.log(f"Error saving {item['url']}: {e}")
+                self._record_failure(item, f"save failed: {e}")
+            else:
+                ok = True
+                self.timings.add_many(item["url"], stage_timings)
+                print("Saved:", filepath)
+                self.log(f"✓ Saved {item['filename']}")
+            finally:
+                self._release_path(filepath)
+                self.memory.release(reserved)
+                self._output_finished(item, filepath, ok)
+
+        self.pipeline.submit(screenshot_bytes, filepath, self.config.fmt, on_saved)
+
+    def _submit_to_bundle(self, item, append, pages, reserved=0):
+        """Queue an append to the run's PDF bundle (appends run one at a time, in order)."""
+        bundle_path = self.bundle.path
+        title = item["url"]
+        if item.get("viewport") is not None:
+            title += f" ({item['viewport'].label})"
+
+        def timed_append(title, pages):
+            # Bundle appends encode and write in one step
+            with self.timings.span(item["url"], "encode"):
+                append(title, pages)
+
+        def on_added(future):
+            ok = False
+            try:
+                future.result()
+            except Exception as e:
+                self.log(f"Error adding {item['url']} to PDF bundle: {e}")
+                self._record_failure(item, f"PDF bundle append failed: {e}")
+            else:
+                ok = True
+                self.log(f"✓ Added {title} to PDF bundle")
+            finally:
+                self.memory.release(reserved)
+                self._output_finished(item, bundle_path, ok)
+
+        self.pipeline.submit_ordered(timed_append, title, pages, on_done=on_added)
+
+    def _close_bundle(self):
+        bundle, self.bundle = self.bundle, None
+        self._release_path(bundle.path)
+        try:
+            if bundle.documents:
+                bundle.close()
+                print("Saved:", bundle.path)
+                self.log(
+                    f"✓ Saved PDF bundle {os.path.basename(bundle.path)} "
+                    f"({len(bundle.documents)} URL(s), {bundle.page_count} page(s))"
+                )
+            else:
+                bundle.abort()
+        except Exception as e:
+            self.log(f"Error writing PDF bundle: {e}")
@@ -0,0 +1,84 @@
+"""
+Streaming URL ingestion for very long lists.
+
+URLs are read one line at a time from files, stdin or pasted text,
+normalized and de-duplicated as they arrive, and turned into work items
+lazily. Only a fixed-size digest per distinct URL is kept for the dedup
+check, so memory stays flat however long the list is.
+"""
+
+import hashlib
+import itertools
+import re
+import sys
+
+from .urls import normalize_url_for_comparison, url_to_filepath, validate_url
+
+URL_PATTERN = re.compile(r'https?://[^\s<>"\'`]+')
+
+INGEST_BATCH = 500  # Work items the engine takes from a stream at a time
+
+
+class UrlDeduplicator:
+    """Remembers which normalized URLs were seen, as 16-byte digests."""
+
+    def __init__(self):
+        self._seen = set()
+        self.duplicates = 0
+
+    def add(self, url: str) -> bool:
+        """True the first time a URL (after normalization) is seen."""
+        key = normalize_url_for_comparison(url).encode("utf-8", "surrogatepass")
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        if digest in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(digest)
+        return True
+
+    def __len__(self):
+        return len(self._seen)
+
+
+def iter_unique_urls(lines, dedup: UrlDeduplicator = None):
+    """Yield each valid, not yet seen URL found in an iterable of text lines."""
+    dedup = dedup if dedup is not None else UrlDeduplicator()
+    for line in lines:
+        for match in URL_PATTERN.finditer(line):
+            url = match.group(0).rstrip(".,;:)")
+            if validate_url(url) and dedup.add(url):
+                yield url
+
+
+def iter_source_lines(sources):
+    """Yield lines from each source file ('-' = stdin) without reading a file whole."""
+    for source in sources:
+        if source == "-":
+            yield from sys.stdin
+        else:
+            with open(source, encoding="utf-8", errors="replace") as f:
+                yield from f
+
+
+def iter_work_items(urls, fmt: str, include_domain: bool = True):
+    """Lazily turn already de-duplicated URLs into capture work items."""
+    for url in urls:
+        subdir, filename = url_to_filepath(url, fmt, include_domain)
+        yield {"url": url, "subdir": subdir, "filename": filename}
+
+
+def iter_batches(iterable, size: int = INGEST_BATCH):
+    """Yield lists of up to `size` consecutive elements."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def peek(items, count: int = INGEST_BATCH):
+    """(first `count` items as a list, iterator over all items) without losing any."""
+    iterator = iter(items)
+    head = list(itertools.islice(iterator, count))
+    return head, itertools.chain(head, iterator)
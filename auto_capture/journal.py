@@ -0,0 +1,174 @@
+"""
+Crash-safe job journal kept in the save folder.
+
+Every URL of a run is recorded in a small SQLite database together with its
+state (pending, in_flight, done with the output path, failed with a reason).
+Each change is committed as it happens, so after a crash or a stopped run the
+next run can resume: URLs already done are skipped, and files that were being
+written when the run died are removed so they are captured again under the
+same name instead of as ``_1`` duplicates.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from .urls import normalize_url_for_comparison
+
+JOURNAL_FILENAME = ".capture_journal.sqlite3"
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    url_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    subdir TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    depth INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL,
+    output TEXT,
+    reason TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def _outputs_exist(outputs) -> bool:
+    """Whether every file recorded for a job (one path per line) is on disk."""
+    return all(os.path.exists(path) for path in (outputs or "").splitlines())
+
+
+class JobJournal:
+    """Per-URL capture state persisted in SQLite; safe to use from several threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL + NORMAL: each update survives an app crash without an fsync per URL
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+
+    @staticmethod
+    def key(url: str) -> str:
+        return normalize_url_for_comparison(url)
+
+    def register(self, items, resume: bool = False):
+        """Record items for this run and return the ones that still need capturing.
+
+        Without resume every item starts over as pending. With resume, items
+        already done are skipped as long as all their output files still exist;
+        leftover partial outputs are deleted.
+        """
+        now = time.time()
+        remaining = []
+        stale_outputs = []
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for item in items:
+                    key = self.key(item["url"])
+                    row = self._db.execute(
+                        "SELECT state, output FROM jobs WHERE url_key = ?", (key,)
+                    ).fetchone()
+                    if resume and row is not None and row[0] == DONE and _outputs_exist(row[1]):
+                        continue
+                    if resume and row is not None and row[1]:
+                        stale_outputs.append(row[1])
+                    self._db.execute(
+                        "INSERT INTO jobs (url_key, url, subdir, filename, depth, state, updated_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                        " ON CONFLICT(url_key) DO UPDATE SET state = excluded.state,"
+                        " output = NULL, reason = NULL, updated_at = excluded.updated_at",
+                        (
+                            key,
+                            item["url"],
+                            item["subdir"],
+                            item["filename"],
+                            item.get("depth", 0),
+                            PENDING,
+                            now,
+                        ),
+                    )
+                    remaining.append(item)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+        for outputs in stale_outputs:
+            for path in outputs.splitlines():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return remaining
+
+    def discovered(self):
+        """Items discovery mode found in this or earlier runs, breadth-first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, subdir, filename, depth FROM jobs WHERE depth > 0"
+                " ORDER BY depth, rowid"
+            ).fetchall()
+        return [
+            {"url": url, "subdir": subdir, "filename": filename, "depth": depth}
+            for url, subdir, filename, depth in rows
+        ]
+
+    def _update(self, url: str, sql: str, params=()):
+        with self._lock:
+            self._db.execute(sql, (*params, time.time(), self.key(url)))
+
+    def mark_in_flight(self, url: str):
+        self._update(
+            url,
+            "UPDATE jobs SET state = ?, attempts = attempts + 1, updated_at = ? WHERE url_key = ?",
+            (IN_FLIGHT,),
+        )
+
+    def set_output(self, url: str, path: str):
+        """Remember a file a capture is being written to (removed on resume if unfinished).
+
+        A URL captured at several viewports or in JPG/WebP parts has several files,
+        one per line.
+        """
+        self._update(
+            url,
+            "UPDATE jobs SET output = COALESCE(output || char(10), '') || ?, updated_at = ?"
+            " WHERE url_key = ?",
+            (path,),
+        )
+
+    def mark_done(self, url: str, path: str):
+        # A capture flagged as failed (e.g. login page) stays failed even though a file exists
+        self._update(
+            url,
+            "UPDATE jobs SET state = ?, output = ?, updated_at = ?"
+            " WHERE url_key = ? AND state != 'failed'",
+            (DONE, path),
+        )
+
+    def mark_failed(self, url: str, reason: str = ""):
+        self._update(
+            url,
+            "UPDATE jobs SET state = ?, reason = ?, updated_at = ? WHERE url_key = ?",
+            (FAILED, reason),
+        )
+
+    def counts(self):
+        """{state: number of URLs}."""
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,53 @@
+"""
+Buffered log delivery for the GUI.
+
+Worker threads only append to a list here; the Tk main loop takes everything
+that arrived since its last frame in one call, so a burst of messages costs
+one widget update instead of one event each. Every line also goes to a log
+file, which keeps the full history while the on-screen log stays short.
+"""
+
+import os
+import threading
+from datetime import datetime
+
+FLUSH_INTERVAL_MS = 100  # How often the GUI takes buffered lines (10 frames/second)
+MAX_SCREEN_LINES = 2000  # Lines kept in the on-screen log
+
+
+class BufferedLogSink:
+    """Thread-safe line buffer with an optional log file; has no tkinter dependency."""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._pending = []
+        self._lock = threading.Lock()
+        self._file = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._file = open(path, "a", encoding="utf-8")
+            except OSError:
+                self.path = None  # Screen-only logging
+
+    def write(self, message: str):
+        """Queue a timestamped line; safe from any thread."""
+        line = f"{datetime.now().strftime('[%H:%M:%S]')} {message}\n"
+        with self._lock:
+            self._pending.append(line)
+            if self._file is not None:
+                self._file.write(line)
+
+    def take(self):
+        """All lines queued since the last call, oldest first."""
+        with self._lock:
+            lines, self._pending = self._pending, []
+            if lines and self._file is not None:
+                self._file.flush()
+        return lines
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
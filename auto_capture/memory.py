@@ -0,0 +1,110 @@
+"""
+Memory budget for full-page captures.
+
+A full-page screenshot is one bitmap of (width x height x device pixel ratio)
+pixels - about 320 MB as RGBA at 5000 x 16000 - first in Chrome, then again
+in our process when it has to be decoded (PDF). The engine estimates that size
+from the measured page height before capturing and reserves it from a budget
+shared by all browsers, so parallel workers wait instead of running the
+machine out of memory. A capture that can't fit on its own is taken in
+segments (PNG/PDF) or at a reduced scale (JPG/WebP) instead.
+"""
+
+import math
+import sys
+import threading
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS isn't reported
+    resource = None
+
+CHROME_BYTES_PER_PIXEL = 4  # Chrome's RGBA bitmap behind Page.captureScreenshot
+DECODE_BYTES_PER_PIXEL = 7  # Our decode (RGBA) plus the flattened RGB copy
+MIN_SCALE = 0.25  # Below this a capture is unreadable; the budget is exceeded instead
+MIN_TILE_HEIGHT = 200
+
+# Formats Chrome hands over ready to write, so only Chrome's bitmap counts
+_NOT_DECODED = ("png", "jpg", "webp")
+
+MB = 1024 * 1024
+
+
+def estimate_capture_bytes(pixel_width: int, pixel_height: int, fmt: str) -> int:
+    """Peak bitmap bytes of a single full-page capture in `fmt`."""
+    per_pixel = CHROME_BYTES_PER_PIXEL
+    if fmt not in _NOT_DECODED:
+        per_pixel += DECODE_BYTES_PER_PIXEL
+    return pixel_width * pixel_height * per_pixel
+
+
+def estimate_tile_bytes(pixel_width: int, pixel_height: int) -> int:
+    """Peak bitmap bytes of one segment of a tiled capture (segments are always decoded)."""
+    return pixel_width * pixel_height * (CHROME_BYTES_PER_PIXEL + DECODE_BYTES_PER_PIXEL)
+
+
+def tile_height_for(limit_bytes: int, pixel_width: int, pixel_ratio: float, tile_height: int):
+    """Largest segment height (CSS pixels, at most `tile_height`) whose bitmap fits the budget."""
+    per_css_row = estimate_tile_bytes(pixel_width, 1) * pixel_ratio
+    return max(MIN_TILE_HEIGHT, min(tile_height, int(limit_bytes // per_css_row)))
+
+
+def scale_to_fit(estimate_bytes: int, limit_bytes: int) -> float:
+    """Screenshot scale factor that brings `estimate_bytes` within the budget (bitmap ~ scale^2)."""
+    if estimate_bytes <= limit_bytes:
+        return 1.0
+    return max(MIN_SCALE, math.floor(math.sqrt(limit_bytes / estimate_bytes) * 100) / 100)
+
+
+def peak_rss_bytes():
+    """Peak resident memory of this process, or None where the platform doesn't report it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # macOS: bytes, Linux: KiB
+
+
+class MemoryBudget:
+    """Bytes reserved by captures in flight, shared by all workers; thread-safe."""
+
+    def __init__(self, limit_bytes: int = 0):
+        self.limit = limit_bytes  # 0 = unlimited
+        self.in_use = 0
+        self.peak = 0  # Most reserved at once
+        self.largest = (0, None)  # (bytes, url) of the biggest single reservation
+        self._cond = threading.Condition()
+
+    def fits(self, nbytes: int) -> bool:
+        """Whether a reservation of `nbytes` can ever be granted."""
+        return not self.limit or nbytes <= self.limit
+
+    def reserve(self, nbytes: int, url: str = None):
+        """Block until `nbytes` fit next to the reservations in flight, then take them.
+
+        A reservation is always granted when nothing else is in flight, so one
+        over-budget capture can't wait forever.
+        """
+        with self._cond:
+            while self.limit and self.in_use and self.in_use + nbytes > self.limit:
+                self._cond.wait()
+            self.in_use += nbytes
+            self.peak = max(self.peak, self.in_use)
+            if nbytes > self.largest[0]:
+                self.largest = (nbytes, url)
+
+    def release(self, nbytes: int):
+        if not nbytes:
+            return
+        with self._cond:
+            self.in_use = max(0, self.in_use - nbytes)
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserved(self, nbytes: int, url: str = None):
+        """Hold a reservation for the enclosed block."""
+        self.reserve(nbytes, url)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
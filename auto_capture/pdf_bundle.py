@@ -0,0 +1,219 @@
+"""
+Single PDF for a whole run, written incrementally.
+
+Each capture is appended as soon as it is saved: the page image is decoded,
+JPEG-encoded and written as its own PDF objects, then dropped, so memory
+holds one page image at a time however long the run is. The page tree,
+outline (one bookmark per URL) and cross-reference table are written when
+the bundle is closed.
+
+Pages taller than PDF's 14400pt page limit are split into several pages that
+show successive slices of the same embedded image.
+"""
+
+import io
+import os
+from collections import namedtuple
+
+from PIL import Image
+
+from .tiling import to_rgb
+
+MAX_PAGE_POINTS = 14400  # Largest page dimension Acrobat accepts
+
+JpegPage = namedtuple("JpegPage", "data width height")
+
+
+def jpeg_page(img, quality: int = 85) -> JpegPage:
+    """JPEG-encode one page image (flattened onto white)."""
+    img = to_rgb(img)
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=quality)
+    return JpegPage(buffer.getvalue(), img.width, img.height)
+
+
+def _pdf_text(text: str) -> bytes:
+    """Encode a string as a UTF-16 PDF hex string (safe for any URL/title)."""
+    return b"<FEFF" + text.encode("utf-16-be").hex().upper().encode("ascii") + b">"
+
+
+def _points(value: float) -> bytes:
+    return (f"{value:.2f}".rstrip("0").rstrip(".")).encode("ascii")
+
+
+class PdfBundleWriter:
+    """Append captures to one PDF file, one outline entry per document."""
+
+    # Fixed object numbers for the objects written last
+    _CATALOG, _PAGES, _OUTLINES = 1, 2, 3
+
+    def __init__(self, path: str, resolution: int = 100, quality: int = 85):
+        self.path = path
+        self.resolution = resolution
+        self.quality = quality
+        self.documents = []  # (title, first page object number)
+        self._page_ids = []
+        self._offsets = {}  # object number -> byte offset
+        self._next_id = 4
+        self._f = open(path, "wb")
+        self._f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def _new_id(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write_object(self, obj_id: int, body: bytes, stream: bytes = None):
+        self._offsets[obj_id] = self._f.tell()
+        self._f.write(b"%d 0 obj\n" % obj_id)
+        self._f.write(body)
+        if stream is not None:
+            self._f.write(b"\nstream\n")
+            self._f.write(stream)
+            self._f.write(b"\nendstream")
+        self._f.write(b"\nendobj\n")
+
+    def _add_jpeg(self, page: JpegPage):
+        """Write one image and the page(s) showing it. Returns the first page id."""
+        image_id = self._new_id()
+        self._write_object(
+            image_id,
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d "
+            b"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode /Length %d >>"
+            % (page.width, page.height, len(page.data)),
+            page.data,
+        )
+
+        scale = 72.0 / self.resolution
+        width_pt = page.width * scale
+        height_pt = page.height * scale
+        first_page_id = None
+        top = 0.0
+        while top < height_pt:
+            slice_pt = min(MAX_PAGE_POINTS, height_pt - top)
+            # Place the full image so the slice starting at `top` fills this page
+            content = b"q %s 0 0 %s 0 %s cm /Im0 Do Q" % (
+                _points(width_pt),
+                _points(height_pt),
+                _points(slice_pt + top - height_pt),
+            )
+            content_id = self._new_id()
+            self._write_object(content_id, b"<< /Length %d >>" % len(content), content)
+
+            page_id = self._new_id()
+            self._write_object(
+                page_id,
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] "
+                b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>"
+                % (self._PAGES, _points(width_pt), _points(slice_pt), image_id, content_id),
+            )
+            self._page_ids.append(page_id)
+            if first_page_id is None:
+                first_page_id = page_id
+            top += slice_pt
+        return first_page_id
+
+    def add_document(self, title: str, pages):
+        """Append pages (JpegPage or PIL images, consumed one at a time) under one bookmark."""
+        first_page_id = None
+        for page in pages:
+            if not isinstance(page, JpegPage):
+                page = jpeg_page(page, self.quality)
+            page_id = self._add_jpeg(page)
+            if first_page_id is None:
+                first_page_id = page_id
+        if first_page_id is not None:
+            self.documents.append((title, first_page_id))
+
+    def add_capture(self, title: str, screenshot_bytes: bytes):
+        """Append one full-page screenshot (PNG bytes) as a document."""
+        with Image.open(io.BytesIO(screenshot_bytes)) as img:
+            page = jpeg_page(img, self.quality)
+        self.add_document(title, [page])
+
+    def _write_outline(self):
+        ids = [self._new_id() for _ in self.documents]
+        for index, (title, page_id) in enumerate(self.documents):
+            links = b""
+            if index > 0:
+                links += b" /Prev %d 0 R" % ids[index - 1]
+            if index < len(ids) - 1:
+                links += b" /Next %d 0 R" % ids[index + 1]
+            self._write_object(
+                ids[index],
+                b"<< /Title %s /Parent %d 0 R /Dest [%d 0 R /XYZ null null null]%s >>"
+                % (_pdf_text(title), self._OUTLINES, page_id, links),
+            )
+        if ids:
+            self._write_object(
+                self._OUTLINES,
+                b"<< /Type /Outlines /First %d 0 R /Last %d 0 R /Count %d >>"
+                % (ids[0], ids[-1], len(ids)),
+            )
+        else:
+            self._write_object(self._OUTLINES, b"<< /Type /Outlines /Count 0 >>")
+
+    def close(self):
+        """Write the page tree, outline and cross-reference table."""
+        if self._f.closed:
+            return
+        try:
+            kids = b" ".join(b"%d 0 R" % page_id for page_id in self._page_ids)
+            self._write_object(
+                self._PAGES,
+                b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._page_ids)),
+            )
+            self._write_outline()
+            self._write_object(
+                self._CATALOG,
+                b"<< /Type /Catalog /Pages %d 0 R /Outlines %d 0 R /PageMode /UseOutlines >>"
+                % (self._PAGES, self._OUTLINES),
+            )
+
+            xref_offset = self._f.tell()
+            self._f.write(b"xref\n0 %d\n" % self._next_id)
+            self._f.write(b"0000000000 65535 f \n")
+            for obj_id in range(1, self._next_id):
+                offset = self._offsets.get(obj_id)
+                if offset is None:
+                    # Object never completed (e.g. a page that failed mid-write)
+                    self._f.write(b"0000000000 65535 f \n")
+                else:
+                    self._f.write(b"%010d 00000 n \n" % offset)
+            self._f.write(
+                b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                % (self._next_id, self._CATALOG, xref_offset)
+            )
+        finally:
+            self._f.close()
+
+    def abort(self):
+        """Discard the bundle (e.g. nothing was captured)."""
+        self._f.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class BundlePageCollector:
+    """Tile writer for capture_tiled in bundle mode.
+
+    Tiles are JPEG-encoded as they arrive (only the compressed bytes are
+    kept) and appended to the bundle as one document once the page is done.
+    """
+
+    def __init__(self, quality: int = 85):
+        self.quality = quality
+        self.pages = []
+
+    def add(self, img):
+        self.pages.append(jpeg_page(img, self.quality))
+
+    def close(self):
+        pass
+
+    def abort(self):
+        self.pages = []
@@ -0,0 +1,136 @@
+"""
+Asynchronous encode/write stage between the browser and the disk.
+
+Screenshots are handed off as raw bytes so the capture thread can move on
+to the next URL straight away. PNG, JPG and WebP arrive from Chrome already
+in the output format and only need writing, which goes to a small thread pool
+instead of paying for pickling; PDF conversion (decode, flatten, encode) runs
+on a process pool. Appends to a shared output (the PDF
+bundle) run one at a time, in submission order, on their own thread. A
+semaphore caps the number of screenshots held in memory, blocking the
+capture thread when the stage is full.
+"""
+
+import io
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from PIL import Image
+
+# Formats Chrome encodes itself (Page.captureScreenshot), so the bytes are written as-is
+PASSTHROUGH_FORMATS = ("png", "jpg", "webp")
+
+
+def flatten_rgba(img):
+    if img.mode == "RGBA":
+        bg = Image.new("RGB", img.size, (255, 255, 255))
+        # The image masks itself through its alpha band: no separate alpha copy
+        bg.paste(img, mask=img)
+        return bg
+    return img
+
+
+def encode_and_write(screenshot_bytes: bytes, filepath: str, fmt: str):
+    """Encode (PDF only) and write one capture. PDFs run in a worker process.
+
+    Returns (filepath, {"encode": seconds, "write": seconds}).
+    """
+    start = time.perf_counter()
+    if fmt in PASSTHROUGH_FORMATS:
+        data = screenshot_bytes
+    else:
+        img = Image.open(io.BytesIO(screenshot_bytes))
+        img = flatten_rgba(img)
+        buffer = io.BytesIO()
+        if fmt == "pdf":
+            img.save(buffer, "PDF", resolution=100)
+        data = buffer.getvalue()
+    encoded = time.perf_counter()
+
+    with open(filepath, "wb") as f:
+        f.write(data)
+    return filepath, {"encode": encoded - start, "write": time.perf_counter() - encoded}
+
+
+class SavePipeline:
+    """Bounded hand-off of screenshots to background encoders/writers."""
+
+    def __init__(self, max_pending: int = 4, max_processes: int = None):
+        self.max_pending = max_pending
+        self.max_processes = max_processes or min(4, os.cpu_count() or 1)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0  # Submitted captures whose on_done hasn't finished yet
+        self._process_pool = None  # Created on first PDF so other runs never spawn it
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="save-io")
+        self._ordered_pool = None  # Single thread for submit_ordered(), created on first use
+
+    def _executor_for(self, fmt: str):
+        if fmt in PASSTHROUGH_FORMATS:
+            return self._io_pool
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.max_processes)
+            return self._process_pool
+
+    def submit(self, screenshot_bytes: bytes, filepath: str, fmt: str, on_done=None):
+        """Queue one capture. Blocks while max_pending captures are already queued.
+
+        on_done(future) is called from a background thread when the file is
+        written (future.result() is (path, stage timings)) or failed
+        (future.result() raises).
+        """
+        return self._submit(
+            self._executor_for(fmt), encode_and_write, (screenshot_bytes, filepath, fmt), on_done
+        )
+
+    def submit_ordered(self, fn, *args, on_done=None):
+        """Queue fn(*args) to run after every earlier submit_ordered() call, one at a time.
+
+        Shares the max_pending backpressure and drain() with submit().
+        """
+        with self._lock:
+            if self._ordered_pool is None:
+                self._ordered_pool = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="save-ordered"
+                )
+        return self._submit(self._ordered_pool, fn, args, on_done)
+
+    def _submit(self, executor, fn, args, on_done):
+        self._slots.acquire()
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._outstanding += 1
+
+        def _finished(done_future):
+            try:
+                if on_done is not None:
+                    on_done(done_future)
+            finally:
+                self._slots.release()
+                with self._idle:
+                    self._outstanding -= 1
+                    self._idle.notify_all()
+
+        future.add_done_callback(_finished)
+        return future
+
+    def drain(self):
+        """Block until every queued capture has been written (or failed) and reported."""
+        with self._idle:
+            self._idle.wait_for(lambda: self._outstanding == 0)
+
+    def shutdown(self):
+        self.drain()
+        self._io_pool.shutdown(wait=True)
+        if self._ordered_pool is not None:
+            self._ordered_pool.shutdown(wait=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
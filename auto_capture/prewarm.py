@@ -0,0 +1,118 @@
+"""
+Route pre-warming for development servers.
+
+Dev servers (Next.js, Nuxt, Angular, ...) compile a route the first time it is
+requested, which can take longer than the page load timeout. With pre-warming
+every distinct route (scheme, host and path, query ignored) gets one plain
+HTTP GET as soon as it is queued, a few at a time, so the server compiles
+upcoming routes while the browsers capture earlier ones. Each thread keeps one
+keep-alive connection per server.
+"""
+
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from .connectivity import USER_AGENT, origin_of
+from .ingest import UrlDeduplicator
+
+PREWARM_TIMEOUT = 60  # Seconds a route may take to compile and answer
+DEFAULT_CONCURRENCY = 4
+
+
+def route_of(url: str) -> str:
+    """scheme://netloc/path of a URL - the unit a dev server compiles."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}{parsed.path or '/'}"
+
+
+class RoutePrewarmer:
+    """Background GETs of queued routes; submit() from any thread, close() at the end of a run."""
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = PREWARM_TIMEOUT,
+        on_warmed=None,
+    ):
+        self.timeout = timeout
+        self.on_warmed = on_warmed  # callable(route, seconds, ok)
+        self.warmed = 0
+        self.failed = 0
+        self.slowest = (0.0, None)  # (seconds, route)
+        self._routes = UrlDeduplicator()
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="prewarm")
+
+    def submit(self, items) -> int:
+        """Queue a GET for every route among `items` not requested yet; returns how many."""
+        queued = 0
+        for item in items:
+            route = route_of(item["url"])
+            with self._lock:
+                if self._closed or not self._routes.add(route):
+                    continue
+            self._executor.submit(self._warm, route)
+            queued += 1
+        return queued
+
+    def _connection(self, origin: str):
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(origin)
+        if conn is None:
+            parsed = urlparse(origin)
+            connection_class = (
+                http.client.HTTPSConnection
+                if parsed.scheme == "https"
+                else http.client.HTTPConnection
+            )
+            conn = connections[origin] = connection_class(parsed.netloc, timeout=self.timeout)
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _get(self, route: str) -> bool:
+        """GET one route and drain the response; True unless the server failed."""
+        conn = self._connection(origin_of(route))
+        try:
+            conn.request("GET", urlparse(route).path, headers={"User-Agent": USER_AGENT})
+            response = conn.getresponse()
+            response.read()  # Drain so the connection can be reused
+            return response.status < 500
+        except (http.client.HTTPException, OSError):
+            conn.close()  # Reopened by the next request on this thread
+            return False
+
+    def _warm(self, route: str):
+        if self._closed:
+            return
+        start = time.perf_counter()
+        ok = self._get(route)
+        seconds = time.perf_counter() - start
+        with self._lock:
+            if self._closed:
+                return  # Aborted by close(); not a server failure
+            if ok:
+                self.warmed += 1
+            else:
+                self.failed += 1
+            if seconds > self.slowest[0]:
+                self.slowest = (seconds, route)
+        if self.on_warmed is not None:
+            self.on_warmed(route, seconds, ok)
+
+    def close(self):
+        """Drop routes not requested yet and abort the ones in flight."""
+        with self._lock:
+            self._closed = True
+            connections, self._connections = self._connections, []
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for conn in connections:
+            conn.close()
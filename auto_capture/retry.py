@@ -0,0 +1,77 @@
+"""
+Retry scheduling for failed captures.
+
+A failed capture isn't retried on the spot: it goes to the back of the queue
+with a not-before time (exponential backoff with jitter), so the browser
+moves on to other URLs meanwhile. Failures are classified, and each class
+has its own retry budget.
+"""
+
+import random
+import threading
+
+from selenium.common.exceptions import TimeoutException
+
+from .urls import normalize_url_for_comparison
+
+TIMEOUT = "timeout"
+CONNECTION = "connection"
+LOGIN = "login"
+ERROR = "error"
+
+# Retries per URL and failure class. Login pages only change when the user logs
+# in, so they aren't retried automatically (use "Retry Failed" after logging in).
+RETRY_BUDGETS = {
+    TIMEOUT: 2,
+    CONNECTION: 2,
+    LOGIN: 0,
+    ERROR: 2,
+}
+
+_CONNECTION_ERRORS = (
+    "ERR_CONNECTION_REFUSED",
+    "ERR_CONNECTION_RESET",
+    "ERR_CONNECTION_CLOSED",
+    "ERR_NAME_NOT_RESOLVED",
+    "ERR_ADDRESS_UNREACHABLE",
+    "ERR_INTERNET_DISCONNECTED",
+)
+
+
+def classify(error) -> str:
+    """Failure class of an exception raised while capturing."""
+    if isinstance(error, TimeoutException):
+        return TIMEOUT
+    message = str(error)
+    if any(code in message for code in _CONNECTION_ERRORS):
+        return CONNECTION
+    if "ERR_TIMED_OUT" in message or "timed out" in message.lower():
+        return TIMEOUT
+    return ERROR
+
+
+class RetryScheduler:
+    """Decides whether and when a failed URL is tried again; thread-safe."""
+
+    def __init__(self, budgets=None, base_delay: float = 2.0, max_delay: float = 60.0):
+        self.budgets = dict(RETRY_BUDGETS, **(budgets or {}))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._attempts = {}  # (normalized url, failure class) -> retries so far
+        self._lock = threading.Lock()
+
+    def schedule(self, url: str, failure_class: str):
+        """Seconds to wait before retrying `url`, or None when its budget is used up."""
+        key = (normalize_url_for_comparison(url), failure_class)
+        with self._lock:
+            retries = self._attempts.get(key, 0)
+            if retries >= self.budgets.get(failure_class, 0):
+                return None
+            self._attempts[key] = retries + 1
+        # Equal jitter: half the backoff is fixed, half random, so retries spread out
+        backoff = min(self.max_delay, self.base_delay * 2**retries)
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+    def retries(self, url: str, failure_class: str) -> int:
+        with self._lock:
+            return self._attempts.get((normalize_url_for_comparison(url), failure_class), 0)
@@ -0,0 +1,156 @@
+"""
+Page settle detection - capture as soon as a page is quiescent.
+
+Instead of fixed sleeps, PageSettler polls three signals until they have all
+been quiet for ``quiet_period`` seconds (or ``timeout`` is reached):
+
+- network: in-flight requests, tracked from the CDP Network events Chrome
+  writes to the "performance" log (enable with PERFORMANCE_LOG_CAPABILITY)
+- resources: images still loading and document.fonts status
+- layout: document height unchanged between polls
+
+With ``load_lazy`` the probe also switches ``loading="lazy"`` images and
+iframes to eager, so below-the-fold content loads before the capture rather
+than only as it is scrolled into view. That loads more than the page asked
+for and can make long pages settle much later, so it is opt-in.
+"""
+
+import json
+import threading
+import time
+
+# Set on Options via options.set_capability(*PERFORMANCE_LOG_CAPABILITY)
+PERFORMANCE_LOG_CAPABILITY = ("goog:loggingPrefs", {"performance": "ALL"})
+
+# Prepended to the probe with load_lazy: lazy images/iframes start loading now
+EAGER_LAZY_JS = """
+document.querySelectorAll('img[loading="lazy"], iframe[loading="lazy"]')
+    .forEach(function (el) { el.loading = 'eager'; });
+"""
+
+# One round trip per poll
+SETTLE_PROBE_JS = """
+var pending = 0;
+for (var i = 0; i < document.images.length; i++) {
+    var img = document.images[i];
+    if ((img.currentSrc || img.src) && !img.complete) { pending++; }
+}
+return [
+    document.readyState,
+    pending,
+    document.fonts ? document.fonts.status !== 'loaded' : false,
+    Math.max(document.body ? document.body.scrollHeight : 0,
+             document.documentElement.scrollHeight)
+];
+"""
+
+REQUEST_STARTED = "Network.requestWillBeSent"
+REQUEST_ENDED = ("Network.loadingFinished", "Network.loadingFailed")
+
+
+class PageSettler:
+    """Waits until a loaded page is quiescent instead of sleeping a fixed time.
+
+    Call begin() before navigating so network events from the previous page
+    are discarded, then wait() whenever the page may still be changing.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 5.0,
+        quiet_period: float = 0.3,
+        poll_interval: float = 0.05,
+        max_inflight: int = 2,
+        load_lazy: bool = False,
+    ):
+        self.timeout = timeout
+        self.quiet_period = quiet_period
+        self.poll_interval = poll_interval
+        # Like "networkidle2": tolerate long-lived connections (websockets, polling)
+        self.max_inflight = max_inflight
+        self.probe_js = EAGER_LAZY_JS + SETTLE_PROBE_JS if load_lazy else SETTLE_PROBE_JS
+        self._inflight = {}  # id(driver) -> set of request ids
+        self._lock = threading.Lock()
+
+    def begin(self, driver):
+        """Forget network state from the previous page."""
+        self._read_network_events(driver)
+        with self._lock:
+            self._inflight[id(driver)] = set()
+
+    def forget(self, driver):
+        """Drop the network state of a browser that was quit or replaced."""
+        with self._lock:
+            self._inflight.pop(id(driver), None)
+
+    def _read_network_events(self, driver):
+        """Drain the performance log. Returns None if the driver doesn't provide one."""
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            return None
+        events = []
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get("method", "")
+            if method == REQUEST_STARTED or method in REQUEST_ENDED:
+                events.append((method, message.get("params", {}).get("requestId")))
+        return events
+
+    def _network_idle(self, driver) -> bool:
+        events = self._read_network_events(driver)
+        if events is None:
+            return True  # No network signal available - rely on the page signals
+        with self._lock:
+            inflight = self._inflight.setdefault(id(driver), set())
+            for method, request_id in events:
+                if method == REQUEST_STARTED:
+                    inflight.add(request_id)
+                else:
+                    inflight.discard(request_id)
+            return len(inflight) <= self.max_inflight
+
+    def wait(self, driver, timeout: float = None, quiet_period: float = None) -> bool:
+        """Block until the page is quiet. Returns False if the ceiling was hit first.
+
+        `quiet_period` overrides the default quiet window, e.g. a short one when
+        the page already settled once and only needs to catch up with a scroll.
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        quiet_period = self.quiet_period if quiet_period is None else quiet_period
+        quiet_since = None
+        last_height = None
+
+        while True:
+            now = time.monotonic()
+            try:
+                ready_state, pending_images, fonts_pending, height = driver.execute_script(
+                    self.probe_js
+                )
+            except Exception:
+                ready_state, pending_images, fonts_pending, height = "complete", 0, False, None
+            network_idle = self._network_idle(driver)
+
+            quiet = (
+                ready_state == "complete"
+                and not pending_images
+                and not fonts_pending
+                and network_idle
+                and height == last_height
+            )
+            last_height = height
+
+            if quiet:
+                if quiet_since is None:
+                    quiet_since = now
+                if now - quiet_since >= quiet_period:
+                    return True
+            else:
+                quiet_since = None
+
+            if now >= deadline:
+                return False
+            time.sleep(self.poll_interval)
@@ -0,0 +1,315 @@
+"""
+Thumbnails and contact sheets for reviewing a capture run.
+
+Every capture gets a small JPEG of the top of the page, and the thumbnails are
+laid out on numbered contact sheets, so a run of 1,000 pages can be reviewed
+in a few dozen images. Captures are decoded in a process pool, and only as
+much of each as the thumbnail shows: PNG decoding stops after the rows at
+the top of the page, JPEG captures are decoded at reduced size (Pillow's
+draft mode scales by 1/2 to 1/8 in the decoder), and the remaining downscale
+is a cheap integer reduce before the final resample. WebP captures are
+decoded whole (at most 16383px tall). A manifest keyed on each capture's mtime and size lets a re-run
+redo only the captures that changed.
+
+    python -m auto_capture thumbnails CAPTURE_DIR [-o THUMBNAIL_DIR]
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .compare import collect_images
+
+DEFAULT_WIDTH = 320  # Thumbnail width in pixels
+DEFAULT_MAX_HEIGHT = 480  # Taller pages are cut off (the top of a page is what identifies it)
+DEFAULT_COLUMNS = 5
+DEFAULT_ROWS = 4
+THUMBNAIL_QUALITY = 80
+SHEET_QUALITY = 85
+THUMBS_DIRNAME = "thumbs"
+SHEET_PREFIX = "contact_sheet_"
+MANIFEST_FILENAME = ".thumbnails.json"
+
+_LABEL_HEIGHT = 16
+_GAP = 8
+
+ThumbnailRun = namedtuple("ThumbnailRun", "made reused failed sheets")
+
+
+def default_output_dir(capture_dir: str) -> str:
+    """Sibling folder of the run, so thumbnails don't end up in its zips or comparisons."""
+    return os.path.abspath(capture_dir).rstrip(os.sep) + "_thumbnails"
+
+
+def thumbnail_relpath(rel_path: str) -> str:
+    return os.path.join(THUMBS_DIRNAME, os.path.splitext(rel_path)[0] + ".jpg")
+
+
+def _decode_top_rows(img, rows: int):
+    """Have a PNG that isn't loaded yet decode only its first `rows` rows.
+
+    Non-interlaced PNG rows are stored top to bottom, so the decoder can stop
+    early; the rest of the image data is skipped without being inflated.
+    """
+    if img.format != "PNG" or img.info.get("interlace") or len(img.tile) != 1:
+        return
+    if rows >= img.height:
+        return
+    decoder, _, offset, args = img.tile[0][:4]
+    img._size = (img.width, rows)
+    img.tile = [(decoder, (0, 0, img.width, rows), offset, args)]
+
+
+def make_thumbnail(job):
+    """Write one thumbnail. Runs in a worker process; returns (rel_path, error)."""
+    rel_path, source, target, width, max_height = job
+    try:
+        with Image.open(source) as img:
+            target_width = min(width, img.width)
+            # JPEG only: decode at the smallest 1/n scale that is still at least this big
+            img.draft("RGB", (target_width, max(1, img.height * target_width // img.width)))
+            scale = target_width / img.width
+            crop_height = min(img.height, math.ceil(max_height / scale))
+            # PNG only: never decode the part of a tall page below the thumbnail
+            _decode_top_rows(img, crop_height)
+            if img.mode not in ("RGB", "RGBA", "L"):
+                img = img.convert("RGB")
+            thumb = img.resize(
+                (target_width, max(1, round(crop_height * scale))),
+                Image.Resampling.LANCZOS,
+                box=(0, 0, img.width, crop_height),
+                reducing_gap=2.0,
+            )
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        thumb.convert("RGB").save(target, "JPEG", quality=THUMBNAIL_QUALITY)
+        return rel_path, ""
+    except Exception as e:
+        return rel_path, str(e)
+
+
+def _fit_label(draw, font, text: str, width: int) -> str:
+    """text, shortened from the left with '...' until it fits `width` pixels."""
+    if draw.textlength(text, font=font) <= width:
+        return text
+    while text and draw.textlength("..." + text, font=font) > width:
+        text = text[1:]
+    return "..." + text
+
+
+def make_contact_sheet(job):
+    """Lay thumbnails out in a grid with their capture path below each one. Runs in a worker."""
+    sheet_path, entries, columns, cell_width, cell_height = job
+    rows = math.ceil(len(entries) / columns)
+    sheet = Image.new(
+        "RGB",
+        (
+            columns * (cell_width + _GAP) + _GAP,
+            rows * (cell_height + _LABEL_HEIGHT + _GAP) + _GAP,
+        ),
+        (255, 255, 255),
+    )
+    draw = ImageDraw.Draw(sheet)
+    font = ImageFont.load_default()
+    for index, (thumb_path, label) in enumerate(entries):
+        x = _GAP + (index % columns) * (cell_width + _GAP)
+        y = _GAP + (index // columns) * (cell_height + _LABEL_HEIGHT + _GAP)
+        try:
+            with Image.open(thumb_path) as thumb:
+                sheet.paste(thumb, (x, y))
+                draw.rectangle(
+                    (x - 1, y - 1, x + thumb.width, y + thumb.height), outline=(200, 200, 200)
+                )
+        except OSError:
+            draw.rectangle((x, y, x + cell_width - 1, y + cell_height - 1), outline=(220, 0, 0))
+        draw.text(
+            (x, y + cell_height + 2),
+            _fit_label(draw, font, label, cell_width),
+            fill=(40, 40, 40),
+            font=font,
+        )
+    sheet.save(sheet_path, "JPEG", quality=SHEET_QUALITY)
+    return sheet_path
+
+
+def _load_manifest(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path: str, manifest: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
+
+def build_thumbnails(
+    capture_dir: str,
+    output_dir: str = None,
+    width: int = DEFAULT_WIDTH,
+    max_height: int = DEFAULT_MAX_HEIGHT,
+    columns: int = DEFAULT_COLUMNS,
+    rows: int = DEFAULT_ROWS,
+    max_workers: int = None,
+    force: bool = False,
+    log=None,
+):
+    """Create missing/outdated thumbnails for capture_dir and rewrite changed contact sheets.
+
+    Returns a ThumbnailRun with the counts of thumbnails made, reused and failed,
+    and the number of contact sheets.
+    """
+    log = log or (lambda message: None)
+    output_dir = output_dir or default_output_dir(capture_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+
+    settings = {"width": width, "max_height": max_height, "columns": columns, "rows": rows}
+    manifest = {} if force else _load_manifest(manifest_path)
+    if manifest.get("settings") != settings:
+        manifest = {}
+    cached = manifest.get("thumbnails", {})
+    cached_sheets = manifest.get("sheets", {})
+
+    # Stat once: the (mtime, size) pair is the cache key
+    captures = {}
+    try:
+        inside = os.path.relpath(output_dir, capture_dir)  # Don't thumbnail our own output
+    except ValueError:  # Different drives on Windows
+        inside = os.pardir
+    for rel_path in sorted(collect_images(capture_dir)):
+        if rel_path.startswith(inside + os.sep):
+            continue
+        try:
+            stat = os.stat(os.path.join(capture_dir, rel_path))
+        except OSError:
+            continue
+        captures[rel_path] = [stat.st_mtime_ns, stat.st_size]
+
+    thumbnails = {}
+    jobs = []
+    for rel_path, key in captures.items():
+        target = os.path.join(output_dir, thumbnail_relpath(rel_path))
+        if cached.get(rel_path) == key and os.path.exists(target):
+            thumbnails[rel_path] = key
+        else:
+            jobs.append((rel_path, os.path.join(capture_dir, rel_path), target, width, max_height))
+    reused = len(thumbnails)
+
+    # Thumbnails of captures that are gone
+    for rel_path in set(cached) - set(captures):
+        try:
+            os.remove(os.path.join(output_dir, thumbnail_relpath(rel_path)))
+        except OSError:
+            pass
+
+    failed = 0
+    workers = max_workers or os.cpu_count() or 1
+    log(f"Thumbnails: {len(jobs)} to make, {len(thumbnails)} up to date")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for done, (rel_path, error) in enumerate(
+            executor.map(make_thumbnail, jobs, chunksize=8), 1
+        ):
+            if error:
+                failed += 1
+                log(f"Thumbnail failed for {rel_path}: {error}")
+            else:
+                thumbnails[rel_path] = captures[rel_path]
+            if done % 100 == 0:
+                log(f"Thumbnails: {done}/{len(jobs)}")
+
+        # Contact sheets: rewrite only pages whose thumbnails changed or moved
+        per_sheet = columns * rows
+        ordered = sorted(thumbnails)
+        sheets = {}
+        sheet_jobs = []
+        for start in range(0, len(ordered), per_sheet):
+            name = f"{SHEET_PREFIX}{start // per_sheet + 1:03d}.jpg"
+            members = [[path, thumbnails[path]] for path in ordered[start : start + per_sheet]]
+            sheets[name] = members
+            sheet_path = os.path.join(output_dir, name)
+            if cached_sheets.get(name) == members and os.path.exists(sheet_path):
+                continue
+            entries = [
+                (os.path.join(output_dir, thumbnail_relpath(rel_path)), rel_path)
+                for rel_path, _ in members
+            ]
+            sheet_jobs.append((sheet_path, entries, columns, width, max_height))
+        list(executor.map(make_contact_sheet, sheet_jobs))
+
+    for name in set(cached_sheets) - set(sheets):
+        try:
+            os.remove(os.path.join(output_dir, name))
+        except OSError:
+            pass
+
+    _save_manifest(
+        manifest_path, {"settings": settings, "thumbnails": thumbnails, "sheets": sheets}
+    )
+    log(
+        f"Thumbnails ready in {output_dir}: {len(sheets)} contact sheet(s), "
+        f"{len(sheet_jobs)} updated"
+    )
+    return ThumbnailRun(len(jobs) - failed, reused, failed, len(sheets))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="auto-capture thumbnails",
+        description="Make thumbnails and contact sheets of a capture folder.",
+    )
+    parser.add_argument("captures", help="Capture folder of a run")
+    parser.add_argument(
+        "-o", "--output", help="Folder for thumbnails and sheets (default: <captures>_thumbnails)"
+    )
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH, help="Thumbnail width")
+    parser.add_argument(
+        "--max-height",
+        type=int,
+        default=DEFAULT_MAX_HEIGHT,
+        help="Thumbnail height limit; longer pages show their top part",
+    )
+    parser.add_argument("--columns", type=int, default=DEFAULT_COLUMNS, help="Thumbnails per row")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Rows per contact sheet")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel processes")
+    parser.add_argument(
+        "--force", action="store_true", help="Remake everything instead of reusing thumbnails"
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    """Exit code 0 on success, 1 when some captures couldn't be read, 2 on invalid input."""
+    args = build_parser().parse_args(argv)
+    if not os.path.isdir(args.captures):
+        print(f"Error: {args.captures} is not a folder", file=sys.stderr)
+        return 2
+    if args.width < 32 or args.max_height < 32 or args.columns < 1 or args.rows < 1:
+        print(
+            "Error: width and height must be at least 32, columns and rows at least 1.",
+            file=sys.stderr,
+        )
+        return 2
+
+    result = build_thumbnails(
+        args.captures,
+        os.path.abspath(args.output) if args.output else None,
+        width=args.width,
+        max_height=args.max_height,
+        columns=args.columns,
+        rows=args.rows,
+        max_workers=args.workers,
+        force=args.force,
+        log=print,
+    )
+    return 1 if result.failed else 0
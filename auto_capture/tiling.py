@@ -0,0 +1,209 @@
+"""
+Tiled capture for pages taller than a single screenshot can hold.
+
+The page is captured in ``tile_height`` CSS-pixel segments using CDP clip
+rectangles, and each segment is handed to a writer as soon as it arrives, so
+peak memory is a couple of tiles no matter how tall the page is.
+"""
+
+import base64
+import io
+import os
+import struct
+import zlib
+
+from PIL import Image, ImageChops
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_FILTER_UP = b"\x02"
+
+
+def to_rgb(img):
+    """Flatten transparency onto white and return an RGB image."""
+    if img.mode == "RGB":
+        return img
+    if img.mode in ("RGBA", "LA") or "transparency" in img.info:
+        img = img.convert("RGBA")
+        bg = Image.new("RGB", img.size, (255, 255, 255))
+        bg.paste(img, mask=img)
+        return bg
+    return img.convert("RGB")
+
+
+def fit_tile(img, width: int, height: int):
+    """Crop or pad (white) a tile to exactly width x height pixels."""
+    if img.size == (width, height):
+        return img
+    fitted = Image.new("RGB", (width, height), (255, 255, 255))
+    fitted.paste(img.crop((0, 0, min(width, img.width), min(height, img.height))), (0, 0))
+    return fitted
+
+
+def iter_tile_rects(total_height: int, tile_height: int):
+    """Yield (y, height) CSS-pixel segments covering the page top to bottom."""
+    y = 0
+    while y < total_height:
+        height = min(tile_height, total_height - y)
+        yield y, height
+        y += height
+
+
+def capture_tile(driver, y: int, width: int, height: int):
+    """Capture one clip rectangle of the page and return it as a PIL image."""
+    data = driver.execute_cdp_cmd(
+        "Page.captureScreenshot",
+        {
+            "format": "png",
+            "captureBeyondViewport": True,
+            "clip": {"x": 0, "y": y, "width": width, "height": height, "scale": 1},
+        },
+    )
+    return Image.open(io.BytesIO(base64.b64decode(data["data"])))
+
+
+# ======================================================
+#                 INCREMENTAL WRITERS
+# ======================================================
+class StreamingPNGWriter:
+    """Write an RGB PNG band by band without materializing the whole bitmap.
+
+    Rows use the PNG "Up" filter, computed per band with ImageChops so the work
+    stays in C; the last row of each band is kept to filter the next band's
+    first row.
+    """
+
+    def __init__(self, path: str, width: int, height: int, compress_level: int = 6):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._prev_row = Image.new("RGB", (width, 1), (0, 0, 0))
+        self._z = zlib.compressobj(compress_level)
+        self._f = open(path, "wb")
+        self._f.write(PNG_SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, tag: bytes, data: bytes):
+        self._f.write(struct.pack(">I", len(data)))
+        self._f.write(tag)
+        self._f.write(data)
+        self._f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(tag)) & 0xFFFFFFFF))
+
+    def add(self, img):
+        """Append a band of rows. Rows beyond the declared height are dropped."""
+        rows = min(img.height, self.height - self.rows_written)
+        if rows <= 0:
+            return
+        band = fit_tile(to_rgb(img), self.width, rows)
+
+        # Image shifted down one row, seeded with the previous band's last row
+        above = Image.new("RGB", (self.width, rows))
+        above.paste(self._prev_row, (0, 0))
+        if rows > 1:
+            above.paste(band.crop((0, 0, self.width, rows - 1)), (0, 1))
+        filtered = ImageChops.subtract_modulo(band, above).tobytes()
+        self._prev_row = band.crop((0, rows - 1, self.width, rows))
+
+        stride = self.width * 3
+        scanlines = b"".join(
+            PNG_FILTER_UP + filtered[offset : offset + stride]
+            for offset in range(0, rows * stride, stride)
+        )
+        compressed = self._z.compress(scanlines)
+        if compressed:
+            self._chunk(b"IDAT", compressed)
+        self.rows_written += rows
+
+    def close(self):
+        if self._f.closed:
+            return
+        try:
+            if self.rows_written < self.height:
+                # Page got shorter while capturing - pad with white
+                self.add(Image.new("RGB", (self.width, self.height - self.rows_written), "white"))
+            self._chunk(b"IDAT", self._z.flush())
+            self._chunk(b"IEND", b"")
+        finally:
+            self._f.close()
+
+    def abort(self):
+        """Discard a partially written file."""
+        self._f.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class PdfTileWriter:
+    """Append each tile to a PDF as its own page."""
+
+    def __init__(self, path: str, resolution: int = 100):
+        self.path = path
+        self.resolution = resolution
+        self._pages = 0
+
+    def add(self, img):
+        to_rgb(img).save(self.path, "PDF", resolution=self.resolution, append=self._pages > 0)
+        self._pages += 1
+
+    def close(self):
+        pass
+
+    def abort(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class JpegPartWriter:
+    """Write tiles into numbered JPEG (or WebP) parts of at most ``max_part_height`` pixels.
+
+    JPEG cannot exceed 65535px (WebP 16383px) and Pillow cannot encode either
+    incrementally, so tiles are grouped into parts no taller than a normal
+    single capture.
+    """
+
+    def __init__(
+        self,
+        path_for_part,
+        width: int,
+        max_part_height: int,
+        quality: int = 90,
+        image_format: str = "JPEG",
+    ):
+        self.path_for_part = path_for_part  # callable(part_number) -> filepath
+        self.width = width
+        self.max_part_height = max_part_height
+        self.quality = quality
+        self.image_format = image_format  # Pillow format name
+        self.paths = []
+        self._tiles = []
+        self._height = 0
+
+    def add(self, img):
+        img = to_rgb(img)
+        if self._tiles and self._height + img.height > self.max_part_height:
+            self._flush()
+        self._tiles.append(img)
+        self._height += img.height
+
+    def _flush(self):
+        if not self._tiles:
+            return
+        part = Image.new("RGB", (self.width, self._height), (255, 255, 255))
+        y = 0
+        for tile in self._tiles:
+            part.paste(tile, (0, y))
+            y += tile.height
+        path = self.path_for_part(len(self.paths) + 1)
+        part.save(path, self.image_format, quality=self.quality)
+        self.paths.append(path)
+        self._tiles = []
+        self._height = 0
+
+    def close(self):
+        self._flush()
+
+    def abort(self):
+        self._tiles = []
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
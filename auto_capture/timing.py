@@ -0,0 +1,147 @@
+"""
+Per-stage timing of captures.
+
+Each URL gets one record with the seconds spent in every stage (driver.get,
+readyState wait, settle, login probe, scroll, CDP screenshot, base64 decode,
+encode, disk write), plus the capture's estimated bitmap memory. Retries add
+to the same record. Records are appended to a JSONL file as each URL
+completes, and summary() reports p50/p95/p99 per stage for the run.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Stage names in pipeline order (used to order the summary)
+STAGES = (
+    "driver_start",
+    "prewarm",
+    "get",
+    "ready_wait",
+    "settle",
+    "login_probe",
+    "scroll",
+    "screenshot",
+    "decode",
+    "encode",
+    "write",
+)
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil without floats drifting
+    return sorted_values[int(rank) - 1]
+
+
+class TimingRecorder:
+    """Collects stage durations per URL; thread-safe."""
+
+    def __init__(self, path: str = None):
+        self.path = path  # JSONL output, or None to keep the summary only
+        self._records = {}  # url -> {stage: seconds}
+        self._notes = {}  # url -> extra fields for the record (e.g. memory_mb)
+        self._samples = {}  # stage -> [seconds] for completed records and events
+        self._lock = threading.Lock()
+        self._file = None
+        if path:
+            self._file = open(path, "a", encoding="utf-8")
+
+    @contextmanager
+    def span(self, url: str, stage: str):
+        """Time the enclosed block as `stage` of `url`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(url, stage, time.perf_counter() - start)
+
+    def add(self, url: str, stage: str, seconds: float):
+        if url is None:
+            return  # Not part of a tracked capture
+        with self._lock:
+            stages = self._records.setdefault(url, {})
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def note_peak(self, url: str, field: str, value: float):
+        """Attach `field` to a URL's record, keeping the largest value noted for it."""
+        if url is None:
+            return
+        with self._lock:
+            notes = self._notes.setdefault(url, {})
+            notes[field] = max(value, notes.get(field, value))
+
+    def add_many(self, url: str, timings: dict):
+        for stage, seconds in timings.items():
+            self.add(url, stage, seconds)
+
+    def event(self, stage: str, seconds: float, **fields):
+        """Record a stage that isn't tied to one URL (e.g. a browser launch)."""
+        self._emit({"stage": stage, "seconds": round(seconds, 4), **fields}, {stage: seconds})
+
+    def complete(self, url: str, ok: bool):
+        """Finish a URL's record and write it out."""
+        with self._lock:
+            stages = self._records.pop(url, None)
+            notes = self._notes.pop(url, {})
+        if stages is None:
+            return
+        self._emit(
+            {
+                "url": url,
+                "ok": ok,
+                "total": round(sum(stages.values()), 4),
+                "stages": {stage: round(seconds, 4) for stage, seconds in stages.items()},
+                **notes,
+            },
+            stages,
+        )
+
+    def _emit(self, record: dict, stages: dict):
+        record = {"time": datetime.now().isoformat(timespec="milliseconds"), **record}
+        with self._lock:
+            for stage, seconds in stages.items():
+                self._samples.setdefault(stage, []).append(seconds)
+            if self._file is not None:
+                self._file.write(json.dumps(record) + "\n")
+                self._file.flush()
+
+    def stats(self):
+        """{stage: {"n", "p50", "p95", "p99"}} in seconds, stages in pipeline order."""
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items() if values}
+        order = [stage for stage in STAGES if stage in samples]
+        order += sorted(stage for stage in samples if stage not in STAGES)
+        return {
+            stage: {
+                "n": len(samples[stage]),
+                **{f"p{pct}": percentile(samples[stage], pct) for pct in (50, 95, 99)},
+            }
+            for stage in order
+        }
+
+    def summary(self):
+        """Lines of a per-stage p50/p95/p99 table (milliseconds)."""
+        stats = self.stats()
+        if not stats:
+            return []
+        lines = [f"{'stage':<14}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)"]
+        for stage, values in stats.items():
+            lines.append(
+                f"{stage:<14}{values['n']:>6}"
+                + "".join(f"{values[key] * 1000:>10.0f}" for key in ("p50", "p95", "p99"))
+            )
+        return lines
+
+    def close(self):
+        # Records still open belong to items that never finished (e.g. stopped run)
+        with self._lock:
+            pending = list(self._records)
+        for url in pending:
+            self.complete(url, ok=False)
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,153 @@
+"""
+URL cleaning, extraction and URL -> output path mapping.
+"""
+
+import os
+import re
+from urllib.parse import urlparse
+
+# Windows reserved names that can't be used as filenames
+WINDOWS_RESERVED = {
+    "CON",
+    "PRN",
+    "AUX",
+    "NUL",
+    "COM1",
+    "COM2",
+    "COM3",
+    "COM4",
+    "COM5",
+    "COM6",
+    "COM7",
+    "COM8",
+    "COM9",
+    "LPT1",
+    "LPT2",
+    "LPT3",
+    "LPT4",
+    "LPT5",
+    "LPT6",
+    "LPT7",
+    "LPT8",
+    "LPT9",
+}
+
+
+def validate_url(url: str) -> bool:
+    """Validate if a URL is properly formatted."""
+    try:
+        result = urlparse(url)
+        return all([result.scheme in ("http", "https"), result.netloc])
+    except Exception:
+        return False
+
+
+def normalize_url_for_comparison(url: str) -> str:
+    """Normalize URL for deduplication comparison."""
+    # Remove trailing punctuation
+    url = url.rstrip(".,;:)")
+    # Remove trailing slash (normalize URLs)
+    url = url.rstrip("/")
+    # Convert to lowercase for comparison
+    return url.lower()
+
+
+def extract_urls(raw_text: str):
+    pattern = r'https?://[^\s<>"\'`]+'
+    results = re.findall(pattern, raw_text)
+
+    unique = []
+    seen = set()
+
+    for url in results:
+        clean = url.rstrip(".,;:)")
+        # Validate URL before adding
+        if not validate_url(clean):
+            continue
+        normalized = normalize_url_for_comparison(clean)
+
+        if normalized not in seen:
+            seen.add(normalized)
+            unique.append(clean)
+
+    return unique
+
+
+def sanitize_for_windows(name: str) -> str:
+    """Sanitize a filename component for Windows."""
+    if not name:
+        return "unnamed"
+
+    # Remove Windows invalid characters
+    invalid_chars = '<>:"/\\|?*'
+    cleaned = "".join(c for c in name if c not in invalid_chars)
+
+    # Remove leading/trailing dots and spaces (Windows doesn't allow these)
+    cleaned = cleaned.strip(". ")
+
+    # Handle Windows reserved names
+    if cleaned.upper() in WINDOWS_RESERVED:
+        cleaned = f"_{cleaned}"
+
+    # Ensure it's not empty after cleaning
+    if not cleaned:
+        cleaned = "unnamed"
+
+    # Limit length to avoid Windows path issues (260 char limit for full path)
+    # Keep individual component reasonable (max 100 chars)
+    if len(cleaned) > 100:
+        cleaned = cleaned[:100]
+
+    return cleaned
+
+
+def variant_filename(filename: str, variant: str) -> str:
+    """`filename` with a variant suffix before the extension, e.g. page.png -> page_390w.png."""
+    if not variant:
+        return filename
+    base, ext = os.path.splitext(filename)
+    return f"{base}_{sanitize_for_windows(variant)}{ext}"
+
+
+def url_to_filepath(url: str, fmt: str, include_domain: bool = True):
+    """Convert URL to Windows-safe (subdir, filename) relative to the save folder."""
+    parsed = urlparse(url)
+
+    # Windows invalid characters: < > : " / \ | ? *
+    # Also handle port numbers in domain
+    domain = parsed.netloc.replace(":", "-").replace(".", "_")
+    # Remove any remaining invalid chars from domain
+    domain = "".join(c for c in domain if c.isalnum() or c in "-_")
+
+    path = parsed.path.strip("/")
+    if not path:
+        return domain if include_domain else "", f"index.{fmt}"
+
+    parts = [p for p in path.split("/") if p]
+
+    clean_parts = [sanitize_for_windows(p) for p in parts]
+
+    if len(clean_parts) == 1:
+        filename = f"{clean_parts[0]}.{fmt}"
+        folder = ""
+    else:
+        filename = f"{clean_parts[-1]}.{fmt}"
+        folder = os.path.join(*clean_parts[:-1])
+
+    if include_domain:
+        return (os.path.join(domain, folder) if folder else domain), filename
+
+    return folder, filename
+
+
+def build_work_items(urls, fmt: str, include_domain: bool = True):
+    """Turn URLs into capture work items, dropping duplicates after normalization."""
+    seen_urls = set()
+    items = []
+    for u in urls:
+        normalized = normalize_url_for_comparison(u)
+        if normalized not in seen_urls:
+            seen_urls.add(normalized)
+            subdir, filename = url_to_filepath(u, fmt, include_domain)
+            items.append({"url": u, "subdir": subdir, "filename": filename})
+    return items
@@ -0,0 +1,111 @@
+"""
+Viewport profiles: capture one page load at several screen sizes.
+
+Instead of reloading a page per width, the loaded page is re-laid out with CDP
+``Emulation.setDeviceMetricsOverride`` (width, device scale factor, mobile
+mode) and captured again. Media queries, ``srcset`` and mobile viewport meta
+tags respond as they would on a real device of that size. Each profile's file
+sits next to the others, named ``<page>_<label>.<ext>``.
+
+Profiles are written ``WIDTH[@SCALE][:mobile]``, e.g. ``1400``, ``768@2`` or
+``390@3:mobile``.
+"""
+
+import threading
+from collections import namedtuple
+
+
+class ViewportProfile(namedtuple("ViewportProfile", "width scale mobile")):
+    __slots__ = ()
+
+    @property
+    def label(self) -> str:
+        """Filename suffix, e.g. '1400w' or '390w_3x_mobile'."""
+        label = f"{self.width}w"
+        if self.scale != 1:
+            label += f"_{self.scale:g}x"
+        if self.mobile:
+            label += "_mobile"
+        return label
+
+
+def parse_viewport(spec: str) -> ViewportProfile:
+    """Parse a ``WIDTH[@SCALE][:mobile]`` profile; raises ValueError with a user-facing message."""
+    text = spec.strip().lower()
+    mobile = False
+    if text.endswith(":mobile"):
+        text, mobile = text[: -len(":mobile")], True
+    width_text, _, scale_text = text.partition("@")
+    try:
+        width = int(width_text)
+        scale = float(scale_text.rstrip("x")) if scale_text else 1.0
+    except ValueError:
+        raise ValueError(
+            f"Invalid viewport '{spec}'. Use WIDTH[@SCALE][:mobile], e.g. 390@3:mobile."
+        ) from None
+    if width < 100 or width > 5000:
+        raise ValueError(f"Viewport '{spec}': width must be between 100 and 5000 pixels.")
+    if scale < 0.5 or scale > 4:
+        raise ValueError(f"Viewport '{spec}': scale must be between 0.5 and 4.")
+    return ViewportProfile(width, scale, mobile)
+
+
+def parse_viewports(specs):
+    """Profiles for a list of specs (comma-separated strings allowed), without repeats."""
+    profiles = []
+    for spec in specs:
+        for part in spec.split(","):
+            if part.strip():
+                profiles.append(parse_viewport(part))
+    return list(dict.fromkeys(profiles))
+
+
+def apply_viewport(driver, profile: ViewportProfile, height: int):
+    """Lay the loaded page out as `profile` with a viewport `height` CSS pixels tall."""
+    driver.execute_cdp_cmd(
+        "Emulation.setDeviceMetricsOverride",
+        {
+            "width": profile.width,
+            "height": height,
+            "deviceScaleFactor": profile.scale,
+            "mobile": profile.mobile,
+        },
+    )
+
+
+def clear_viewport(driver):
+    """Back to the browser window's own metrics."""
+    driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+
+
+class OutputGroup:
+    """The outputs of one URL across profiles; the URL is done when all are written."""
+
+    def __init__(self, item, count: int):
+        self.item = item  # The work item the profiles were captured from
+        self.remaining = count
+        self.ok = True
+        self.paths = []
+        self.abandoned = False
+        self._lock = threading.Lock()
+
+    def finish(self, path: str, ok: bool):
+        """Record one written (or failed) output. Returns (all finished, all ok, paths).
+
+        Returns None once the group is abandoned; the output is then left over.
+        """
+        with self._lock:
+            if self.abandoned:
+                return None
+            self.remaining -= 1
+            self.ok = self.ok and ok
+            if ok and path not in self.paths:
+                self.paths.append(path)
+            return self.remaining == 0, self.ok, list(self.paths)
+
+    def abandon(self):
+        """Give up on the group after a profile failed. Returns the outputs written so far."""
+        with self._lock:
+            self.abandoned = True
+            paths, self.paths = self.paths, []
+            return paths
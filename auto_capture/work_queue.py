@@ -0,0 +1,149 @@
+"""
+Shared work queue used by parallel capture workers.
+"""
+
+import collections
+import heapq
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class CaptureQueue:
+    """Thread-safe work queue that enforces a per-host concurrency cap.
+
+    Items are handed out in submission order, except that an item whose host
+    already has ``per_host_limit`` captures in flight is passed over in favour
+    of the next item from a host with free capacity.
+
+    While a producer is feeding the queue (between begin_feed() and
+    end_feed()) an empty queue makes workers wait rather than finish.
+    Items added with put_later() join the back of the line once their delay
+    has passed; until then other items are handed out.
+    """
+
+    def __init__(self, items=(), per_host_limit: int = 0):
+        self.per_host_limit = per_host_limit  # 0 = unlimited
+        lock = threading.Lock()
+        self._cond = threading.Condition(lock)  # Workers waiting for an item
+        self._room = threading.Condition(lock)  # Feeders waiting for the queue to shrink
+        self._by_host = {}  # host -> deque of (seq, item)
+        self._delayed = []  # heap of (ready time, seq, item) not yet due
+        self._active = collections.Counter()  # host -> captures in flight
+        self._seq = 0
+        self._pending = 0
+        self._in_flight = 0
+        self._feeders = 0
+        self._closed = False
+        for item in items:
+            self.put(item)
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def put(self, item):
+        with self._cond:
+            self._append(item)
+            self._cond.notify()
+
+    def put_later(self, item, delay: float):
+        """Queue an item that may not start for `delay` seconds (e.g. a retry)."""
+        with self._cond:
+            heapq.heappush(self._delayed, (time.monotonic() + delay, self._seq, item))
+            self._seq += 1
+            self._cond.notify()
+
+    def _append(self, item):
+        host = self.host_key(item["url"])
+        self._by_host.setdefault(host, collections.deque()).append((self._seq, item))
+        self._seq += 1
+        self._pending += 1
+
+    def _promote_due(self):
+        """Move delayed items whose time has come to the back of the line."""
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            self._append(heapq.heappop(self._delayed)[2])
+
+    def get(self):
+        """Block until an item can be started. Returns None when the queue is exhausted."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                self._promote_due()
+                best_host = None
+                best_seq = None
+                for host, pending in self._by_host.items():
+                    if not pending:
+                        continue
+                    if self.per_host_limit and self._active[host] >= self.per_host_limit:
+                        continue
+                    if best_seq is None or pending[0][0] < best_seq:
+                        best_host, best_seq = host, pending[0][0]
+                if best_host is not None:
+                    _, item = self._by_host[best_host].popleft()
+                    if not self._by_host[best_host]:
+                        del self._by_host[best_host]
+                    self._active[best_host] += 1
+                    self._pending -= 1
+                    self._in_flight += 1
+                    self._room.notify()
+                    return item
+                if (
+                    self._pending == 0
+                    and self._in_flight == 0
+                    and self._feeders == 0
+                    and not self._delayed
+                ):
+                    return None
+                # Wake for the next delayed item even if nothing else happens
+                timeout = self._delayed[0][0] - time.monotonic() if self._delayed else None
+                self._cond.wait(timeout)
+
+    def begin_feed(self):
+        """Announce a producer that will put() more items; workers wait for them."""
+        with self._cond:
+            self._feeders += 1
+
+    def end_feed(self):
+        with self._cond:
+            self._feeders -= 1
+            self._cond.notify_all()
+
+    def wait_for_room(self, limit: int) -> bool:
+        """Block while `limit` items are waiting. Returns False once the queue is closed."""
+        with self._room:
+            while self._pending >= limit and not self._closed:
+                self._room.wait()
+            return not self._closed
+
+    def task_done(self, item):
+        """Release the host slot held by an item returned from get()."""
+        with self._cond:
+            host = self.host_key(item["url"])
+            self._active[host] -= 1
+            if self._active[host] <= 0:
+                del self._active[host]
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def close(self):
+        """Stop handing out items; blocked workers return None."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            self._room.notify_all()
+
+    def drain(self):
+        """Remove and return all items that were never started, in submission order."""
+        with self._cond:
+            remaining = [entry for pending in self._by_host.values() for entry in pending]
+            remaining += [(seq, item) for _, seq, item in self._delayed]
+            self._by_host.clear()
+            self._delayed = []
+            self._pending = 0
+            self._cond.notify_all()
+            self._room.notify_all()
+        return [item for _, item in sorted(remaining, key=lambda entry: entry[0])]
@@ -0,0 +1,3 @@
+"""
+Benchmarks for the capture pipeline (not tests). Run with ``python -m benchmarks.run``.
+"""
@@ -0,0 +1,116 @@
+"""
+Stand-in for selenium's Chrome driver, for benchmarking without a browser.
+
+get() really fetches the page (and its images) from the fixture server, so
+network latency is measured, and screenshots are canned images of the page's
+declared size in the requested format (PNG, JPEG or WebP), so the
+decode/encode/write stages do real work. Everything
+else answers the engine's scripts the way a settled page would.
+"""
+
+import base64
+import io
+import re
+import urllib.request
+from urllib.parse import urljoin
+
+from PIL import Image
+
+from auto_capture.crawl import LINK_EXTRACT_JS
+from auto_capture.engine import LOGIN_PROBE_JS
+from auto_capture.settle import SETTLE_PROBE_JS
+
+_HEIGHT_RE = re.compile(rb'data-height="(\d+)"')
+_IMAGE_RE = re.compile(rb'<img src="([^"]+)"')
+
+_image_cache = {}  # (width, height, format, quality) -> base64 image
+
+
+def canned_image(width: int, height: int, fmt: str = "png", quality: int = 90) -> str:
+    """Base64 image of the given size with some vertical structure to compress.
+
+    ``fmt`` is a Page.captureScreenshot format: png, jpeg or webp.
+    """
+    key = (width, height, fmt, quality)
+    if key not in _image_cache:
+        gradient = Image.linear_gradient("L").resize((width, height))
+        img = Image.merge("RGB", (gradient, gradient.transpose(Image.FLIP_TOP_BOTTOM), gradient))
+        buffer = io.BytesIO()
+        if fmt == "png":
+            img.save(buffer, "PNG", compress_level=1)
+        else:
+            img.save(buffer, fmt.upper(), quality=quality)
+        _image_cache[key] = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return _image_cache[key]
+
+
+class FakeWebDriver:
+    """Implements the subset of the WebDriver API CaptureEngine uses."""
+
+    def __init__(self, options=None):
+        self.current_url = "about:blank"
+        self.window_width = 1400
+        self.window_height = 900
+        self.page_height = 900
+        self._closed = False
+
+    @property
+    def window_handles(self):
+        if self._closed:
+            raise RuntimeError("invalid session id")
+        return ["main"]
+
+    def set_window_size(self, width, height):
+        self.window_width, self.window_height = width, height
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def get(self, url):
+        with urllib.request.urlopen(url, timeout=30) as response:
+            html = response.read()
+        # Load images like a browser would, so latency settings matter
+        for src in _IMAGE_RE.findall(html):
+            with urllib.request.urlopen(urljoin(url, src.decode()), timeout=30) as image:
+                image.read()
+        match = _HEIGHT_RE.search(html)
+        self.page_height = int(match.group(1)) if match else 900
+        self.current_url = url
+
+    def get_log(self, kind):
+        return []
+
+    def execute_script(self, script, *args):
+        if script.endswith(SETTLE_PROBE_JS):  # With or without the lazy-loading prefix
+            return ["complete", 0, False, self.page_height]
+        if script == LOGIN_PROBE_JS:
+            return [self.current_url, None]
+        if script == LINK_EXTRACT_JS:
+            return []
+        if "readyState" in script:
+            return "complete"
+        if "devicePixelRatio" in script:
+            return [self.window_width, 1]
+        if "scrollHeight" in script:
+            return self.page_height
+        return None
+
+    def execute_async_script(self, script, *args):
+        return None  # Scroll steps: nothing to wait for
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd != "Page.captureScreenshot":
+            return {}
+        clip = params.get("clip")
+        if clip:
+            width, height = int(clip["width"]), int(clip["height"])
+        else:
+            width, height = self.window_width, min(self.page_height, self.window_height)
+        return {
+            "data": canned_image(
+                width, height, params.get("format", "png"), params.get("quality", 90)
+            )
+        }
+
+    def quit(self):
+        self._closed = True
@@ -0,0 +1,118 @@
+"""
+Local HTTP server serving synthetic pages of controlled size and latency.
+
+    /page/<n>?height=3000&images=5&latency=50
+        HTML page <height> CSS pixels tall with <images> images, answered
+        after <latency> ms.
+    /img/<n>.png?latency=20
+        A small PNG answered after <latency> ms.
+"""
+
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>Fixture page {n}</title>
+<style>body {{ margin: 0; font-family: sans-serif; }}
+.block {{ height: 400px; border-bottom: 1px solid #ccc; }}</style></head>
+<body data-height="{height}" data-images="{images}">
+<div style="height: {height}px; background: linear-gradient(#fff, #9cf);">
+<h1>Fixture page {n}</h1>
+{image_tags}
+</div>
+</body></html>
+"""
+
+
+def _png_bytes(width: int = 64, height: int = 64) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (80, 140, 220)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    image_data = _png_bytes()
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        latency = int(query.get("latency", 0))
+        if latency:
+            time.sleep(latency / 1000)
+
+        parts = [part for part in parsed.path.split("/") if part]
+        if not parts:
+            self._send(200, "text/html", b"<html><body>fixture server</body></html>")
+        elif parts[0] == "page":
+            height = int(query.get("height", 3000))
+            images = int(query.get("images", 0))
+            image_latency = query.get("image_latency", "0")
+            image_tags = "\n".join(
+                f'<img src="/img/{i}.png?latency={image_latency}" width="64" height="64">'
+                for i in range(images)
+            )
+            body = PAGE_TEMPLATE.format(
+                n=parts[1] if len(parts) > 1 else 0,
+                height=height,
+                images=images,
+                image_tags=image_tags,
+            )
+            self._send(200, "text/html; charset=utf-8", body.encode("utf-8"))
+        elif parts[0] == "img":
+            self._send(200, "image/png", self.image_data)
+        else:
+            self._send(404, "text/plain", b"not found")
+
+
+class FixtureServer:
+    """Fixture server on a background thread; use as a context manager."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), FixtureHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_url(self, n: int, height: int, images: int = 0, latency: int = 0) -> str:
+        return (
+            f"{self.base_url}/page/{n}?height={height}&images={images}"
+            f"&latency={latency}&image_latency={latency // 2}"
+        )
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
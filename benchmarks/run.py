@@ -0,0 +1,215 @@
+"""
+Capture benchmark: pages/minute, per-stage latency and peak memory.
+
+    python -m benchmarks.run                       # fake driver, default workload
+    python -m benchmarks.run --pages 100 --workers 4 --format jpg
+    python -m benchmarks.run --profile chrome      # real headless Chrome
+    python -m benchmarks.run --save-baseline main  # store results as "main"
+    python -m benchmarks.run --compare main        # show change against "main"
+
+Pages come from a local fixture server, so runs are reproducible and need no
+network. The fake profile measures the tool's own overhead (queueing, decode,
+encode, write, zip); the chrome profile adds real rendering.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from auto_capture import CaptureConfig, CaptureEngine, build_work_items
+from auto_capture.archive import create_zip_archives
+from auto_capture.config import VALID_FORMATS
+
+from .fake_driver import FakeWebDriver
+from .fixture_server import FixtureServer
+
+BASELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process and its (finished) children in MB, if known."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil  # Optional, for Windows
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KB elsewhere
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return max(own, children) / 1024 / 1024
+
+
+def run_benchmark(args):
+    save_dir = tempfile.mkdtemp(prefix="auto_capture_bench_")
+    quiet = not args.verbose
+    config = CaptureConfig(
+        save_directory=save_dir,
+        fmt=args.format,
+        width=args.width,
+        delay=0,
+        headless=True,
+        workers=args.workers,
+        per_host=args.workers,
+        settle_timeout=args.settle_timeout,
+        memory_budget_mb=args.memory_budget,
+    )
+    config.validate()
+
+    driver_factory = FakeWebDriver if args.profile == "fake" else None
+    engine = CaptureEngine(
+        config,
+        log=(lambda message: None) if quiet else None,
+        driver_factory=driver_factory,
+    )
+
+    try:
+        with FixtureServer() as server:
+            urls = [
+                server.page_url(n, args.height, args.images, args.latency)
+                for n in range(args.pages)
+            ]
+            items = build_work_items(urls, config.fmt, config.include_domain)
+
+            # The engine prints "Saved: <path>" lines for scripts; hide them unless verbose
+            hide_output = contextlib.redirect_stdout(io.StringIO())
+            start = time.perf_counter()
+            with hide_output if quiet else contextlib.nullcontext():
+                engine.run(items)
+            capture_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        zip_parts = create_zip_archives(save_dir, os.path.join(save_dir, "bench.zip"))
+        zip_seconds = time.perf_counter() - start
+    finally:
+        if not args.keep:
+            shutil.rmtree(save_dir, ignore_errors=True)
+
+    captured = len(items) - len(engine.failed_items)
+    rss = peak_rss_mb()
+    return {
+        "profile": args.profile,
+        "workload": {
+            "pages": args.pages,
+            "height": args.height,
+            "images": args.images,
+            "latency_ms": args.latency,
+            "format": args.format,
+            "width": args.width,
+            "workers": args.workers,
+            "memory_budget_mb": args.memory_budget,
+        },
+        "captured": captured,
+        "failed": len(engine.failed_items),
+        "capture_seconds": round(capture_seconds, 3),
+        "pages_per_minute": round(captured / capture_seconds * 60, 1) if capture_seconds else 0,
+        "zip_seconds": round(zip_seconds, 3),
+        "zip_parts": len(zip_parts),
+        "peak_rss_mb": round(rss, 1) if rss is not None else None,
+        "stages_ms": {
+            stage: {
+                "n": stats["n"],
+                **{key: round(stats[key] * 1000, 1) for key in ("p50", "p95", "p99")},
+            }
+            for stage, stats in engine.timings.stats().items()
+        },
+    }
+
+
+def print_report(result, baseline=None):
+    def delta(current, previous, higher_is_better=False):
+        if not previous or current is None:
+            return ""
+        change = (current - previous) / previous * 100
+        if abs(change) < 0.5:
+            return ""
+        better = change > 0 if higher_is_better else change < 0
+        return f"  ({change:+.1f}% {'better' if better else 'worse'})"
+
+    base = baseline or {}
+    workload = result["workload"]
+    print(
+        f"Profile: {result['profile']}  |  {workload['pages']} pages x {workload['height']}px, "
+        f"{workload['images']} images, {workload['latency_ms']}ms latency, "
+        f"{workload['format']}, {workload['workers']} worker(s)"
+    )
+    print(f"Captured: {result['captured']}  Failed: {result['failed']}")
+    print(
+        f"Pages/minute: {result['pages_per_minute']}"
+        + delta(result["pages_per_minute"], base.get("pages_per_minute"), higher_is_better=True)
+    )
+    print(f"Zip: {result['zip_seconds']}s" + delta(result["zip_seconds"], base.get("zip_seconds")))
+    if result["peak_rss_mb"] is not None:
+        print(
+            f"Peak RSS: {result['peak_rss_mb']} MB"
+            + delta(result["peak_rss_mb"], base.get("peak_rss_mb"))
+        )
+    print(f"{'stage':<14}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+    base_stages = base.get("stages_ms", {})
+    for stage, values in result["stages_ms"].items():
+        print(
+            f"{stage:<14}{values['n']:>6}"
+            + "".join(f"{values[key]:>10.1f}" for key in ("p50", "p95", "p99"))
+            + delta(values["p50"], base_stages.get(stage, {}).get("p50"))
+        )
+
+
+def load_baselines():
+    try:
+        with open(BASELINES_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmarks.run", description=__doc__.split("\n")[1])
+    parser.add_argument("--profile", choices=("fake", "chrome"), default="fake")
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--height", type=int, default=3000, help="Page height in CSS pixels")
+    parser.add_argument("--images", type=int, default=5, help="Images per page")
+    parser.add_argument("--latency", type=int, default=20, help="Server latency per page (ms)")
+    parser.add_argument("--format", choices=VALID_FORMATS, default="png")
+    parser.add_argument("--width", type=int, default=1400)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--settle-timeout", type=float, default=5.0)
+    parser.add_argument("--memory-budget", type=int, default=2048, help="MB, 0 = no limit")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Store the result as NAME")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against stored baseline NAME")
+    parser.add_argument("--json", action="store_true", help="Print the raw result as JSON")
+    parser.add_argument("--keep", action="store_true", help="Keep the captured files")
+    parser.add_argument("--verbose", action="store_true", help="Show the engine log")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    baselines = load_baselines()
+    if args.compare and args.compare not in baselines:
+        print(f"Error: no baseline named '{args.compare}' in {BASELINES_FILE}", file=sys.stderr)
+        return 2
+
+    result = run_benchmark(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result, baselines.get(args.compare))
+
+    if args.save_baseline:
+        baselines[args.save_baseline] = result
+        with open(BASELINES_FILE, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+        print(f"Saved baseline '{args.save_baseline}' to {BASELINES_FILE}")
+    return 0 if result["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
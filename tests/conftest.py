@@ -0,0 +1,156 @@
+import contextlib
+import io
+import os
+import threading
+import time
+from collections import namedtuple
+
+import pytest
+
+from auto_capture import CaptureConfig, CaptureEngine, build_work_items
+from auto_capture.crawl import LINK_EXTRACT_JS
+from auto_capture.engine import LOGIN_PROBE_JS
+from benchmarks.fake_driver import FakeWebDriver
+from benchmarks.fixture_server import FixtureServer
+
+CaptureRun = namedtuple("CaptureRun", "engine folder drivers logs")
+
+
+class Concurrency:
+    """Counts overlapping calls across threads; `peak` is the most at once."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def exit(self):
+        with self._lock:
+            self.active -= 1
+
+
+class ScriptedDriver(FakeWebDriver):
+    """FakeWebDriver with the knobs the tests need.
+
+    - pixel_ratio: device pixel ratio the page reports
+    - login_reason: if set, every page looks like a redirect to a login form
+    - links: callable(url) -> links found on that page (discovery mode)
+    - load_time: extra seconds every get() takes; a shared Concurrency
+      (`concurrency`) records how many loads overlap
+    - Emulation.setDeviceMetricsOverride lays the page out at the emulated
+      size, like Chrome does
+    - every CDP command is recorded in ``cdp_calls``
+    """
+
+    def __init__(
+        self,
+        options=None,
+        pixel_ratio=1,
+        login_reason=None,
+        links=None,
+        load_time=0,
+        concurrency=None,
+    ):
+        super().__init__(options)
+        self.options = options
+        self.pixel_ratio = pixel_ratio
+        self.login_reason = login_reason
+        self.links = links
+        self.load_time = load_time
+        self.concurrency = concurrency
+        self.cdp_calls = []
+
+    def get(self, url):
+        if self.concurrency is not None:
+            self.concurrency.enter()
+        try:
+            time.sleep(self.load_time)
+            super().get(url)
+        finally:
+            if self.concurrency is not None:
+                self.concurrency.exit()
+
+    @property
+    def clips(self):
+        """Clip rectangles of the screenshots taken (None for a plain screenshot)."""
+        return [
+            params.get("clip") for cmd, params in self.cdp_calls if cmd == "Page.captureScreenshot"
+        ]
+
+    def execute_script(self, script, *args):
+        if "devicePixelRatio" in script:
+            return [self.window_width, self.pixel_ratio]
+        if self.login_reason is not None and script == LOGIN_PROBE_JS:
+            return ["https://example.com/login", self.login_reason]
+        if self.links is not None and script == LINK_EXTRACT_JS:
+            return self.links(self.current_url)
+        return super().execute_script(script, *args)
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_calls.append((cmd, params))
+        if cmd == "Emulation.setDeviceMetricsOverride":
+            self.window_width = params["width"]
+            if params["height"]:
+                self.window_height = params["height"]
+        return super().execute_cdp_cmd(cmd, params)
+
+
+@pytest.fixture(scope="session")
+def fixture_server():
+    with FixtureServer() as server:
+        yield server
+
+
+@pytest.fixture
+def run_capture(tmp_path, fixture_server):
+    """run_capture(heights, driver=ScriptedDriver, driver_options=None, urls=None, **config).
+
+    Captures one fixture page per height (or `urls`) with a fake driver and
+    returns a CaptureRun. `driver_options` go to every driver created;
+    further keyword arguments go to CaptureConfig.
+    """
+
+    def run(heights=(), driver=ScriptedDriver, driver_options=None, urls=None, **config):
+        config.setdefault("save_directory", str(tmp_path / "captures"))
+        config.setdefault("delay", 0)
+        config.setdefault("workers", 1)
+        cfg = CaptureConfig(headless=True, **config)
+        cfg.validate()
+        if urls is None:
+            urls = [fixture_server.page_url(n, height, 0, 0) for n, height in enumerate(heights)]
+        drivers = []
+        logs = []
+
+        def factory(options):
+            drivers.append(driver(options, **(driver_options or {})))
+            return drivers[-1]
+
+        engine = CaptureEngine(cfg, log=logs.append, driver_factory=factory)
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.run(build_work_items(urls, cfg.fmt))
+        return CaptureRun(engine, cfg.save_directory, drivers, logs)
+
+    return run
+
+
+def output_files(folder):
+    """Names of the captures written under `folder` (journal excluded), sorted."""
+    return sorted(
+        name
+        for _, _, files in os.walk(folder)
+        for name in files
+        if not name.startswith(".capture_journal")
+    )
+
+
+def output_path(folder, name):
+    """Full path of the capture called `name` under `folder`."""
+    for root, _, files in os.walk(folder):
+        if name in files:
+            return os.path.join(root, name)
+    raise FileNotFoundError(name)
@@ -0,0 +1,51 @@
+import os
+import zipfile
+
+from auto_capture.archive import ZIP_DEFLATED, ZIP_STORED, create_zip_archives
+from auto_capture.journal import JOURNAL_FILENAME
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_formats_stored_or_deflated(tmp_path):
+    captures = tmp_path / "captures"
+    _write(captures / "site" / "page.png", os.urandom(2000))
+    _write(captures / "site" / "notes.txt", b"text " * 1000)
+    _write(captures / JOURNAL_FILENAME, b"journal")
+
+    (path,) = create_zip_archives(str(captures), str(tmp_path / "out.zip"))
+    with zipfile.ZipFile(path) as archive:
+        assert archive.testzip() is None
+        infos = {info.filename: info for info in archive.infolist()}
+        assert sorted(infos) == ["site/notes.txt", "site/page.png"]
+        assert infos["site/page.png"].compress_type == ZIP_STORED
+        assert infos["site/notes.txt"].compress_type == ZIP_DEFLATED
+        assert archive.read("site/notes.txt") == b"text " * 1000
+
+
+def test_parts_split_below_limit(tmp_path):
+    captures = tmp_path / "captures"
+    for n in range(6):
+        _write(captures / f"{n}.png", os.urandom(30_000))
+    limit = 70_000
+
+    paths = create_zip_archives(str(captures), str(tmp_path / "out.zip"), max_size=limit)
+    assert [os.path.basename(path) for path in paths] == [
+        "out.zip",
+        "out_part2.zip",
+        "out_part3.zip",
+    ]
+    names = []
+    for path in paths:
+        assert os.path.getsize(path) <= limit
+        with zipfile.ZipFile(path) as archive:
+            assert archive.testzip() is None
+            names += archive.namelist()
+    assert sorted(names) == [f"{n}.png" for n in range(6)]
+
+
+def test_empty_folder(tmp_path):
+    assert create_zip_archives(str(tmp_path), str(tmp_path / "out.zip")) == []
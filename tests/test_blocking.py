@@ -0,0 +1,45 @@
+import pytest
+
+from auto_capture import CaptureConfig
+from auto_capture.blocking import BLOCK_PROFILES, MEDIA, apply_blocking, blocked_url_patterns
+
+from conftest import ScriptedDriver, output_files
+
+
+def test_patterns_from_profiles_and_user():
+    patterns = blocked_url_patterns([MEDIA, MEDIA], [" *.gif ", "", "*.mp4*"])
+    assert patterns == list(BLOCK_PROFILES[MEDIA]) + ["*.gif"]
+
+
+def test_nothing_to_block_sends_nothing():
+    driver = ScriptedDriver()
+    apply_blocking(driver, [])
+    assert driver.cdp_calls == []
+
+
+def test_unknown_profile_rejected():
+    with pytest.raises(ValueError, match="Unknown blocking profile 'ads'"):
+        CaptureConfig(save_directory="out", block_profiles=["ads"]).validate()
+
+
+def test_every_browser_blocks(run_capture):
+    run = run_capture(
+        [1000, 1000], workers=2, per_host=2, block_profiles=["chat"], block_patterns=["*.gif"]
+    )
+    expected = blocked_url_patterns(["chat"], ["*.gif"])
+    assert len(run.drivers) == 2
+    for driver in run.drivers:
+        assert ("Network.setBlockedURLs", {"urls": expected}) in driver.cdp_calls
+    assert output_files(run.folder) == ["0.png", "1.png"]
+
+
+def test_blocking_failure_does_not_stop_the_capture(run_capture):
+    class NoNetworkDomain(ScriptedDriver):
+        def execute_cdp_cmd(self, cmd, params):
+            if cmd.startswith("Network."):
+                raise RuntimeError("Network domain unavailable")
+            return super().execute_cdp_cmd(cmd, params)
+
+    run = run_capture([1000], driver=NoNetworkDomain, block_profiles=["media"])
+    assert "Could not enable resource blocking: Network domain unavailable" in run.logs
+    assert output_files(run.folder) == ["0.png"]
@@ -0,0 +1,121 @@
+import threading
+
+import pytest
+
+import auto_capture.engine
+from auto_capture.browser_pool import WarmSparePool
+
+
+class Spare:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.quit_called = False
+
+    @property
+    def window_handles(self):
+        if not self.alive:
+            raise RuntimeError("browser is gone")
+        return ["main"]
+
+    def quit(self):
+        self.quit_called = True
+
+
+class SpareFactory:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.made = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.made.append(Spare(self.alive))
+            return self.made[-1]
+
+
+def test_take_returns_a_spare_and_starts_another():
+    factory = SpareFactory()
+    pool = WarmSparePool(factory, size=1)
+    pool.start()
+    spare = pool.take(timeout=5)
+    assert spare is factory.made[0]
+    assert pool.take(timeout=5) is factory.made[1]
+    pool.close()
+
+
+def test_take_quits_dead_spares():
+    factory = SpareFactory(alive=False)
+    quit_hooked = []
+    pool = WarmSparePool(factory, size=1, on_quit=quit_hooked.append)
+    pool.start()
+    assert pool.take(timeout=5) is None
+    assert factory.made[0].quit_called
+    assert quit_hooked[0] is factory.made[0]
+    pool.close()
+
+
+def test_close_quits_idle_spares():
+    factory = SpareFactory()
+    quit_hooked = []
+    pool = WarmSparePool(factory, size=2, on_quit=quit_hooked.append)
+    pool.start()
+    pool.take(timeout=5)
+    pool.close()
+    idle = [spare for spare in factory.made if spare.quit_called]
+    assert idle and idle == quit_hooked
+    assert pool.take(timeout=5) is None
+
+
+def test_factory_failure_is_logged():
+    logs = []
+
+    def factory():
+        raise RuntimeError("no chrome")
+
+    pool = WarmSparePool(factory, log=logs.append)
+    pool.start()
+    assert pool.take(timeout=5) is None
+    assert logs[0] == "Standby browser failed to start: no chrome"
+    pool.close()
+
+
+@pytest.fixture
+def spare_pools(monkeypatch):
+    """Every WarmSparePool the engine creates."""
+    pools = []
+
+    class RecordingPool(WarmSparePool):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    monkeypatch.setattr(auto_capture.engine, "WarmSparePool", RecordingPool)
+    return pools
+
+
+def test_engine_starts_a_spare(run_capture, spare_pools):
+    run_capture([1000], warm_spare=True)
+    assert len(spare_pools) == 1
+
+
+def test_no_spare_for_a_lone_profile_browser(run_capture, spare_pools, tmp_path):
+    # Spares don't use the persistent profile, so the only browser can't swap one in
+    run = run_capture(
+        [1000],
+        warm_spare=True,
+        persist_session=True,
+        chrome_user_data_dir=str(tmp_path / "profile"),
+    )
+    assert spare_pools == []
+    assert len(run.drivers) == 1
+
+
+def test_spare_kept_for_browsers_without_the_profile(run_capture, spare_pools, tmp_path):
+    run_capture(
+        [1000, 1000],
+        warm_spare=True,
+        persist_session=True,
+        chrome_user_data_dir=str(tmp_path / "profile"),
+        workers=2,
+    )
+    assert len(spare_pools) == 1
@@ -0,0 +1,95 @@
+import io
+
+import pytest
+
+from auto_capture import cli
+from auto_capture.engine import CaptureEngine
+from benchmarks.fake_driver import FakeWebDriver
+
+from conftest import ScriptedDriver, output_files
+
+
+@pytest.fixture
+def urls_file(tmp_path):
+    path = tmp_path / "urls.txt"
+    path.write_text("https://example.com/a\nhttps://example.com/b\n")
+    return str(path)
+
+
+def test_interrupt_quits_every_browser(monkeypatch, tmp_path, urls_file):
+    drivers = []
+
+    class InterruptedEngine(CaptureEngine):
+        def run(self, items):
+            # Ctrl+C while worker threads still hold their browsers
+            self.is_running = True
+            self.driver = self.launch_driver()
+            self.worker_drivers.append(self.launch_driver(use_profile=False))
+            raise KeyboardInterrupt
+
+    def engine(config):
+        def factory(options):
+            drivers.append(FakeWebDriver(options))
+            return drivers[-1]
+
+        return InterruptedEngine(config, log=lambda message: None, driver_factory=factory)
+
+    monkeypatch.setattr(cli, "CaptureEngine", engine)
+    code = cli.main([urls_file, "-o", str(tmp_path / "out"), "--no-check"])
+    assert code == 130
+    assert len(drivers) == 2
+    assert all(driver._closed for driver in drivers)
+
+
+@pytest.fixture
+def fake_engine(monkeypatch):
+    """Make cli.main capture with fake browsers; returns the engines it created."""
+    engines = []
+
+    def engine(config):
+        engines.append(
+            CaptureEngine(config, log=lambda message: None, driver_factory=ScriptedDriver)
+        )
+        return engines[-1]
+
+    monkeypatch.setattr(cli, "CaptureEngine", engine)
+    return engines
+
+
+def test_parser_maps_options_to_config():
+    args = cli.build_parser().parse_args(
+        ["urls.txt", "-o", "out", "--format", "jpg", "--workers", "3", "--block", "media"]
+    )
+    assert args.sources == ["urls.txt"]
+    assert (args.fmt, args.workers, args.block) == ("jpg", 3, ["media"])
+    assert cli.build_parser().parse_args(["-o", "out"]).sources == ["-"]
+
+
+def test_captures_urls_from_stdin(monkeypatch, tmp_path, fixture_server, fake_engine):
+    urls = [fixture_server.page_url(n, 1000) for n in range(2)]
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(urls + urls[:1]) + "\n"))
+    folder = tmp_path / "out"
+    assert cli.main(["-o", str(folder), "--no-check", "--delay", "0"]) == 0
+    assert output_files(folder) == ["0.png", "1.png"]
+    (engine,) = fake_engine
+    assert engine.config.headless
+
+
+@pytest.mark.parametrize(
+    "argv, message",
+    [
+        (["--quality", "0"], "Error:"),
+        ([], "No URLs found"),
+    ],
+)
+def test_bad_input_exits_with_2(monkeypatch, tmp_path, capsys, fake_engine, argv, message):
+    monkeypatch.setattr("sys.stdin", io.StringIO("no urls here\n"))
+    assert cli.main(["-o", str(tmp_path / "out"), "--no-check"] + argv) == 2
+    assert message in capsys.readouterr().err
+    assert fake_engine == []
+
+
+def test_missing_source_file(tmp_path, capsys, fake_engine):
+    code = cli.main([str(tmp_path / "missing.txt"), "-o", str(tmp_path / "out")])
+    assert code == 2
+    assert "Error:" in capsys.readouterr().err
@@ -0,0 +1,100 @@
+import csv
+
+import pytest
+from PIL import Image
+
+from auto_capture import compare
+from auto_capture.compare import (
+    ADDED,
+    CHANGED,
+    REMOVED,
+    REPORT_FILENAME,
+    UNCHANGED,
+    _changed_tiles_pillow,
+    compare_pair,
+    compare_runs,
+)
+
+
+def _page(width=64, height=64, box=None, color=(200, 0, 0)):
+    img = Image.new("RGB", (width, height), (255, 255, 255))
+    if box is not None:
+        img.paste(color, box)
+    return img
+
+
+def test_changed_tiles():
+    base = _page()
+    current = _page(box=(40, 8, 44, 12))  # 16 pixels inside the tile at (32, 0)
+    assert _changed_tiles_pillow(base, current, 32, 16) == (16, [(32, 0, 32, 32)])
+    assert _changed_tiles_pillow(base, base.copy(), 32, 16) == (0, [])
+
+
+def test_tolerance_ignores_noise():
+    current = _page(box=(0, 0, 64, 64), color=(250, 250, 250))
+    assert _changed_tiles_pillow(_page(), current, 32, 16) == (0, [])
+    assert _changed_tiles_pillow(_page(), current, 32, 4)[0] == 64 * 64
+
+
+def test_numpy_matches_pillow():
+    pytest.importorskip("numpy")
+    base = _page(100, 70)
+    current = _page(100, 70, box=(10, 50, 95, 66))
+    assert compare._changed_tiles_numpy(base, current, 32, 16) == _changed_tiles_pillow(
+        base, current, 32, 16
+    )
+
+
+def test_longer_page_counts_new_rows_as_changed(tmp_path):
+    _page(64, 64).save(tmp_path / "base.png")
+    _page(64, 96).save(tmp_path / "current.png")
+    diff_path = str(tmp_path / "diff" / "page_diff.png")
+    result = compare_pair(
+        ("page.png", str(tmp_path / "base.png"), str(tmp_path / "current.png"), diff_path, 32, 16)
+    )
+    assert result.status == CHANGED
+    assert result.changed_ratio == pytest.approx(1 / 3)
+    assert (result.changed_tiles, result.total_tiles) == (2, 6)
+    with Image.open(diff_path) as img:
+        assert img.size == (64, 96)
+
+
+def _run(folder, pages):
+    folder.mkdir()
+    for name, img in pages.items():
+        img.save(folder / name)
+    return str(folder)
+
+
+def test_compare_runs_ranks_pages(tmp_path):
+    baseline = _run(
+        tmp_path / "base", {"same.png": _page(), "edit.png": _page(), "gone.png": _page()}
+    )
+    current = _run(
+        tmp_path / "new",
+        {"same.png": _page(), "edit.png": _page(box=(0, 0, 8, 8)), "new.png": _page()},
+    )
+    out = tmp_path / "diff"
+    results = compare_runs(baseline, current, str(out), tile=32, max_workers=1)
+    assert [(r.path, r.status) for r in results] == [
+        ("edit.png", CHANGED),
+        ("new.png", ADDED),
+        ("gone.png", REMOVED),
+        ("same.png", UNCHANGED),
+    ]
+    assert (out / "edit_diff.png").exists()
+    with open(out / REPORT_FILENAME, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["path"] for row in rows] == [r.path for r in results]
+
+
+def test_main_exit_codes(tmp_path, capsys):
+    baseline = _run(tmp_path / "base", {"page.png": _page()})
+    same = _run(tmp_path / "same", {"page.png": _page()})
+    out = str(tmp_path / "diff")
+    assert compare.main([baseline, same, "-o", out, "--workers", "1"]) == 0
+    changed = _run(tmp_path / "changed", {"page.png": _page(box=(0, 0, 4, 4))})
+    assert compare.main([baseline, changed, "-o", out, "--workers", "1"]) == 1
+    assert compare.main([baseline, str(tmp_path / "missing"), "-o", out]) == 2
+    assert compare.main([baseline, same, "-o", out, "--tile", "4"]) == 2
+    capsys.readouterr()
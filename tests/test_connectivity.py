@@ -0,0 +1,97 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from auto_capture import connectivity
+from auto_capture.connectivity import (
+    check_origins,
+    clear_connectivity_cache,
+    origin_of,
+    partition_reachable,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_connectivity_cache()
+    yield
+    clear_connectivity_cache()
+
+
+@pytest.fixture
+def closed_origin():
+    """An origin nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+class _NoHeadHandler(BaseHTTPRequestHandler):
+    methods = []
+
+    def do_HEAD(self):
+        self.methods.append("HEAD")
+        self.send_response(405)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self.methods.append("GET")
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _item(url):
+    return {"url": url, "subdir": "", "filename": "page.png"}
+
+
+def test_origin_of():
+    assert origin_of("https://Example.com:8443/a/b?c") == "https://Example.com:8443"
+
+
+def test_partition_reachable(fixture_server, closed_origin):
+    up = _item(fixture_server.page_url(0, 1000))
+    down = [_item(f"{closed_origin}/a"), _item(f"{closed_origin}/b")]
+    reachable, unreachable, errors = partition_reachable([up] + down)
+    assert reachable == [up]
+    assert unreachable == down
+    assert list(errors) == [closed_origin]
+    assert "Connection refused" in errors[closed_origin]
+
+
+def test_get_when_head_is_rejected():
+    _NoHeadHandler.methods = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _NoHeadHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        origin = f"http://127.0.0.1:{server.server_address[1]}"
+        assert check_origins([origin + "/x"]) == {origin: (True, "")}
+        assert _NoHeadHandler.methods == ["HEAD", "GET"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_failures_cached_briefly(monkeypatch, closed_origin):
+    probes = []
+
+    def probe(origin, timeout=10):
+        probes.append(origin)
+        return False, "down"
+
+    monkeypatch.setattr(connectivity, "probe_origin", probe)
+    check_origins([closed_origin])
+    check_origins([closed_origin])
+    assert len(probes) == 1
+    monkeypatch.setattr(connectivity, "FAILURE_TTL", -1)
+    check_origins([closed_origin])
+    assert len(probes) == 2
@@ -0,0 +1,90 @@
+import os
+
+from auto_capture.crawl import Crawler
+
+from conftest import Concurrency, output_files, output_path
+
+
+class _Page:
+    def __init__(self, links):
+        self._links = links
+
+    def execute_script(self, script, *args):
+        return self._links
+
+
+def _seed(url):
+    return {"url": url, "subdir": "", "filename": "seed.png"}
+
+
+def test_discover_stays_in_scope():
+    crawler = Crawler("png", max_depth=2, scope="path")
+    seed = _seed("https://example.com/docs/intro")
+    crawler.add_seeds([seed])
+    page = _Page(
+        [
+            "https://example.com/docs/setup",
+            "https://example.com/docs/setup/",  # Same page
+            "https://example.com/blog/post",  # Outside the seed's folder
+            "https://other.test/docs/x",
+            "https://example.com/docs/manual.pdf",
+        ]
+    )
+    (found,) = crawler.discover(page, seed)
+    assert found["url"] == "https://example.com/docs/setup"
+    assert found["depth"] == 1
+    assert crawler.discover(page, dict(seed, depth=2)) == []  # At the depth limit
+
+
+def test_page_limit():
+    crawler = Crawler("png", max_pages=3, scope="host")
+    seed = _seed("https://example.com/")
+    crawler.add_seeds([seed])
+    page = _Page([f"https://example.com/{n}" for n in range(5)])
+    assert len(crawler.discover(page, seed)) == 2
+    assert crawler.limit_reached
+
+
+def test_single_seed_crawl_uses_all_browsers(run_capture, fixture_server):
+    children = [fixture_server.page_url(n, 1000) for n in range(1, 7)]
+    seed = fixture_server.page_url(0, 1000)
+    concurrency = Concurrency()
+    run = run_capture(
+        urls=[seed],
+        driver_options={
+            "links": lambda url: children if url == seed else [],
+            "load_time": 0.2,
+            "concurrency": concurrency,
+        },
+        crawl=True,
+        workers=3,
+        per_host=3,
+    )
+    assert len(run.drivers) == 3
+    assert concurrency.peak > 1
+    assert output_files(run.folder) == [f"{n}.png" for n in range(7)]
+
+
+def test_resume_follows_links_of_captured_pages(run_capture, fixture_server):
+    children = [fixture_server.page_url(n, 1000) for n in range(1, 4)]
+    seed = fixture_server.page_url(0, 1000)
+    links = {"links": lambda url: children if url == seed else []}
+    folder = run_capture(urls=[seed], driver_options=links, crawl=True).folder
+    os.remove(output_path(folder, "2.png"))
+
+    run = run_capture(urls=[seed], driver_options=links, crawl=True, resume=True)
+    assert run.engine.resumed_count == 3
+    assert [driver.current_url for driver in run.drivers] == [children[1]]
+    assert output_files(folder) == [f"{n}.png" for n in range(4)]
+
+
+def test_add_found_keeps_bounds():
+    crawler = Crawler("png", max_depth=1, scope="path")
+    crawler.add_seeds([_seed("https://example.com/docs/")])
+    found = [
+        dict(_seed("https://example.com/docs/a"), depth=1),
+        dict(_seed("https://example.com/docs/a/"), depth=1),  # Same page
+        dict(_seed("https://example.com/docs/a/b"), depth=2),  # Past the depth limit
+        dict(_seed("https://example.com/blog/"), depth=1),  # Another run's seed
+    ]
+    assert crawler.add_found(found) == found[:1]
@@ -0,0 +1,131 @@
+import types
+
+import pytest
+from selenium.common.exceptions import SessionNotCreatedException
+
+import auto_capture.engine
+from auto_capture import CaptureConfig, CaptureEngine, driver_cache
+
+MISMATCH = (
+    "session not created: This version of ChromeDriver only supports Chrome version 114\n"
+    "Current browser version is 120.0.6099.71"
+)
+
+
+@pytest.fixture
+def chrome(monkeypatch):
+    """Stands in for webdriver.Chrome; `failures` are raised by the next starts."""
+    state = types.SimpleNamespace(failures=[], started=0, invalidated=0)
+
+    def start(service, options):
+        if state.failures:
+            raise state.failures.pop(0)
+        state.started += 1
+        return object()
+
+    def invalidate():
+        state.invalidated += 1
+
+    monkeypatch.setattr(auto_capture.engine, "webdriver", types.SimpleNamespace(Chrome=start))
+    monkeypatch.setattr(auto_capture.engine, "Service", lambda path: path)
+    monkeypatch.setattr(driver_cache, "resolve_chromedriver", lambda log=None: "chromedriver")
+    monkeypatch.setattr(driver_cache, "invalidate", invalidate)
+    return state
+
+
+def start_chrome():
+    engine = CaptureEngine(CaptureConfig(), log=lambda message: None)
+    return engine._start_chrome(engine.new_chrome_options(use_profile=False))
+
+
+def test_version_mismatch_resolves_again(chrome):
+    chrome.failures.append(SessionNotCreatedException(MISMATCH))
+    start_chrome()
+    assert chrome.invalidated == 1
+    assert chrome.started == 1
+
+
+def test_other_session_errors_keep_the_cache(chrome):
+    chrome.failures.append(
+        SessionNotCreatedException("session not created: Chrome failed to start: crashed")
+    )
+    with pytest.raises(SessionNotCreatedException):
+        start_chrome()
+    assert chrome.invalidated == 0
+    assert chrome.started == 0
+
+
+@pytest.mark.parametrize(
+    "message, mismatch",
+    [
+        (MISMATCH, True),
+        ("session not created: Current browser version is 120.0 with binary path x", True),
+        ("session not created: user data directory is already in use", False),
+        ("session not created: DevToolsActivePort file doesn't exist", False),
+    ],
+)
+def test_is_version_mismatch(message, mismatch):
+    assert driver_cache.is_version_mismatch(SessionNotCreatedException(message)) is mismatch
+
+
+@pytest.fixture
+def resolver(monkeypatch, tmp_path):
+    """resolve_chromedriver against a cache file in tmp_path; `installs` counts downloads."""
+    state = types.SimpleNamespace(chrome_version="120.0.6099.71", installs=0, offline=False)
+    driver = tmp_path / "chromedriver"
+    driver.write_text("")
+
+    class Manager:
+        def install(self):
+            if state.offline:
+                raise OSError("offline")
+            state.installs += 1
+            return str(driver)
+
+    monkeypatch.setattr(driver_cache, "CACHE_FILE", str(tmp_path / "cache.json"))
+    monkeypatch.setattr(driver_cache, "_resolved_path", None)
+    monkeypatch.setattr(driver_cache, "ChromeDriverManager", Manager)
+    monkeypatch.setattr(driver_cache, "detect_chrome_version", lambda: state.chrome_version)
+    state.forget_process = lambda: monkeypatch.setattr(driver_cache, "_resolved_path", None)
+    return state
+
+
+def test_resolved_once_per_process(resolver):
+    first = driver_cache.resolve_chromedriver()
+    assert driver_cache.resolve_chromedriver() == first
+    assert resolver.installs == 1
+
+
+def test_cache_reused_by_later_runs_of_the_same_major(resolver):
+    driver_cache.resolve_chromedriver()
+    resolver.forget_process()
+    resolver.chrome_version = "120.0.6099.200"
+    driver_cache.resolve_chromedriver()
+    assert resolver.installs == 1
+
+
+def test_new_chrome_major_resolves_again(resolver):
+    driver_cache.resolve_chromedriver()
+    resolver.forget_process()
+    resolver.chrome_version = "121.0.6167.85"
+    logs = []
+    driver_cache.resolve_chromedriver(logs.append)
+    assert resolver.installs == 2
+    assert logs == [
+        "Chrome version changed (120.0.6099.71 -> 121.0.6167.85), updating ChromeDriver..."
+    ]
+
+
+def test_cached_driver_used_when_offline(resolver):
+    cached = driver_cache.resolve_chromedriver()
+    resolver.forget_process()
+    resolver.chrome_version = "121.0.6167.85"
+    resolver.offline = True
+    assert driver_cache.resolve_chromedriver() == cached
+
+
+def test_invalidate_forgets_the_cache(resolver):
+    driver_cache.resolve_chromedriver()
+    driver_cache.invalidate()
+    driver_cache.resolve_chromedriver()
+    assert resolver.installs == 2
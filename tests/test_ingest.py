@@ -0,0 +1,78 @@
+import os
+
+from auto_capture import CaptureConfig, CaptureEngine
+from auto_capture.ingest import (
+    UrlDeduplicator,
+    iter_batches,
+    iter_source_lines,
+    iter_unique_urls,
+    iter_work_items,
+    peek,
+)
+from auto_capture.urls import extract_urls
+
+
+def test_dedup_after_normalization():
+    dedup = UrlDeduplicator()
+    assert dedup.add("https://Example.com/a/")
+    assert not dedup.add("https://example.com/a")
+    assert dedup.add("https://example.com/b")
+    assert len(dedup) == 2
+    assert dedup.duplicates == 1
+
+
+def test_iter_unique_urls_matches_extract_urls():
+    lines = [
+        "see https://example.com/a, and https://example.com/b.\n",
+        "again (https://EXAMPLE.com/a/) and ftp://example.com/c\n",
+        "https://example.com/c https://example.com/b\n",
+    ]
+    urls = list(iter_unique_urls(lines))
+    assert urls == ["https://example.com/a", "https://example.com/b", "https://example.com/c"]
+    assert urls == extract_urls("".join(lines))
+
+
+def test_shared_dedup_across_sources(tmp_path):
+    first = tmp_path / "first.txt"
+    second = tmp_path / "second.txt"
+    first.write_text("https://example.com/a\nhttps://example.com/b\n")
+    second.write_text("https://example.com/b\nhttps://example.com/c\n")
+    dedup = UrlDeduplicator()
+    urls = list(iter_unique_urls(iter_source_lines([str(first), str(second)]), dedup))
+    assert urls == ["https://example.com/a", "https://example.com/b", "https://example.com/c"]
+    assert dedup.duplicates == 1
+
+
+def test_work_items_and_batches():
+    urls = (f"https://example.com/page/{n}" for n in range(5))
+    items = iter_work_items(urls, "png")
+    head, items = peek(items, 2)
+    assert [item["filename"] for item in head] == ["0.png", "1.png"]
+    batches = list(iter_batches(items, 2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[0] == head
+    assert batches[2][0] == {
+        "url": "https://example.com/page/4",
+        "subdir": os.path.join("example_com", "page"),
+        "filename": "4.png",
+    }
+
+
+def test_unfed_stream_failed_one_at_a_time():
+    engine = CaptureEngine(CaptureConfig(), log=lambda message: None)
+    engine.is_running = True
+    admitted = [{"url": "https://example.com/0"}]
+    read_ahead = []
+
+    def source():
+        for n in range(1, 4):
+            # Everything read before this item is already recorded
+            read_ahead.append(len(engine.failed_items) - n)
+            yield {"url": f"https://example.com/{n}"}
+
+    engine._fail_unfed(admitted, source())
+    assert read_ahead == [0, 0, 0]
+    assert [item["url"] for item in engine.failed_items] == [
+        f"https://example.com/{n}" for n in range(4)
+    ]
+    assert engine.total_items == 3
@@ -0,0 +1,93 @@
+import os
+
+from auto_capture.journal import DONE, FAILED, PENDING, JobJournal
+
+from conftest import output_files, output_path
+
+
+def _item(n):
+    return {"url": f"https://example.com/page/{n}", "subdir": "example.com", "filename": f"{n}.png"}
+
+
+def _journal(tmp_path):
+    return JobJournal(str(tmp_path / "journal.sqlite3"))
+
+
+def test_register_without_resume_starts_over(tmp_path):
+    journal = _journal(tmp_path)
+    items = [_item(1), _item(2)]
+    journal.register(items)
+    journal.mark_done(items[0]["url"], str(tmp_path / "1.png"))
+    assert journal.register(items) == items
+    assert journal.counts() == {PENDING: 2}
+
+
+def test_resume_skips_done_urls_with_outputs(tmp_path):
+    journal = _journal(tmp_path)
+    items = [_item(1), _item(2)]
+    journal.register(items)
+    output = tmp_path / "1.png"
+    output.write_bytes(b"png")
+    journal.set_output(items[0]["url"], str(output))
+    journal.mark_done(items[0]["url"], str(output))
+    journal.mark_failed(items[1]["url"], "timeout")
+
+    assert journal.register(items, resume=True) == [items[1]]
+    assert output.exists()
+    assert journal.counts() == {DONE: 1, PENDING: 1}
+
+
+def test_resume_deletes_partial_outputs(tmp_path):
+    journal = _journal(tmp_path)
+    item = _item(1)
+    journal.register([item])
+    journal.mark_in_flight(item["url"])
+    partial = tmp_path / "1.png"
+    partial.write_bytes(b"half")
+    journal.set_output(item["url"], str(partial))
+
+    assert journal.register([item], resume=True) == [item]
+    assert not partial.exists()
+
+
+def test_resume_recaptures_done_url_with_missing_output(tmp_path):
+    journal = _journal(tmp_path)
+    item = _item(1)
+    journal.register([item])
+    parts = [tmp_path / "1_part1.jpg", tmp_path / "1_part2.jpg"]
+    for part in parts:
+        part.write_bytes(b"jpg")
+    journal.mark_done(item["url"], "\n".join(str(part) for part in parts))
+    parts[1].unlink()
+
+    assert journal.register([item], resume=True) == [item]
+    assert not parts[0].exists()  # Left over from the incomplete set
+
+
+def test_failed_capture_stays_failed(tmp_path):
+    journal = _journal(tmp_path)
+    item = _item(1)
+    journal.register([item])
+    journal.mark_failed(item["url"], "login page")
+    journal.mark_done(item["url"], str(tmp_path / "1.png"))
+    assert journal.counts() == {FAILED: 1}
+
+
+def test_resume_tiled_jpg_parts(run_capture):
+    """A page split into JPG parts is recognised as captured on --resume."""
+    folder = run_capture([40000], fmt="jpg").folder
+    first = output_files(folder)
+    assert first == ["0_part1.jpg", "0_part2.jpg", "0_part3.jpg"]
+
+    engine = run_capture([40000], fmt="jpg", resume=True).engine
+    assert engine.resumed_count == 1
+    assert output_files(folder) == first
+
+
+def test_resume_recaptures_deleted_capture(run_capture):
+    folder = run_capture([2000, 3000]).folder
+    os.remove(output_path(folder, "1.png"))
+
+    engine = run_capture([2000, 3000], resume=True).engine
+    assert engine.resumed_count == 1
+    assert output_files(folder) == ["0.png", "1.png"]
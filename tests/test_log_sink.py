@@ -0,0 +1,62 @@
+import os
+import threading
+
+from auto_capture import config
+from auto_capture.config import KEEP_SESSION_FILES, default_log_path, prune_old_files
+from auto_capture.log_sink import BufferedLogSink
+
+
+def test_prune_old_files_keeps_the_newest(tmp_path):
+    for stamp in ("20240101_000000", "20240301_000000", "20240201_000000"):
+        (tmp_path / f"auto_capture_{stamp}.log").write_text("")
+    (tmp_path / "notes.txt").write_text("")
+    prune_old_files(str(tmp_path), "auto_capture_", keep=1)
+    assert sorted(os.listdir(tmp_path)) == ["auto_capture_20240301_000000.log", "notes.txt"]
+
+
+def test_session_logs_are_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_DIR", str(tmp_path))
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    for n in range(KEEP_SESSION_FILES + 5):
+        (logs / f"auto_capture_20240101_{n:06d}.log").write_text("")
+    path = default_log_path()
+    open(path, "w").close()
+    names = sorted(os.listdir(logs))
+    assert len(names) == KEEP_SESSION_FILES
+    assert names[-1] == os.path.basename(path)
+    assert names[0] == "auto_capture_20240101_000006.log"
+
+
+def test_take_returns_lines_once(tmp_path):
+    sink = BufferedLogSink(str(tmp_path / "logs" / "session.log"))
+    sink.write("first")
+    sink.write("second")
+    lines = sink.take()
+    assert [line.split(" ", 1)[1] for line in lines] == ["first\n", "second\n"]
+    assert sink.take() == []
+    sink.close()
+    assert (tmp_path / "logs" / "session.log").read_text() == "".join(lines)
+
+
+def test_writes_from_many_threads(tmp_path):
+    sink = BufferedLogSink()
+    threads = [
+        threading.Thread(target=lambda n=n: [sink.write(f"{n}") for _ in range(100)])
+        for n in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(sink.take()) == 400
+
+
+def test_unwritable_log_file_falls_back_to_screen(tmp_path):
+    blocker = tmp_path / "not_a_folder"
+    blocker.write_text("")
+    sink = BufferedLogSink(str(blocker / "session.log"))
+    assert sink.path is None
+    sink.write("still shown")
+    assert len(sink.take()) == 1
+    sink.close()
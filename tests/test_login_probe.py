@@ -0,0 +1,42 @@
+from auto_capture.engine import LOGIN_PROBE_JS
+
+from conftest import ScriptedDriver, output_files
+
+
+class ProbeRecordingDriver(ScriptedDriver):
+    """Records the login probe's arguments; reading page_source fails the test."""
+
+    def __init__(self, options=None, **kwargs):
+        super().__init__(options, **kwargs)
+        self.probes = []
+
+    @property
+    def page_source(self):
+        raise AssertionError("page_source pulled for the login check")
+
+    def execute_script(self, script, *args):
+        if script == LOGIN_PROBE_JS:
+            self.probes.append(args)
+        return super().execute_script(script, *args)
+
+
+def test_one_probe_per_page(run_capture, fixture_server):
+    urls = [fixture_server.page_url(n, 1000) for n in range(2)]
+    run = run_capture(urls=urls, driver=ProbeRecordingDriver)
+    (driver,) = run.drivers
+    assert driver.probes == [(url,) for url in urls]  # Judged against the requested URL
+    assert output_files(run.folder) == ["0.png", "1.png"]
+
+
+def test_login_page_skipped(run_capture):
+    run = run_capture(
+        [1000],
+        driver=ProbeRecordingDriver,
+        driver_options={"login_reason": "password form"},
+        skip_login=True,
+    )
+    (driver,) = run.drivers
+    (url,) = [args[0] for args in driver.probes]
+    assert f"SKIPPED (login required): {url}" in run.logs
+    assert not any("LOGIN PAGE DETECTED" in line for line in run.logs)
+    assert output_files(run.folder) == []
@@ -0,0 +1,83 @@
+import threading
+
+from PIL import Image
+
+from auto_capture.memory import (
+    MB,
+    MIN_SCALE,
+    MIN_TILE_HEIGHT,
+    MemoryBudget,
+    estimate_capture_bytes,
+    scale_to_fit,
+    tile_height_for,
+)
+
+from conftest import output_files, output_path
+
+
+def test_estimates():
+    assert estimate_capture_bytes(1000, 2000, "png") == 1000 * 2000 * 4
+    assert estimate_capture_bytes(1000, 2000, "pdf") == 1000 * 2000 * 11
+
+
+def test_tile_height_for_budget():
+    assert tile_height_for(64 * MB, 1400, 1, 2000) == 2000
+    assert tile_height_for(8 * MB, 1400, 2, 2000) == 8 * MB // (1400 * 11 * 2)
+    assert tile_height_for(1 * MB, 5000, 3, 2000) == MIN_TILE_HEIGHT
+
+
+def test_scale_to_fit():
+    assert scale_to_fit(100, 200) == 1.0
+    assert scale_to_fit(400, 100) == 0.5  # Bitmap size goes with scale squared
+    assert scale_to_fit(10_000, 1) == MIN_SCALE
+
+
+def test_reserve_waits_for_room():
+    budget = MemoryBudget(100)
+    budget.reserve(60, "https://a.test/")
+    granted = threading.Event()
+
+    def reserve_second():
+        budget.reserve(60, "https://b.test/")
+        granted.set()
+
+    threading.Thread(target=reserve_second, daemon=True).start()
+    assert not granted.wait(0.2)
+    budget.release(60)
+    assert granted.wait(5)
+    assert budget.peak == 60
+
+
+def test_oversized_reservation_granted_alone():
+    budget = MemoryBudget(100)
+    assert not budget.fits(150)
+    with budget.reserved(150, "https://big.test/"):
+        assert budget.in_use == 150
+    assert budget.in_use == 0
+    assert budget.largest == (150, "https://big.test/")
+
+
+def test_unlimited_budget():
+    budget = MemoryBudget(0)
+    assert budget.fits(10**12)
+    budget.reserve(10**12)
+    budget.reserve(10**12)
+    assert budget.in_use == 2 * 10**12
+
+
+def test_over_budget_png_captured_in_segments(run_capture):
+    run = run_capture([12000], memory_budget_mb=64)
+    (driver,) = run.drivers
+    assert len(driver.clips) == 6
+    assert {clip["height"] for clip in driver.clips} == {2000}
+    assert output_files(run.folder) == ["0.png"]
+    with Image.open(output_path(run.folder, "0.png")) as img:
+        assert img.size == (1400, 12000)
+
+
+def test_over_budget_jpg_captured_scaled_down(run_capture):
+    run = run_capture([12000], fmt="jpg", memory_budget_mb=64)
+    (driver,) = run.drivers
+    assert len(driver.clips) == 1
+    assert any("capturing at 99% scale" in line for line in run.logs)
+    assert run.engine.memory.in_use == 0
@@ -0,0 +1,59 @@
+import io
+import re
+
+from PIL import Image
+
+from auto_capture.pdf_bundle import MAX_PAGE_POINTS, PdfBundleWriter, _pdf_text
+
+
+def _png(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 220, 240)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _check_xref(data: bytes):
+    """Every in-use cross-reference entry points at its object."""
+    xref_offset = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+    lines = data[xref_offset:].split(b"\n")
+    assert lines[0] == b"xref"
+    count = int(lines[1].split()[1])
+    for obj_id, entry in enumerate(lines[2 : 2 + count]):
+        offset, _, kind = entry.split()
+        if kind == b"n":
+            assert data[int(offset) :].startswith(b"%d 0 obj" % obj_id)
+
+
+def test_bundle_pages_and_bookmarks(tmp_path):
+    path = tmp_path / "bundle.pdf"
+    writer = PdfBundleWriter(str(path), resolution=100)
+    writer.add_capture("https://example.com/a", _png(400, 300))
+    writer.add_document("https://example.com/ü", [Image.new("RGB", (400, 300))] * 2)
+    writer.add_document("empty", [])
+    writer.close()
+
+    data = path.read_bytes()
+    assert data.startswith(b"%PDF-1.4")
+    _check_xref(data)
+    assert b"/Type /Pages /Kids" in data and b"/Count 3 >>" in data
+    assert data.count(b"/Parent 3 0 R /Dest") == 2  # Empty documents get no bookmark
+    assert _pdf_text("https://example.com/ü") in data
+
+
+def test_tall_capture_split_into_pages(tmp_path):
+    path = tmp_path / "bundle.pdf"
+    writer = PdfBundleWriter(str(path), resolution=72)  # 1 pixel = 1pt
+    writer.add_capture("tall", _png(100, MAX_PAGE_POINTS * 2 + 100))
+    writer.close()
+
+    data = path.read_bytes()
+    _check_xref(data)
+    assert data.count(b"/Type /Page ") == 3
+    assert data.count(b"/Subtype /Image") == 1  # Pages share the one image
+
+
+def test_abort_removes_file(tmp_path):
+    path = tmp_path / "bundle.pdf"
+    writer = PdfBundleWriter(str(path))
+    writer.abort()
+    assert not path.exists()
@@ -0,0 +1,76 @@
+import io
+import threading
+
+import pytest
+from PIL import Image
+
+from auto_capture.pipeline import SavePipeline, encode_and_write, flatten_rgba
+
+
+def _png(mode="RGB", color=(255, 0, 0)):
+    buffer = io.BytesIO()
+    Image.new(mode, (8, 4), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_passthrough_written_as_is(tmp_path):
+    path = str(tmp_path / "a.png")
+    data = _png()
+    assert encode_and_write(data, path, "png")[0] == path
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+
+def test_flatten_rgba_on_white():
+    img = flatten_rgba(Image.new("RGBA", (2, 2), (0, 0, 0, 0)))
+    assert img.mode == "RGB"
+    assert img.getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_pdf_encoded_in_worker_process(tmp_path):
+    path = str(tmp_path / "a.pdf")
+    pipeline = SavePipeline(max_processes=1)
+    results = []
+    pipeline.submit(_png("RGBA", (0, 0, 255, 128)), path, "pdf", on_done=results.append)
+    pipeline.shutdown()
+    written, timings = results[0].result()
+    assert written == path
+    assert set(timings) == {"encode", "write"}
+    with open(path, "rb") as f:
+        assert f.read(5) == b"%PDF-"
+
+
+def test_failed_write_reported_to_on_done(tmp_path):
+    pipeline = SavePipeline()
+    results = []
+    pipeline.submit(_png(), str(tmp_path / "missing" / "a.png"), "png", on_done=results.append)
+    pipeline.shutdown()
+    with pytest.raises(OSError):
+        results[0].result()
+
+
+def test_ordered_appends_run_in_submission_order():
+    pipeline = SavePipeline(max_pending=8)
+    order = []
+    for n in range(5):
+        pipeline.submit_ordered(order.append, n)
+    pipeline.drain()
+    assert order == list(range(5))
+    pipeline.shutdown()
+
+
+def test_submit_blocks_while_full():
+    pipeline = SavePipeline(max_pending=1)
+    release = threading.Event()
+    pipeline.submit_ordered(release.wait)
+    second_queued = threading.Event()
+
+    def submit_second():
+        pipeline.submit_ordered(lambda: None)
+        second_queued.set()
+
+    threading.Thread(target=submit_second, daemon=True).start()
+    assert not second_queued.wait(0.2)
+    release.set()
+    assert second_queued.wait(5)
+    pipeline.shutdown()
@@ -0,0 +1,94 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from auto_capture.prewarm import RoutePrewarmer, route_of
+
+
+class _DevServer(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the prewarmer expects
+    paths = []
+    release = None  # threading.Event the server waits on before answering, if set
+
+    def do_GET(self):
+        self.paths.append(self.path)
+        if self.release is not None:
+            self.release.wait(5)
+        status = 500 if self.path == "/broken" else 200
+        body = b"compiled"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def dev_server():
+    _DevServer.paths = []
+    _DevServer.release = None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DevServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    if _DevServer.release is not None:
+        _DevServer.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def _items(*urls):
+    return [{"url": url} for url in urls]
+
+
+class _Warmed:
+    """on_warmed callback that can wait for `count` routes."""
+
+    def __init__(self):
+        self.routes = []
+        self._cond = threading.Condition()
+
+    def __call__(self, route, seconds, ok):
+        with self._cond:
+            self.routes.append((route, ok))
+            self._cond.notify_all()
+
+    def wait(self, count):
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self.routes) >= count, timeout=5)
+
+
+def test_route_of():
+    assert route_of("http://localhost:3000/docs?page=2#top") == "http://localhost:3000/docs"
+    assert route_of("http://localhost:3000") == "http://localhost:3000/"
+
+
+def test_each_route_requested_once(dev_server):
+    warmed = _Warmed()
+    prewarmer = RoutePrewarmer(concurrency=2, on_warmed=warmed)
+    urls = [f"{dev_server}/{path}" for path in ("a?x=1", "a?x=2", "b", "broken")]
+    queued = prewarmer.submit(_items(*urls))
+    assert queued == 3
+    assert prewarmer.submit(_items(f"{dev_server}/b")) == 0
+    assert warmed.wait(3)
+    prewarmer.close()
+    assert sorted(_DevServer.paths) == ["/a", "/b", "/broken"]
+    assert sorted(warmed.routes) == [
+        (f"{dev_server}/a", True),
+        (f"{dev_server}/b", True),
+        (f"{dev_server}/broken", False),
+    ]
+    assert (prewarmer.warmed, prewarmer.failed) == (2, 1)
+
+
+def test_close_drops_routes_not_requested(dev_server):
+    _DevServer.release = threading.Event()
+    prewarmer = RoutePrewarmer(concurrency=1)
+    prewarmer.submit(_items(*(f"{dev_server}/{n}" for n in range(5))))
+    prewarmer.close()
+    _DevServer.release.set()
+    assert len(_DevServer.paths) <= 1
+    assert prewarmer.submit(_items(f"{dev_server}/late")) == 0
+    assert (prewarmer.warmed, prewarmer.failed) == (0, 0)
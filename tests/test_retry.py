@@ -0,0 +1,50 @@
+import sqlite3
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from auto_capture.journal import JOURNAL_FILENAME
+from auto_capture.retry import CONNECTION, ERROR, LOGIN, TIMEOUT, RetryScheduler, classify
+
+from conftest import output_files
+
+
+def test_classify():
+    assert classify(TimeoutException()) == TIMEOUT
+    assert classify(WebDriverException("unknown error: net::ERR_CONNECTION_REFUSED")) == CONNECTION
+    assert classify(WebDriverException("net::ERR_TIMED_OUT")) == TIMEOUT
+    assert classify(ValueError("boom")) == ERROR
+
+
+def test_budget_per_url_and_class():
+    scheduler = RetryScheduler(budgets={TIMEOUT: 2}, base_delay=1.0)
+    url = "https://example.com/a"
+    assert scheduler.schedule(url, TIMEOUT) is not None
+    assert scheduler.schedule(url.upper(), TIMEOUT) is not None  # Same URL once normalized
+    assert scheduler.schedule(url, TIMEOUT) is None
+    assert scheduler.retries(url, TIMEOUT) == 2
+    assert scheduler.schedule(url, CONNECTION) is not None  # Budgets are per class
+
+
+def test_backoff_grows_with_jitter():
+    scheduler = RetryScheduler(budgets={ERROR: 5}, base_delay=2.0, max_delay=10.0)
+    delays = [scheduler.schedule("https://example.com/", ERROR) for _ in range(5)]
+    for retry, delay in enumerate(delays):
+        backoff = min(10.0, 2.0 * 2**retry)
+        assert backoff / 2 <= delay <= backoff
+
+
+def test_login_is_not_retried():
+    assert RetryScheduler().schedule("https://example.com/", LOGIN) is None
+
+
+def test_login_page_recorded_as_failed(run_capture):
+    engine, folder, _, _ = run_capture(
+        [2000], driver_options={"login_reason": "login URL"}, skip_login=True
+    )
+    assert len(engine.failed_items) == 1
+    assert engine.retry.retries(engine.failed_items[0]["url"], LOGIN) == 0
+    assert output_files(folder) == []
+    with sqlite3.connect(f"{folder}/{JOURNAL_FILENAME}") as db:
+        assert db.execute("SELECT state, reason FROM jobs").fetchall() == [
+            ("failed", "login required")
+        ]
@@ -0,0 +1,59 @@
+import time
+
+from auto_capture.settle import EAGER_LAZY_JS, SETTLE_PROBE_JS, PageSettler
+
+
+class QuietPage:
+    """A settled page with no performance log."""
+
+    def __init__(self):
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        assert script.endswith(SETTLE_PROBE_JS)
+        self.scripts.append(script)
+        return ["complete", 0, False, 1000]
+
+    def get_log(self, kind):
+        raise RuntimeError("performance log not enabled")
+
+
+def test_wait_returns_once_quiet():
+    assert PageSettler(timeout=2, quiet_period=0.05, poll_interval=0.01).wait(QuietPage())
+
+
+def test_lazy_content_left_alone_by_default():
+    page = QuietPage()
+    PageSettler(timeout=2, quiet_period=0, poll_interval=0.01).wait(page)
+    assert EAGER_LAZY_JS not in page.scripts[0]
+
+    page = QuietPage()
+    PageSettler(timeout=2, quiet_period=0, poll_interval=0.01, load_lazy=True).wait(page)
+    assert page.scripts[0].startswith(EAGER_LAZY_JS)
+
+
+def test_wait_quiet_period_override():
+    settler = PageSettler(timeout=5, quiet_period=1.0, poll_interval=0.01)
+    start = time.monotonic()
+    assert settler.wait(QuietPage(), quiet_period=0.05)
+    assert time.monotonic() - start < 0.5
+
+
+def test_wait_gives_up_at_timeout():
+    class GrowingPage(QuietPage):
+        height = 0
+
+        def execute_script(self, script, *args):
+            self.height += 100
+            return ["complete", 0, False, self.height]
+
+    assert not PageSettler(timeout=0.1, poll_interval=0.01).wait(GrowingPage())
+
+
+def test_forget_drops_driver_state():
+    settler = PageSettler()
+    driver = QuietPage()
+    settler.begin(driver)
+    assert id(driver) in settler._inflight
+    settler.forget(driver)
+    assert settler._inflight == {}
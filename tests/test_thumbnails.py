@@ -0,0 +1,85 @@
+import io
+import os
+import struct
+
+from PIL import Image
+
+from auto_capture.thumbnails import (
+    MANIFEST_FILENAME,
+    _decode_top_rows,
+    build_thumbnails,
+    make_thumbnail,
+)
+
+
+def _noise_png(width, height):
+    img = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG")
+    return img, buffer.getvalue()
+
+
+def _corrupt_idat_after(data: bytes, start: int) -> bytes:
+    """Overwrite the payload of every IDAT chunk that begins after byte `start`."""
+    data = bytearray(data)
+    pos = 8
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos : pos + 4])
+        if data[pos + 4 : pos + 8] == b"IDAT" and pos > start:
+            data[pos + 8 : pos + 8 + length] = b"\xff" * length
+        pos += 12 + length
+    return bytes(data)
+
+
+def test_decode_top_rows_only():
+    source, data = _noise_png(200, 20000)
+    with Image.open(io.BytesIO(data)) as img:
+        _decode_top_rows(img, 480)
+        img.load()
+        assert img.size == (200, 480)
+        assert img.tobytes() == source.crop((0, 0, 200, 480)).tobytes()
+
+
+def test_tall_png_bottom_never_decoded(tmp_path):
+    _, data = _noise_png(200, 20000)
+    capture = tmp_path / "tall.png"
+    # Broken image data below the top tenth: decoding the whole page would fail
+    capture.write_bytes(_corrupt_idat_after(data, len(data) // 10))
+    with Image.open(capture) as img:
+        try:
+            img.load()
+            fully_decodable = True
+        except Exception:
+            fully_decodable = False
+    assert not fully_decodable
+
+    target = tmp_path / "thumb.jpg"
+    assert make_thumbnail(("tall.png", str(capture), str(target), 100, 240)) == ("tall.png", "")
+    with Image.open(target) as thumb:
+        assert thumb.size == (100, 240)
+
+
+def test_jpeg_thumbnail(tmp_path):
+    capture = tmp_path / "page.jpg"
+    Image.new("RGB", (1400, 3000), (30, 60, 90)).save(capture, "JPEG")
+    target = tmp_path / "thumb.jpg"
+    assert make_thumbnail(("page.jpg", str(capture), str(target), 320, 480))[1] == ""
+    with Image.open(target) as thumb:
+        assert thumb.size == (320, 480)
+
+
+def test_build_reuses_unchanged_thumbnails(tmp_path):
+    captures = tmp_path / "captures"
+    (captures / "site").mkdir(parents=True)
+    for n in range(3):
+        Image.new("RGB", (400, 800 + n)).save(captures / "site" / f"{n}.png")
+    output = tmp_path / "thumbs"
+
+    first = build_thumbnails(str(captures), str(output), columns=2, rows=1, max_workers=1)
+    assert (first.made, first.reused, first.failed, first.sheets) == (3, 0, 0, 2)
+    assert (output / MANIFEST_FILENAME).exists()
+
+    os.remove(captures / "site" / "2.png")
+    second = build_thumbnails(str(captures), str(output), columns=2, rows=1, max_workers=1)
+    assert (second.made, second.reused, second.sheets) == (0, 2, 1)
+    assert not (output / "contact_sheet_002.jpg").exists()
@@ -0,0 +1,60 @@
+from PIL import Image
+
+from auto_capture.engine import WEBP_MAX_HEIGHT
+from auto_capture.tiling import JpegPartWriter, fit_tile, iter_tile_rects
+
+from conftest import output_files, output_path
+
+
+def test_iter_tile_rects_covers_page():
+    assert list(iter_tile_rects(4500, 2000)) == [(0, 2000), (2000, 2000), (4000, 500)]
+
+
+def test_fit_tile_pads_and_crops():
+    tile = Image.new("RGB", (100, 50), (0, 0, 0))
+    assert fit_tile(tile, 80, 60).size == (80, 60)
+    assert fit_tile(tile, 80, 60).getpixel((0, 55)) == (255, 255, 255)
+
+
+def test_jpeg_parts_stay_below_limit(tmp_path):
+    writer = JpegPartWriter(lambda n: str(tmp_path / f"p{n}.jpg"), 10, 250)
+    for _ in range(5):
+        writer.add(Image.new("RGB", (10, 100)))
+    writer.close()
+    heights = [Image.open(path).height for path in writer.paths]
+    assert heights == [200, 200, 100]
+
+
+def test_tall_page_is_tiled(run_capture):
+    folder = run_capture([40000], width=400).folder
+    assert output_files(folder) == ["0.png"]
+    with Image.open(output_path(folder, "0.png")) as img:
+        assert img.size == (400, 40000)
+
+
+def test_webp_parts_within_webp_limit_at_high_dpr(run_capture):
+    # 9000 CSS px at 2x is 18000 device px: more than WebP can hold in one image
+    folder = run_capture(
+        [9000], driver_options={"pixel_ratio": 2}, fmt="webp", width=400, tile_height=12000
+    ).folder
+    parts = output_files(folder)
+    assert parts == ["0_part1.webp", "0_part2.webp"]
+    heights = [Image.open(output_path(folder, name)).height for name in parts]
+    assert sum(heights) == 18000
+    assert max(heights) <= WEBP_MAX_HEIGHT
+
+
+def test_tile_height_follows_device_scale(run_capture):
+    run = run_capture(
+        [20000], driver_options={"pixel_ratio": 2}, width=400, tile_height=12000
+    )
+    clips = [clip for clip in run.drivers[0].clips if clip]
+    assert max(clip["height"] for clip in clips) * 2 <= 16000
+
+
+def test_untiled_webp_scaled_to_limit(run_capture):
+    run = run_capture(
+        [9000], driver_options={"pixel_ratio": 2}, fmt="webp", width=400, tile_long_pages=False
+    )
+    (clip,) = run.drivers[0].clips
+    assert clip["height"] * clip["scale"] * 2 <= WEBP_MAX_HEIGHT
@@ -0,0 +1,46 @@
+import json
+
+from auto_capture.timing import TimingRecorder, percentile
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([7], 99) == 7
+
+
+def test_record_written_on_complete(tmp_path):
+    path = tmp_path / "timings.jsonl"
+    recorder = TimingRecorder(str(path))
+    recorder.add("https://a.test/", "get", 0.5)
+    recorder.add("https://a.test/", "get", 0.25)  # A retry adds to the same stage
+    recorder.add("https://a.test/", "write", 0.1)
+    recorder.note_peak("https://a.test/", "memory_mb", 40)
+    recorder.note_peak("https://a.test/", "memory_mb", 12)
+    recorder.complete("https://a.test/", ok=True)
+    recorder.close()
+
+    (record,) = [json.loads(line) for line in path.read_text().splitlines()]
+    assert record["url"] == "https://a.test/"
+    assert record["ok"] is True
+    assert record["stages"] == {"get": 0.75, "write": 0.1}
+    assert record["total"] == 0.85
+    assert record["memory_mb"] == 40
+
+
+def test_stats_in_pipeline_order():
+    recorder = TimingRecorder()
+    recorder.event("custom", 1.0)
+    for n in range(4):
+        url = f"https://a.test/{n}"
+        recorder.add(url, "write", 0.01 * (n + 1))
+        recorder.add(url, "get", 0.1 * (n + 1))
+        recorder.complete(url, ok=True)
+    stats = recorder.stats()
+    assert list(stats) == ["get", "write", "custom"]
+    assert stats["get"]["n"] == 4
+    assert stats["get"]["p50"] == 0.2
+    assert stats["write"]["p99"] == 0.04
+    assert len(recorder.summary()) == 4
@@ -0,0 +1,88 @@
+import functools
+import sqlite3
+
+import pytest
+from PIL import Image
+from selenium.common.exceptions import WebDriverException
+
+import auto_capture.engine
+from auto_capture.journal import JOURNAL_FILENAME
+from auto_capture.retry import RetryScheduler
+from auto_capture.viewports import OutputGroup, ViewportProfile, parse_viewports
+
+from conftest import ScriptedDriver, output_files, output_path
+
+
+def test_parse_viewports():
+    profiles = parse_viewports(["1400, 390@3:mobile", "1400"])
+    assert profiles == [ViewportProfile(1400, 1.0, False), ViewportProfile(390, 3.0, True)]
+    assert [profile.label for profile in profiles] == ["1400w", "390w_3x_mobile"]
+
+
+@pytest.mark.parametrize("spec", ["wide", "50", "800@9"])
+def test_parse_viewports_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_viewports([spec])
+
+
+def test_output_group_finishes_with_last_output():
+    group = OutputGroup({"url": "https://example.com/"}, 2)
+    assert group.finish("a.png", True) == (False, True, ["a.png"])
+    assert group.finish("b.png", True) == (True, True, ["a.png", "b.png"])
+
+
+def test_one_file_per_viewport(run_capture):
+    folder = run_capture([3000], viewports=["800", "400"]).folder
+    assert output_files(folder) == ["0_400w.png", "0_800w.png"]
+    with Image.open(output_path(folder, "0_400w.png")) as img:
+        assert img.width == 400
+
+
+def test_tall_page_tiled_per_viewport(run_capture):
+    folder = run_capture([20000], viewports=["800", "400:mobile"]).folder
+    assert output_files(folder) == ["0_400w_mobile.png", "0_800w.png"]
+    for name, width in (("0_800w.png", 800), ("0_400w_mobile.png", 400)):
+        with Image.open(output_path(folder, name)) as img:
+            assert img.size == (width, 20000)
+    with sqlite3.connect(f"{folder}/{JOURNAL_FILENAME}") as db:
+        ((state, output),) = db.execute("SELECT state, output FROM jobs").fetchall()
+    assert state == "done"
+    assert sorted(output.splitlines()) == [
+        output_path(folder, "0_400w_mobile.png"),
+        output_path(folder, "0_800w.png"),
+    ]
+
+
+class FailingProfileDriver(ScriptedDriver):
+    """Its first screenshot at `fail_width` fails."""
+
+    fail_width = 400
+    failed = False
+
+    def execute_cdp_cmd(self, cmd, params):
+        if (
+            cmd == "Page.captureScreenshot"
+            and self.window_width == self.fail_width
+            and not FailingProfileDriver.failed
+        ):
+            FailingProfileDriver.failed = True
+            raise WebDriverException("screenshot failed")
+        return super().execute_cdp_cmd(cmd, params)
+
+
+def test_failed_profile_leaves_no_partial_outputs(run_capture, monkeypatch):
+    monkeypatch.setattr(FailingProfileDriver, "failed", False)
+    monkeypatch.setattr(
+        auto_capture.engine, "RetryScheduler", functools.partial(RetryScheduler, base_delay=0.01)
+    )
+    run = run_capture([3000], driver=FailingProfileDriver, viewports=["800", "400"])
+    assert FailingProfileDriver.failed
+    assert output_files(run.folder) == ["0_400w.png", "0_800w.png"]
+    assert run.engine.failed_items == []
+
+
+def test_abandoned_group_stops_collecting():
+    group = OutputGroup({"url": "https://example.com/"}, 2)
+    group.finish("a.png", True)
+    assert group.abandon() == ["a.png"]
+    assert group.finish("b.png", True) is None
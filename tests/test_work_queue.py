@@ -0,0 +1,72 @@
+import threading
+import time
+
+from auto_capture.work_queue import CaptureQueue
+
+
+def _items(*urls):
+    return [{"url": url} for url in urls]
+
+
+def test_submission_order():
+    items = _items("https://a.test/1", "https://b.test/1", "https://a.test/2")
+    queue = CaptureQueue(items)
+    assert [queue.get() for _ in items] == items
+
+
+def test_per_host_cap_passes_over_busy_host():
+    a1, a2, b1 = _items("https://a.test/1", "https://a.test/2", "https://b.test/1")
+    queue = CaptureQueue([a1, a2, b1], per_host_limit=1)
+    assert queue.get() is a1
+    assert queue.get() is b1  # a.test is at its cap
+    queue.task_done(a1)
+    assert queue.get() is a2
+
+
+def test_host_key_ignores_case():
+    a1, a2 = _items("https://A.test/1", "https://a.TEST/2")
+    queue = CaptureQueue([a1, a2], per_host_limit=1)
+    assert queue.get() is a1
+    queue.close()
+    assert queue.get() is None
+    assert queue.drain() == [a2]
+
+
+def test_exhausted_queue_returns_none():
+    (item,) = _items("https://a.test/")
+    queue = CaptureQueue([item])
+    assert queue.get() is item
+    queue.task_done(item)
+    assert queue.get() is None
+
+
+def test_get_waits_for_feeder():
+    queue = CaptureQueue()
+    queue.begin_feed()
+    got = []
+    worker = threading.Thread(target=lambda: got.append(queue.get()))
+    worker.start()
+    (item,) = _items("https://a.test/")
+    queue.put(item)
+    worker.join(2)
+    queue.end_feed()
+    assert got == [item]
+
+
+def test_delayed_item_waits_its_turn():
+    retry, fresh = _items("https://a.test/retry", "https://a.test/fresh")
+    queue = CaptureQueue([fresh])
+    queue.put_later(retry, 0.2)
+    start = time.monotonic()
+    assert queue.get() is fresh  # Not held up by the retry
+    queue.task_done(fresh)
+    assert queue.get() is retry
+    assert time.monotonic() - start >= 0.2
+
+
+def test_drain_includes_delayed_items_in_order():
+    first, second = _items("https://a.test/1", "https://a.test/2")
+    queue = CaptureQueue()
+    queue.put_later(first, 60)
+    queue.put(second)
+    assert queue.drain() == [first, second]